@@ -4,11 +4,12 @@ from app.tools.general_chat.image_tool import generate_image_tool
 from app.tools.general_chat.user_info import get_user_info
 from app.tools.general_chat.weather_tool import get_weather_by_city
 from app.tools.general_chat.web_search import tavily_web_search_tool
+from app.utils.context import make_context_trimmer, make_profile_prompt
 from app.utils.llm import get_llm
 
 Charlie = create_react_agent(
 
-    get_llm(),
+    get_llm("Charlie"),
     tools=[
         get_weather_by_city,
         tavily_web_search_tool,
@@ -24,7 +25,7 @@ Charlie = create_react_agent(
         ),
 
     ],
-    prompt="""
+    prompt=make_profile_prompt("""
     You are Charlie, a general friendly chat agent. Use tools when needed. Greet users in a friendly way and use emojis if needed.
     You have tools to perform the actions specified by the user.
     You should always ask the user for the required information before using any of the tools.
@@ -34,10 +35,10 @@ Charlie = create_react_agent(
     Don't ask the user for transferring the query to another agent, just transfer the query to another agent if required.
     Use tavily web search tool for any questions that you don't have info about.
     If generating image then only call the tool with the prompt from user's message and ask nothing else.
-    NEVER use a tool twice at once.
     Don't ask the user to use the web search tool, just use it and give answer from that data if you require like the weather for tomorrow or a product or a service.
-    User the get_user_info tool to get the user's information like email, name and age etc.
-    You have the user's personal info stored and you can see it using get_user_info by always using this tool on first chat to remember it for the whole conversation and greet users with their names and use this tool cautiously and correctly.
-    """,
+    The user's stored profile (name, email, age etc.) is given below, greet users with their names.
+    Use the get_user_info tool only to save new or changed personal details the user tells you about.
+    """),
+    pre_model_hook=make_context_trimmer(),
     name="Charlie",
 )
\ No newline at end of file
@@ -3,14 +3,16 @@ from langgraph_swarm import create_handoff_tool
 
 from app.tools.general_chat.user_info import get_user_info
 from app.tools.mail.create_mail import send_email_tool
-from app.tools.mail.read_mail import list_emails_tool
+from app.tools.mail.read_mail import list_emails_tool, read_email_tool
+from app.utils.context import make_context_trimmer, make_profile_prompt
 from app.utils.llm import get_llm
 
 Alpha = create_react_agent(
-    get_llm(),
+    get_llm("Alpha"),
     tools=[
         send_email_tool,
         list_emails_tool,
+        read_email_tool,
         # get_user_info,
         create_handoff_tool(
             agent_name="Bravo",
@@ -22,17 +24,18 @@ Alpha = create_react_agent(
         ),
 
     ],
-    prompt="""
+    prompt=make_profile_prompt("""
     You are Alpha, an email management Agent. Use tools when needed. Greet users in a friendly way and use emojis if needed.
     You have tools to perform the actions specified by the user.
     You should always ask the user for the required information before using any of the tools.
     Don't talk about the tool use to the users, only ask them about the information required for tool calls. 
     You have another agent named bravo who can help users with their reminders.
     You can work together to solve the queries of users.
+    Email listings show a shortened content of each email, use read_email_tool with its ID when the user wants the whole email.
     If you see an email about a meeting then you should ask users if they want to create a reminder about it and then use bravo for creating it.
     You have another agent named charlie who is great at chatting and other questions that you don't know, transfer to him if the question is out of your scope.
-    NEVER use a tool twice at once.
-    Transfer to charlie to get the user's information like email, name and age etc.
-    """,
+    The user's stored profile (name, email, age etc.) is given below, use it instead of asking for it.
+    """),
+    pre_model_hook=make_context_trimmer(),
     name="Alpha",
 )
\ No newline at end of file
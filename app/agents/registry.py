@@ -0,0 +1,88 @@
+import importlib
+import threading
+import time
+
+from langchain_core.runnables import RunnableLambda
+
+# Every agent of the swarm: the module that builds it (as a module-level variable named after
+# the agent) and the agents it can hand off to. Nothing here is imported until it's needed.
+AGENTS = {
+    "Alpha": {"module": "app.agents.mail_agent", "handoffs": ("Bravo", "Charlie")},
+    "Bravo": {"module": "app.agents.reminder_agent", "handoffs": ("Alpha", "Charlie")},
+    "Charlie": {"module": "app.agents.general_chat_agent", "handoffs": ("Alpha", "Bravo")},
+}
+
+
+class AgentRegistry:
+    """
+    Builds the agents in `specs` (see AGENTS) on first use: importing an agent's module creates
+    its tools, LLM client and graph, so an agent nobody talks to costs nothing at startup.
+    Safe to use from several threads; each agent is built once.
+    """
+
+    def __init__(self, specs: dict = AGENTS):
+        self.specs = specs
+        self._agents = {}
+        self._locks = {name: threading.Lock() for name in specs}
+        self._build_seconds = {}
+        self._warm_up_thread = None
+        self._warm_up_lock = threading.Lock()
+
+    @property
+    def names(self) -> list:
+        return list(self.specs)
+
+    def handoffs(self, name: str) -> tuple:
+        return self.specs[name]["handoffs"]
+
+    def get(self, name: str):
+        """Returns the agent's compiled graph, building it on the first call."""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        with self._locks[name]:
+            if name not in self._agents:
+                started = time.perf_counter()
+                module = importlib.import_module(self.specs[name]["module"])
+                self._agents[name] = getattr(module, name)
+                self._build_seconds[name] = time.perf_counter() - started
+                print(f"Agent {name} built in {self._build_seconds[name]:.2f}s.")
+            return self._agents[name]
+
+    def node(self, name: str) -> RunnableLambda:
+        """
+        A swarm node that builds the agent on its first activation and then runs it with the
+        node's config, so streaming, checkpoints and handoffs work as with the agent itself.
+        """
+        async def ainvoke(state, config):
+            return await self.get(name).ainvoke(state, config)
+
+        return RunnableLambda(lambda state, config: self.get(name).invoke(state, config), afunc=ainvoke, name=name)
+
+    def _build_all(self, names: list) -> None:
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:  # get() raises it again when the agent is actually needed
+                print(f"Error building agent {name} in the background: {e}")
+
+    def warm_up(self, first: str = None) -> threading.Thread:
+        """
+        Builds every agent in a background thread (`first` first), once per process, so the
+        page renders without waiting for them and the first message usually doesn't either.
+        """
+        with self._warm_up_lock:
+            if self._warm_up_thread is None:
+                names = sorted(self.specs, key=lambda name: name != first)
+                self._warm_up_thread = threading.Thread(target=self._build_all, args=(names,),
+                                                        name="agent-warm-up", daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def stats(self) -> dict:
+        """Build time in seconds of each agent built so far, and the agents not built yet."""
+        built = dict(self._build_seconds)
+        return {"built": built, "pending": [name for name in self.specs if name not in built]}
+
+
+agent_registry = AgentRegistry()
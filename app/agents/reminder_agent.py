@@ -2,11 +2,12 @@ from langgraph.prebuilt import create_react_agent
 from langgraph_swarm import create_handoff_tool
 from app.tools.reminder.create_reminder import create_reminder_tool
 from app.tools.reminder.read_reminder import read_reminders_tool
+from app.utils.context import make_context_trimmer, make_profile_prompt
 from app.utils.llm import get_llm
 
 Bravo = create_react_agent(
 
-    get_llm(),
+    get_llm("Bravo"),
     tools=[
         create_reminder_tool,
         read_reminders_tool,
@@ -20,7 +21,7 @@ Bravo = create_react_agent(
         ),
 
     ],
-    prompt="""
+    prompt=make_profile_prompt("""
     You are Bravo, a reminder management Agent. Use tools when needed. Greet users in a friendly way and use emojis if needed.
     You have tools to perform the actions specified by the user.
     You should always ask the user for the required information before using any of the tools.
@@ -28,9 +29,9 @@ Bravo = create_react_agent(
     You have another agent named alpha who can help users with their emails.
     You can work together to solve the queries of users.
     You have another agent named charlie who is great at chatting and other questions that you don't know, transfer to him if the question is out of your scope.
-    NEVER use a tool twice at once.
-    Transfer to charlie to get the user's information like email, name and age etc.
-
-    """,
+    For questions about several days (like "this week") read the whole range with one read_reminders_tool call.
+    The user's stored profile (name, email, age etc.) is given below, use it instead of asking for it.
+    """),
+    pre_model_hook=make_context_trimmer(),
     name="Bravo",
 )
\ No newline at end of file
@@ -1,8 +1,17 @@
 import json
 import os
+import sqlite3
+from contextlib import closing
 from datetime import datetime
 
 CHAT_HISTORY_DIR = "app/history/history_data"  # Directory to store chat history files
+CHAT_HISTORY_INDEX = "app/history/history_index.db"  # SQLite catalog of the sessions in CHAT_HISTORY_DIR
+SESSION_FILE_EXTENSIONS = (".jsonl", ".json")  # append-only logs, and legacy whole-file sessions
+SESSION_COMPACT_EVERY = 50  # compact a session log after this many appended saves
+
+# What each session log already holds, so a save only appends the new turn:
+# {file_path: {"messages": int, "logs": int, "appends": int, "size": int, "torn": bool}}
+_persisted_state = {}
 
 
 def ensure_chat_history_dir_exists():
@@ -10,36 +19,114 @@ def ensure_chat_history_dir_exists():
     os.makedirs(CHAT_HISTORY_DIR, exist_ok=True)
 
 
-def _get_file_path_for_session_id(session_id: str) -> str:
-    """Helper to find the file path for a given session ID."""
-    ensure_chat_history_dir_exists()
-    for filename in os.listdir(CHAT_HISTORY_DIR):
-        if filename.endswith(f"-{session_id}.json"):
-            return os.path.join(CHAT_HISTORY_DIR, filename)
-    return None  # Not found
+def _connect_index() -> sqlite3.Connection:
+    """Opens the session index, creating its tables on first use."""
+    conn = sqlite3.connect(CHAT_HISTORY_INDEX)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            file_name TEXT NOT NULL UNIQUE,
+            display_name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            file_mtime INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS sessions_by_timestamp ON sessions (timestamp DESC)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+    return conn
 
 
-def save_chat_session(chat_history: list, agent_log: list, session_id: str) -> str:
+def _read_session_header(file_path: str):
+    """Reads (session_id, display_name, timestamp) from a session file, or None if it's unusable."""
+    filename = os.path.basename(file_path)
+    try:
+        if file_path.endswith(".jsonl"):
+            session_data = {}
+            for record in iter_chat_session(file_path):
+                if record["type"] in ("session", "meta"):
+                    session_data.update(record)
+        else:
+            with open(file_path, "r") as f:
+                session_data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"Warning: Could not decode JSON from {filename}")
+        return None
+
+    session_id = session_data.get("id", None)
+    if not session_id:  # Only index files with a valid ID
+        print(f"Warning: Missing 'id' in {filename}")
+        return None
+    display_name = session_data.get("display_name", os.path.splitext(filename)[0])
+    return session_id, display_name, session_data.get("timestamp", "")
+
+
+def _sync_index(conn: sqlite3.Connection) -> None:
     """
-    Saves or updates the current chat history and agent log to a JSON file.
-    It uses the provided session_id to find and update an existing file,
-    or creates a new one if the ID doesn't exist.
-    Returns the ID of the saved session.
+    Reconciles the index with files added, changed or deleted outside the app.
+    Nothing is opened unless the directory changed since the last sync, and then
+    only new or modified files are parsed.
     """
     ensure_chat_history_dir_exists()
+    dir_mtime = os.stat(CHAT_HISTORY_DIR).st_mtime_ns
+    row = conn.execute("SELECT value FROM meta WHERE key = 'dir_mtime'").fetchone()
+    if row and row[0] == dir_mtime:
+        return
 
-    # Determine the file path for this session ID
-    file_path = _get_file_path_for_session_id(session_id)
+    on_disk = {}
+    with os.scandir(CHAT_HISTORY_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith(SESSION_FILE_EXTENSIONS) and entry.is_file():
+                on_disk[entry.name] = entry.stat().st_mtime_ns
+    indexed = dict(conn.execute("SELECT file_name, file_mtime FROM sessions"))
+
+    with conn:
+        for file_name in indexed.keys() - on_disk.keys():
+            conn.execute("DELETE FROM sessions WHERE file_name = ?", (file_name,))
+
+        for file_name, file_mtime in on_disk.items():
+            if indexed.get(file_name) == file_mtime:
+                continue
+            header = _read_session_header(os.path.join(CHAT_HISTORY_DIR, file_name))
+            if header is None:
+                conn.execute("DELETE FROM sessions WHERE file_name = ?", (file_name,))
+                continue
+            session_id, display_name, timestamp = header
+            conn.execute("DELETE FROM sessions WHERE session_id = ? OR file_name = ?", (session_id, file_name))
+            conn.execute(
+                "INSERT INTO sessions (session_id, file_name, display_name, timestamp, file_mtime) VALUES (?, ?, ?, ?, ?)",
+                (session_id, file_name, display_name, timestamp, file_mtime)
+            )
+
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime', ?)", (dir_mtime,))
 
-    # If file_path is None, it means this is a new session or the file was deleted.
-    # Create a new filename using the session_id.
-    if file_path is None:
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        # For new files, use a generic name prefix, actual display name is in JSON
-        file_name = f"{timestamp}-chat-{session_id}.json"
-        file_path = os.path.join(CHAT_HISTORY_DIR, file_name)
 
-    # Generate display name from first user message, or use a default
+def _get_file_path_for_session_id(session_id: str) -> str:
+    """Helper to find the file path for a given session ID."""
+    with closing(_connect_index()) as conn:
+        _sync_index(conn)
+        row = conn.execute("SELECT file_name FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+    if row is None:
+        return None  # Not found
+    return os.path.join(CHAT_HISTORY_DIR, row[0])
+
+
+def _index_saved_file(conn: sqlite3.Connection, session_id: str, file_path: str, display_name: str,
+                      timestamp: str) -> None:
+    """
+    Records a file the app just wrote, so the next listing doesn't need to re-read it.
+    dir_mtime is left to _sync_index: files other processes added or removed meanwhile would
+    otherwise count as seen. The next sync only lists the directory and skips this file.
+    """
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, file_name, display_name, timestamp, file_mtime) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (session_id, os.path.basename(file_path), display_name, timestamp, os.stat(file_path).st_mtime_ns)
+        )
+
+
+def _make_display_name(chat_history: list) -> str:
+    """Generate display name from first user message, or use a default"""
     display_name = "New Chat"
     for msg in chat_history:
         if msg["role"] == "user" and len(msg["content"]) > 0:
@@ -49,61 +136,174 @@ def save_chat_session(chat_history: list, agent_log: list, session_id: str) -> s
             if len(msg["content"]) > 20:
                 display_name += "..."
             break
+    return display_name
+
+
+def _dump_record(record: dict) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
 
+def _write_session_atomically(file_path: str, session_data: dict) -> None:
+    """
+    Writes a compacted session log (header, messages, agent log) to a temp file
+    and renames it over file_path, so a crash never leaves a half-written session.
+    """
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(_dump_record({"type": "session", "id": session_data["id"], "timestamp": session_data["timestamp"],
+                              "display_name": session_data["display_name"]}))
+        for message in session_data["chat_history"]:
+            f.write(_dump_record({"type": "message", "message": message}))
+        for entry in session_data["agent_log"]:
+            f.write(_dump_record({"type": "agent_log", "entry": entry}))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+    _persisted_state[file_path] = {
+        "messages": len(session_data["chat_history"]),
+        "logs": len(session_data["agent_log"]),
+        "appends": 0,
+        "size": os.path.getsize(file_path),
+    }
+
+
+def _get_persisted_state(file_path: str) -> dict:
+    """Returns what the session log on disk holds, re-reading it if it changed behind our back."""
+    state = _persisted_state.get(file_path)
+    size = os.path.getsize(file_path)
+    if state is None or state["size"] != size:
+        state = {"messages": 0, "logs": 0, "appends": 0, "size": size, "torn": False}
+        with open(file_path, "rb") as f:
+            if size:
+                f.seek(-1, os.SEEK_END)
+                state["torn"] = f.read(1) != b"\n"  # a crash cut the last record short
+        for record in iter_chat_session(file_path):
+            if record["type"] == "message":
+                state["messages"] += 1
+            elif record["type"] == "agent_log":
+                state["logs"] += 1
+            elif record["type"] == "meta":
+                state["appends"] += 1
+        _persisted_state[file_path] = state
+    return state
+
+
+def save_chat_session(chat_history: list, agent_log: list, session_id: str) -> str:
+    """
+    Saves or updates the current chat history and agent log to a JSON-lines session log.
+    It uses the provided session_id to find an existing log and appends only the messages
+    and agent log entries it doesn't hold yet, or creates a new one if the ID doesn't exist.
+    Legacy .json sessions are migrated to a .jsonl log on their first save.
+    Returns the ID of the saved session.
+    """
+    ensure_chat_history_dir_exists()
+
+    # Determine the file path for this session ID
+    file_path = _get_file_path_for_session_id(session_id)
+
+    display_name = _make_display_name(chat_history)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")  # Update timestamp on save
     session_data = {
         "id": session_id,
-        "timestamp": datetime.now().strftime("%Y%m%d-%H%M%S"),  # Update timestamp on save
+        "timestamp": timestamp,
         "chat_history": chat_history,
         "agent_log": agent_log,
         "display_name": display_name  # Always update display name
     }
 
-    with open(file_path, "w") as f:
-        json.dump(session_data, f, indent=2)
+    if file_path is None:
+        # New session (or the file was deleted): start a new log named after the session_id
+        file_path = os.path.join(CHAT_HISTORY_DIR, f"{timestamp}-chat-{session_id}.jsonl")
+        _write_session_atomically(file_path, session_data)
+    elif not file_path.endswith(".jsonl"):
+        # Migrate a legacy whole-file session to an append-only log
+        legacy_path = file_path
+        file_path = os.path.splitext(legacy_path)[0] + ".jsonl"
+        _write_session_atomically(file_path, session_data)
+        os.remove(legacy_path)
+    else:
+        state = _get_persisted_state(file_path)
+        if (len(chat_history) < state["messages"] or len(agent_log) < state["logs"]
+                or state["appends"] >= SESSION_COMPACT_EVERY):
+            # History was rewritten, or enough meta records piled up: compact the log
+            _write_session_atomically(file_path, session_data)
+        else:
+            new_records = [_dump_record({"type": "message", "message": m}) for m in chat_history[state["messages"]:]]
+            new_records += [_dump_record({"type": "agent_log", "entry": e}) for e in agent_log[state["logs"]:]]
+            new_records.append(_dump_record({"type": "meta", "timestamp": timestamp, "display_name": display_name}))
+            with open(file_path, "a") as f:
+                f.write(("\n" if state.get("torn") else "") + "".join(new_records))  # one write per turn, so a crash loses at most the last line
+            state.update(messages=len(chat_history), logs=len(agent_log), appends=state["appends"] + 1,
+                         size=os.path.getsize(file_path), torn=False)
+
+    with closing(_connect_index()) as conn:
+        _index_saved_file(conn, session_id, file_path, display_name, timestamp)
     return session_id
 
 
+def iter_chat_session(file_path: str):
+    """
+    Streams the records of a session log one at a time:
+    {"type": "session" | "meta", ...}, {"type": "message", "message": {...}} or
+    {"type": "agent_log", "entry": "..."}. A torn last line from a crash is skipped.
+    """
+    with open(file_path, "r") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Warning: Skipping unreadable record in {os.path.basename(file_path)}")
+
+
 def load_chat_session(file_path: str) -> dict:
     """
-    Loads a specific chat session from a JSON file.
+    Loads a specific chat session from a session log (or a legacy JSON file).
     Returns a dictionary containing chat_history and agent_log.
     """
-    with open(file_path, "r") as f:
-        session_data = json.load(f)
+    if not file_path.endswith(".jsonl"):
+        with open(file_path, "r") as f:
+            session_data = json.load(f)
+        return session_data
+
+    session_data = {"chat_history": [], "agent_log": []}
+    for record in iter_chat_session(file_path):
+        if record["type"] == "message":
+            session_data["chat_history"].append(record["message"])
+        elif record["type"] == "agent_log":
+            session_data["agent_log"].append(record["entry"])
+        else:
+            session_data.update({k: v for k, v in record.items() if k != "type"})
     return session_data
 
 
-def get_saved_sessions() -> list:
+def get_saved_sessions(limit: int = None, offset: int = 0) -> list:
     """
-    Retrieves a list of all saved chat session files.
+    Retrieves a page of saved chat sessions from the session index, newest first.
     Each item in the list is a tuple: (full_file_path, display_name, session_id).
+    Pass limit/offset to paginate; by default all sessions are returned.
     """
-    ensure_chat_history_dir_exists()
-    sessions = []
-    for filename in os.listdir(CHAT_HISTORY_DIR):
-        if filename.endswith(".json"):
-            file_path = os.path.join(CHAT_HISTORY_DIR, filename)
-            try:
-                with open(file_path, "r") as f:
-                    session_data = json.load(f)
-                    # Use stored display name and ID
-                    display_name = session_data.get("display_name", filename.replace(".json", ""))
-                    session_id = session_data.get("id", None)
-                    timestamp = session_data.get("timestamp", "")  # Get timestamp for sorting
-
-                    if session_id:  # Only add if a valid ID is present
-                        sessions.append((file_path, display_name, session_id, timestamp))
-            except json.JSONDecodeError:
-                print(f"Warning: Could not decode JSON from {filename}")
-            except KeyError:
-                print(f"Warning: Missing 'id' or 'display_name' in {filename}")
+    with closing(_connect_index()) as conn:
+        _sync_index(conn)
+        rows = conn.execute(
+            "SELECT file_name, display_name, session_id FROM sessions "
+            "ORDER BY timestamp DESC, session_id LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+    return [(os.path.join(CHAT_HISTORY_DIR, file_name), display_name, session_id)
+            for file_name, display_name, session_id in rows]
+
 
-    # Sort by timestamp (newest first)
-    sessions.sort(key=lambda x: x[3], reverse=True)  # Sort by the timestamp we loaded
-    return [(s[0], s[1], s[2]) for s in sessions]  # Return without timestamp
+def count_saved_sessions() -> int:
+    """Returns the number of saved chat sessions."""
+    with closing(_connect_index()) as conn:
+        _sync_index(conn)
+        return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
 
 
 def delete_chat_session(file_path: str) -> None:
     """Deletes a specific chat session file."""
     if os.path.exists(file_path):
-        os.remove(file_path)
\ No newline at end of file
+        os.remove(file_path)
+    _persisted_state.pop(file_path, None)
+    with closing(_connect_index()) as conn, conn:
+        conn.execute("DELETE FROM sessions WHERE file_name = ?", (os.path.basename(file_path),))
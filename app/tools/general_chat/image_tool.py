@@ -1,13 +1,144 @@
+import hashlib
+import os
+import re
+import threading
+
 import requests
-from urllib.parse import quote
-from langchain.tools import tool
+from urllib.parse import quote, unquote, urlparse, parse_qs
+from langchain_core.tools import tool
 import streamlit as st
+from app.utils.jobs import JobQueue, DONE
+from app.utils.metrics import LatencyStats
+from config.settings import IMAGE_API_URL, IMAGE_WIDTH, IMAGE_HEIGHT, IMAGE_SEED, IMAGE_MODEL, IMAGE_CACHE_DIR, \
+    IMAGE_TIMEOUT_SECONDS, IMAGE_JOB_CONCURRENCY, IMAGE_JOB_TIMEOUT_SECONDS
+
+# Keep-alive session shared by all image requests
+_session = requests.Session()
+
+generation_latency = LatencyStats()
+_transfer_lock = threading.Lock()
+transfer_stats = {"requests": 0, "bytes_downloaded": 0, "cache_hits": 0}
+
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\((\S+?)\)")
+
+# Background generations, keyed by image URL, so the agent turn doesn't wait for Pollinations
+image_jobs = JobQueue("image", max_workers=IMAGE_JOB_CONCURRENCY, timeout=IMAGE_JOB_TIMEOUT_SECONDS)
+
+
+def build_image_url(prompt: str, width: int = IMAGE_WIDTH, height: int = IMAGE_HEIGHT, seed: int = IMAGE_SEED,
+                    model: str = IMAGE_MODEL) -> str:
+    encoded_prompt = quote(prompt)
+    return f"{IMAGE_API_URL}{encoded_prompt}?width={width}&height={height}&seed={seed}&model={model}"
+
+
+def image_cache_path(prompt: str, width: int, height: int, seed: int, model: str):
+    """Content-addressed location of a generated image in IMAGE_CACHE_DIR (None when caching is off)."""
+    if not IMAGE_CACHE_DIR:
+        return None
+    digest = hashlib.sha256(f"{prompt}\n{width}x{height}\n{seed}\n{model}".encode()).hexdigest()
+    return os.path.join(IMAGE_CACHE_DIR, f"{digest}.img")
+
+
+def cached_image_for_url(url: str):
+    """Returns the cached file for an image URL built by build_image_url, if it's on disk."""
+    if not IMAGE_CACHE_DIR or not url.startswith(IMAGE_API_URL):
+        return None
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    try:
+        path = image_cache_path(unquote(url[len(IMAGE_API_URL):].split("?", 1)[0]), int(query["width"][0]),
+                                int(query["height"][0]), int(query["seed"][0]), query["model"][0])
+    except (KeyError, ValueError):
+        return None
+    return path if os.path.exists(path) else None
+
+
+def split_cached_images(content: str) -> list:
+    """
+    Splits a chat message into ("markdown", text), ("image", local_path) and ("image_job", job_id)
+    parts: images already in the local cache are served from disk instead of downloaded again by
+    the browser, and images still being generated in the background are shown as pending jobs.
+    """
+    parts, position = [], 0
+    for match in _MARKDOWN_IMAGE.finditer(content):
+        image_url = match.group(1)
+        local_path = cached_image_for_url(image_url)
+        job = image_jobs.get(image_url)
+        if local_path is not None:
+            part = ("image", local_path)
+        elif job is not None and not job.finished:
+            part = ("image_job", job.id)
+        elif job is not None and job.status != DONE:
+            part = ("markdown", f"⚠️ Image generation {job.status}: {job.error or 'no response in time'}")
+        else:
+            continue
+        if match.start() > position:
+            parts.append(("markdown", content[position:match.start()]))
+        parts.append(part)
+        position = match.end()
+    if position < len(content):
+        parts.append(("markdown", content[position:]))
+    return parts
+
+
+def _count_transfer(nbytes: int) -> None:
+    with _transfer_lock:
+        transfer_stats["bytes_downloaded"] += nbytes
+
+
+def fetch_image(image_url: str, save_path: str = None) -> str:
+    """
+    Requests the image and checks that an image actually came back.
+    Without save_path only the headers and the first chunk are read before the connection is
+    closed; with save_path the whole image is streamed to that file (atomically).
+    Returns an error message, or None on success.
+    """
+    with _transfer_lock:
+        transfer_stats["requests"] += 1
+    with _session.get(image_url, stream=True, timeout=IMAGE_TIMEOUT_SECONDS) as res:
+        if res.status_code != 200:
+            return f"Error: Failed to generate image (HTTP {res.status_code})"
+        if not res.headers.get("Content-Type", "").startswith("image/"):
+            return f"Error: Failed to generate image (unexpected content type {res.headers.get('Content-Type')})"
+
+        if save_path is None:
+            first_chunk = next(res.iter_content(chunk_size=1024), b"")
+            _count_transfer(len(first_chunk))
+            return None if first_chunk else "Error: Failed to generate image (empty response)"
+
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        tmp_path = f"{save_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            for chunk in res.iter_content(chunk_size=64 * 1024):
+                f.write(chunk)
+                _count_transfer(len(chunk))
+        os.replace(tmp_path, save_path)
+        return None
+
+
+def _generate_in_background(image_url: str, save_path: str) -> str:
+    with generation_latency.time():
+        error = fetch_image(image_url, save_path)
+    if error:
+        print(error)
+        raise RuntimeError(error)
+    print(f"Image generated successfully.")
+    return save_path
+
+
+def get_image_stats() -> dict:
+    with _transfer_lock:
+        stats = dict(transfer_stats)
+    stats["latency"] = generation_latency.snapshot()
+    stats["jobs"] = image_jobs.stats()
+    return stats
 
 
 @tool
 def generate_image_tool(prompt: str) -> str:
     """
-    Generates an image using Pollinations AI and returns the image as markdown.
+    Starts generating an image using Pollinations AI and returns its url right away;
+    the image appears in the chat once it is ready.
     Show the image with proper Markdown formatting.
     for example:
         - f"![Generated Image]({image_url})
@@ -22,17 +153,19 @@ def generate_image_tool(prompt: str) -> str:
     st.sidebar.info("Used generate image tool")
     try:
         print(f"Generating image for prompt: {prompt}")
-        encoded_prompt = quote(prompt)
-        image_url = f"https://pollinations.ai/p/{encoded_prompt}?width={1024}&height={1024}&seed={40}&model=flux"
+        image_url = build_image_url(prompt)
         print(f"Constructed image URL: {image_url}")
 
-        # Check if image exists
-        res = requests.get(image_url)
-        if res.status_code != 200:
-            print(f"Failed to fetch image. Status: {res.status_code}")
-            return f"Error: Failed to generate image (HTTP {res.status_code})"
+        save_path = image_cache_path(prompt, IMAGE_WIDTH, IMAGE_HEIGHT, IMAGE_SEED, IMAGE_MODEL)
+        if save_path and os.path.exists(save_path):
+            with _transfer_lock:
+                transfer_stats["cache_hits"] += 1
+            print("Image served from local cache.")
+            return f"Url of generated image: {image_url}"
 
-        print(f"Image generated successfully.")
+        # Generate and check the image in the background (keeping it on disk when the image cache is enabled)
+        image_jobs.submit(image_url, _generate_in_background, image_url, save_path)
+        print("Image generation job submitted.")
         return f"Url of generated image: {image_url}"
         # return f"![Generated Image]({image_url})"
 
@@ -1,22 +1,7 @@
-import os
-import json
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
-USER_DATA_FILE = "user_data.json"
-
-
-def load_user_data():
-    """Load user data from a JSON file if it exists."""
-    if os.path.exists(USER_DATA_FILE):
-        with open(USER_DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-
-def save_user_data(data):
-    """Save user data to a JSON file."""
-    with open(USER_DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+from app.utils.profile_store import profile_store, get_user_id, format_profile
 
 
 @tool
@@ -27,7 +12,8 @@ def get_user_info(
         address: str = None,
         city: str = None,
         phone: str = None,
-        action: str = "get"
+        action: str = "get",
+        config: RunnableConfig = None
 ) -> str:
     """
     Manage the user's personal profile stored in your memory for user's personal details.
@@ -78,31 +64,24 @@ def get_user_info(
         manage_user_profile(mail="new@mail.com", city="New York", action="update")
     """
     print('used user info tool')
-    user_data = load_user_data()
+    user_id = get_user_id(config)
 
     if action == "get":
+        user_data = profile_store.get(user_id)
         if not user_data:
             return "No personal information is stored yet."
-        return "Here is your stored information:\n" + "\n".join(
-            [f"{k.capitalize()}: {v}" for k, v in user_data.items()])
+        return "Here is your stored information:\n" + format_profile(user_data)
 
     elif action == "update":
-        updates = {
-            "name": name,
-            "age": age,
-            "mail": mail,
-            "address": address,
-            "city": city,
-            "phone": phone
-        }
-
-        updated_fields = []
-        for key, value in updates.items():
-            if value is not None:
-                user_data[key] = value
-                updated_fields.append(key)
-
-        save_user_data(user_data)
+        updated_fields = profile_store.update(
+            user_id,
+            name=name,
+            age=age,
+            mail=mail,
+            address=address,
+            city=city,
+            phone=phone
+        )
 
         if updated_fields:
             return f"Updated your info: {', '.join(updated_fields)}."
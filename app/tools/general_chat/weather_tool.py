@@ -1,8 +1,47 @@
-from langchain.tools import tool
+from langchain_core.tools import tool
 import requests
-from config.settings import weather_api_key
+from app.utils.cache import TTLCache
+from config.settings import weather_api_key, WEATHER_CACHE_SIZE, WEATHER_CACHE_TTL_SECONDS, \
+    WEATHER_CACHE_STALE_SECONDS, WEATHER_TIMEOUT_SECONDS, TOOL_CONCURRENCY
 import streamlit as st
 
+BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+
+# Keep-alive session shared by all weather lookups, with a connection per concurrent tool call
+_session = requests.Session()
+_session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=TOOL_CONCURRENCY))
+
+# Current weather per normalized city name; stale entries are served while refreshing in the background
+weather_cache = TTLCache("weather", max_size=WEATHER_CACHE_SIZE, ttl=WEATHER_CACHE_TTL_SECONDS,
+                         stale_ttl=WEATHER_CACHE_STALE_SECONDS)
+
+
+class WeatherApiError(Exception):
+    """Raised when OpenWeatherMap answers with a non-200 status."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"OpenWeatherMap returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+def normalize_city_name(city_name: str) -> str:
+    """'  new   York, ' and 'New York' share one cache entry."""
+    return " ".join(city_name.replace(",", " , ").split()).strip(" ,").casefold().replace(" , ", ",")
+
+
+def fetch_weather(city_key: str) -> dict:
+    """Fetches the current weather JSON for a (normalized) city name from OpenWeatherMap."""
+    params = {
+        "q": city_key,
+        "appid": weather_api_key,
+        "units": "metric"
+    }
+    response = _session.get(BASE_URL, params=params, timeout=WEATHER_TIMEOUT_SECONDS)
+    if response.status_code != 200:
+        raise WeatherApiError(response.status_code)
+    return response.json()
+
+
 @tool
 def get_weather_by_city(city_name: str) -> str:
     """
@@ -17,27 +56,18 @@ def get_weather_by_city(city_name: str) -> str:
     st.warning("Used weather tool")
     print("Used weather tool")
 
-    api_key = weather_api_key
-    base_url = "http://api.openweathermap.org/data/2.5/weather"
-
-    params = {
-        "q": city_name,
-        "appid": api_key,
-        "units": "metric"
-    }
+    city_key = normalize_city_name(city_name)
 
     try:
-        response = requests.get(base_url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            return (
-                f"Weather in {data['name']}:\n"
-                f"- Temperature: {data['main']['temp']}°C\n"
-                f"- Description: {data['weather'][0]['description']}\n"
-                f"- Humidity: {data['main']['humidity']}%\n"
-                f"- Wind Speed: {data['wind']['speed']} m/s"
-            )
-        else:
-            return f"Error: City not found or API error ({response.status_code})"
+        data = weather_cache.get_or_load(city_key, lambda: fetch_weather(city_key))
+        return (
+            f"Weather in {data['name']}:\n"
+            f"- Temperature: {data['main']['temp']}°C\n"
+            f"- Description: {data['weather'][0]['description']}\n"
+            f"- Humidity: {data['main']['humidity']}%\n"
+            f"- Wind Speed: {data['wind']['speed']} m/s"
+        )
+    except WeatherApiError as e:
+        return f"Error: City not found or API error ({e.status_code})"
     except Exception as e:
         return f"Exception occurred: {str(e)}"
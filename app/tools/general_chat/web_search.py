@@ -1,10 +1,63 @@
-from langchain.tools import tool
-from langchain_community.tools.tavily_search import TavilySearchResults
-from config.settings import tavily_api_key
+import re
+import threading
+import time
+
+from langchain_core.tools import tool
+from app.utils.cache import TTLCache
+from app.utils.metrics import LatencyStats
+from config.settings import tavily_api_key, SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_PATH, \
+    SEARCH_CACHE_WRITE_DELAY_SECONDS
 import streamlit as st
 
-# Instantiate Tavily tool once (reuse for efficiency)
-tavily = TavilySearchResults(k=5, tavily_api_key=tavily_api_key)  # Adjust `k` to control how many results to fetch
+# Tavily tool, created once on the first search (langchain_community is slow to import)
+_tavily = None
+_tavily_lock = threading.Lock()
+
+# Results per normalized query; identical searches running at the same time share one Tavily call
+search_cache = TTLCache("web search", max_size=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL_SECONDS,
+                        persist_path=SEARCH_CACHE_PATH, write_delay=SEARCH_CACHE_WRITE_DELAY_SECONDS)
+search_latency = LatencyStats()  # whole tool call, cache hits included
+upstream_latency = LatencyStats()  # Tavily requests only
+
+_QUERY_PUNCTUATION = re.compile(r"[?!.,;:]+$")
+
+
+def normalize_query(query: str) -> str:
+    """'What is  LangGraph?' and 'what is langgraph' are the same search."""
+    return _QUERY_PUNCTUATION.sub("", " ".join(query.split())).casefold()
+
+
+def get_tavily():
+    """The shared Tavily search tool, built on first use."""
+    global _tavily
+    with _tavily_lock:
+        if _tavily is None:
+            from langchain_community.tools.tavily_search import TavilySearchResults
+
+            _tavily = TavilySearchResults(k=5, tavily_api_key=tavily_api_key)  # Adjust `k` to control how many results to fetch
+        return _tavily
+
+
+def _run_tavily(query: str) -> list:
+    tavily = get_tavily()
+    with upstream_latency.time():
+        results = tavily.run(query)
+    # The Tavily tool reports failures as a string instead of raising; don't cache those
+    if not isinstance(results, list):
+        raise RuntimeError(results)
+    return results
+
+
+def get_search_stats() -> dict:
+    """Cache counters plus latency summaries and histograms, for tuning the TTL and size."""
+    return {
+        "cache": search_cache.stats(),
+        "latency": search_latency.snapshot(),
+        "latency_histogram": search_latency.histogram(),
+        "upstream_latency": upstream_latency.snapshot(),
+        "upstream_latency_histogram": upstream_latency.histogram(),
+    }
+
 
 @tool
 def tavily_web_search_tool(query: str) -> str:
@@ -28,10 +81,14 @@ def tavily_web_search_tool(query: str) -> str:
         print("Empty query")
         return "Error: Search query is required."
 
+    started = time.perf_counter()
     try:
-        results = tavily.run(query)
+        cache_key = normalize_query(query)
+        results = search_cache.get_or_load(cache_key, lambda: _run_tavily(query))
         print("Tavily search completed")
         return results
     except Exception as e:
         print(f"Tavily search failed: {str(e)}")
         return f"Error during Tavily search: {str(e)}"
+    finally:
+        search_latency.record(time.perf_counter() - started)
@@ -1,8 +1,7 @@
-from langchain.tools import tool
+from langchain_core.tools import tool
 from email.mime.text import MIMEText
-from googleapiclient.discovery import build
 import base64
-from app.utils.google_cloud.cloud_config import get_credentials
+from app.utils.google_cloud.service_registry import google_service
 
 
 @tool
@@ -30,9 +29,6 @@ def send_email_tool(recipient: str = "", subject: str = "", message_text: str =
         return "❌ Error: Email message text is required."
 
     try:
-        creds = get_credentials()
-        service = build('gmail', 'v1', credentials=creds)
-
         # Create email content
         message = MIMEText(message_text)
         message['to'] = recipient
@@ -41,7 +37,8 @@ def send_email_tool(recipient: str = "", subject: str = "", message_text: str =
 
         # Create draft
         draft = {'message': {'raw': raw_message}}
-        response = service.users().drafts().create(userId='me', body=draft).execute()
+        with google_service('gmail', 'v1') as service:
+            response = service.users().drafts().create(userId='me', body=draft).execute()
 
         print(f"✅ Draft created successfully with ID: {response['id']}")
         return f"✅ Draft created successfully with ID: {response['id']}"
@@ -0,0 +1,134 @@
+import base64
+import html
+import re
+
+from config.settings import EMAIL_CHARS_PER_TOKEN
+
+# Every alternative starts with "<", which lets the regex engine skip straight to the next tag
+_HTML_PATTERN = re.compile(r"""<(?:
+      (?P<skip>(?P<skip_tag>script|style|head|title|template)\b[^>]*>.*?</(?P=skip_tag)\s*>)
+    | (?P<comment>!--.*?-->|!\[CDATA\[.*?\]\]>|![^>]*>|\?[^>]*>)
+    | (?P<item>li\b[^>]*>)
+    | (?P<cell>/?t[dh]\b[^>]*>)
+    | (?P<row>tr\b[^>]*>)
+    | (?P<block>/?(?:p|div|br|hr|table|tbody|thead|h[1-6]|ul|ol|dl|dt|dd|blockquote|pre|section|article|
+                    header|footer|nav|center|form)\b[^>]*>)
+    | (?P<tag>/?[a-zA-Z][^>]*>)
+)""", re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+_HTML_REPLACEMENTS = {"skip": "", "comment": "", "item": "\n- ", "cell": " ", "row": "\n", "block": "\n", "tag": ""}
+
+# Start of the quoted conversation or of the signature; everything from here on is dropped
+_QUOTE_OR_SIGNATURE = re.compile(r"""^(?:
+      On\b[^\n]{0,200}(?:\n[^\n]{0,200})?\bwrote:$                  # Gmail / Apple Mail attribution
+    | Le\b[^\n]{0,200}(?:\n[^\n]{0,200})?\ba\ écrit\ ?:?$
+    | -{2,}\ ?Original\ Message\ ?-{2,}                           # Outlook / older clients
+    | _{10,}\nFrom:
+    | From:[^\n]*\n(?:[^\n]*\n){0,2}?Sent:                          # Outlook reply header
+    | --$                                                        # standard signature delimiter
+    | Sent\ from\ my\ [^\n]{1,40}$
+    | Get\ Outlook\ for\ [^\n]{1,20}$
+)""", re.IGNORECASE | re.MULTILINE | re.VERBOSE)
+
+_QUOTED_LINE = re.compile(r"^>[^\n]*\n?", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n{3,}")
+# Zero-width characters newsletters pad their preview text with
+_INVISIBLE = ("\u200b", "\u200c", "\u034f", "\ufeff")
+
+
+def _header(part: dict, name: str) -> str:
+    name = name.lower()
+    return next((h["value"] for h in part.get("headers", []) if h["name"].lower() == name), "")
+
+
+def iter_text_parts(payload: dict):
+    """
+    Walks a Gmail message payload depth-first, in document order, through any nesting of
+    multipart parts and yields the inline text/plain and text/html parts. Attachments (parts
+    with a filename or stored separately under an attachmentId) are skipped without decoding.
+    """
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        mime_type = (part.get("mimeType") or "").lower()
+        if mime_type.startswith("multipart/"):
+            stack.extend(reversed(part.get("parts", [])))
+            continue
+        if part.get("filename") or "data" not in part.get("body", {}):
+            continue
+        if mime_type in ("text/plain", "text/html"):
+            yield mime_type, part
+
+
+def decode_part(part: dict) -> str:
+    """Decodes a part's base64url body using the charset from its Content-Type header."""
+    data = base64.urlsafe_b64decode(part["body"]["data"].encode("ascii"))
+    charset = re.search(r'charset="?([\w.:-]+)', _header(part, "Content-Type"), re.IGNORECASE)
+    try:
+        return data.decode(charset.group(1) if charset else "utf-8", errors="replace")
+    except LookupError:  # unknown charset name
+        return data.decode("utf-8", errors="replace")
+
+
+def html_to_text(markup: str) -> str:
+    """
+    Converts HTML to readable plain text in one regex pass: drops scripts, styles and comments,
+    turns blocks, rows and list items into line breaks and unescapes entities. Link targets and
+    images are dropped, only their visible text is kept.
+    """
+    text = _HTML_PATTERN.sub(lambda m: _HTML_REPLACEMENTS[m.lastgroup], markup)
+    return html.unescape(text)
+
+
+def _tidy(text: str) -> str:
+    """Collapses runs of whitespace within lines and more than one blank line."""
+    if not text.isascii():
+        for character in _INVISIBLE:
+            text = text.replace(character, "")
+    lines = text.replace("\r", "").split("\n")
+    return _BLANK_LINES.sub("\n\n", "\n".join(" ".join(line.split()) for line in lines)).strip()
+
+
+def strip_quoted_reply(text: str) -> str:
+    """
+    Removes the quoted earlier messages ('On ... wrote:', Outlook headers, '>' lines) and the
+    signature from a tidied plain-text body. Returns the text unchanged if nothing would be left.
+    """
+    match = _QUOTE_OR_SIGNATURE.search(text)
+    stripped = text[:match.start()] if match else text
+    if ">" in stripped:
+        stripped = _BLANK_LINES.sub("\n\n", _QUOTED_LINE.sub("", stripped))
+    return stripped.strip() or text
+
+
+def extract_body(payload: dict, strip_quotes: bool = True) -> str:
+    """
+    Returns the readable body of a Gmail message payload: its first text/plain part, or its
+    first text/html part converted to text when it has none. Only the chosen part is decoded.
+    """
+    html_part = None
+    for mime_type, part in iter_text_parts(payload):
+        if mime_type == "text/plain":
+            text = decode_part(part)
+            break
+        html_part = html_part or part
+    else:
+        text = html_to_text(decode_part(html_part)) if html_part else ""
+
+    text = _tidy(text)
+    return strip_quoted_reply(text) if strip_quotes else text
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> tuple[str, bool]:
+    """
+    Cuts text to about max_tokens (EMAIL_CHARS_PER_TOKEN characters per token, the same estimate
+    as count_tokens_approximately), preferring a sentence or word boundary. Returns (text, truncated).
+    """
+    max_chars = max_tokens * EMAIL_CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text, False
+    cut = text[:max_chars]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < max_chars // 2:
+        boundary = cut.rfind(" ")
+    return cut[:boundary + 1 if boundary > 0 else max_chars].rstrip(), True
@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from googleapiclient.errors import HttpError
+
+from config.settings import MAILBOX_CACHE_PATH, MAILBOX_SYNC_INTERVAL_SECONDS
+
+
+class MailboxCache:
+    """
+    Local SQLite copy of the Gmail messages the assistant has listed, keyed by message ID.
+
+    Changes are pulled incrementally with history().list from the last known historyId, so
+    new, deleted and relabelled messages are applied without downloading the mailbox again.
+    For every label set that was listed, `coverage` remembers the internalDate down to which
+    all messages with those labels are cached; a listing within that boundary is answered
+    locally, anything older is fetched from Gmail (only the messages not cached yet).
+
+    fetch_messages(service, ids) returns full message resources (or exceptions) in order, and
+    parse_message(message) returns its (sender, subject, body). A cache written with another
+    version (of parse_message) is dropped and rebuilt.
+    """
+
+    def __init__(self, fetch_messages, parse_message, path: str = MAILBOX_CACHE_PATH,
+                 sync_interval: float = MAILBOX_SYNC_INTERVAL_SECONDS, version: int = 1):
+        self.fetch_messages = fetch_messages
+        self.parse_message = parse_message
+        self.version = str(version)
+        self.path = path
+        self.sync_interval = sync_interval
+        self._last_sync = 0.0
+        self._lock = threading.RLock()
+        self.local_hits = 0
+        self.remote_listings = 0
+        self.messages_fetched = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                internal_date INTEGER NOT NULL,
+                labels TEXT NOT NULL,
+                sender TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                raw TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS messages_by_date ON messages (internal_date DESC)")
+        conn.execute("CREATE TABLE IF NOT EXISTS coverage (label_key TEXT PRIMARY KEY, since_date INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    @staticmethod
+    def _label_key(label_ids: list) -> str:
+        return ",".join(sorted(label_ids))
+
+    # --- writes ---
+
+    def _store(self, conn: sqlite3.Connection, messages: list) -> None:
+        rows = []
+        for message in messages:
+            sender, subject, body = self.parse_message(message)
+            rows.append((message["id"], int(message.get("internalDate", 0)),
+                         f",{','.join(message.get('labelIds', []))},", sender, subject, body, json.dumps(message)))
+        conn.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.messages_fetched += len(rows)
+
+    def _fetch_and_store(self, conn: sqlite3.Connection, service, message_ids: list) -> bool:
+        """Fetches and stores the messages; returns False if any of them couldn't be fetched."""
+        if not message_ids:
+            return True
+        fetched = self.fetch_messages(service, message_ids)
+        complete = True
+        for message_id, message in zip(message_ids, fetched):
+            if isinstance(message, Exception):
+                print(f"Failed to fetch email {message_id}: {message}")
+                complete = False
+        self._store(conn, [message for message in fetched if isinstance(message, dict)])
+        return complete
+
+    def _reset(self, conn: sqlite3.Connection, service) -> None:
+        """Drops everything and starts tracking history from the mailbox's current historyId."""
+        history_id = service.users().getProfile(userId="me").execute()["historyId"]
+        conn.execute("DELETE FROM messages")
+        conn.execute("DELETE FROM coverage")
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('history_id', ?)", (str(history_id),))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+
+    def _apply_history(self, conn: sqlite3.Connection, service, records: list) -> bool:
+        """Applies history records; returns False if a new or relabelled message couldn't be fetched."""
+        to_fetch = []
+        for record in records:
+            for entry in record.get("messagesAdded", []):
+                to_fetch.append(entry["message"]["id"])
+            for entry in record.get("messagesDeleted", []):
+                conn.execute("DELETE FROM messages WHERE id = ?", (entry["message"]["id"],))
+            for kind in ("labelsAdded", "labelsRemoved"):
+                for entry in record.get(kind, []):
+                    message_id = entry["message"]["id"]
+                    row = conn.execute("SELECT labels FROM messages WHERE id = ?", (message_id,)).fetchone()
+                    if row is None:
+                        if kind == "labelsAdded":
+                            to_fetch.append(message_id)  # may now belong to a covered label set
+                        continue
+                    labels = [label for label in row[0].split(",") if label]
+                    if kind == "labelsAdded":
+                        labels += [label for label in entry.get("labelIds", []) if label not in labels]
+                    else:
+                        labels = [label for label in labels if label not in entry.get("labelIds", [])]
+                    conn.execute("UPDATE messages SET labels = ? WHERE id = ?", (f",{','.join(labels)},", message_id))
+
+        # A message added and then deleted within the same delta no longer exists
+        deleted = {entry["message"]["id"] for record in records for entry in record.get("messagesDeleted", [])}
+        return self._fetch_and_store(conn, service, list(dict.fromkeys(i for i in to_fetch if i not in deleted)))
+
+    def sync(self, service, force: bool = False) -> None:
+        """Applies the changes since the last known historyId (at most once per sync_interval unless forced)."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_sync < self.sync_interval:
+                return
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'history_id'").fetchone()
+                version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                if row is None or version is None or version[0] != self.version:
+                    self._reset(conn, service)
+                else:
+                    records, page_token, history_id = [], None, row[0]
+                    try:
+                        while True:
+                            response = service.users().history().list(
+                                userId="me", startHistoryId=row[0], pageToken=page_token).execute()
+                            records.extend(response.get("history", []))
+                            history_id = response.get("historyId", history_id)
+                            page_token = response.get("nextPageToken")
+                            if not page_token:
+                                break
+                    except HttpError as e:
+                        if e.resp.status != 404:
+                            raise
+                        print("Mailbox history expired, resyncing the mailbox cache.")
+                        self._reset(conn, service)
+                    else:
+                        # If a fetch failed, the same records are applied again on the next sync
+                        if self._apply_history(conn, service, records):
+                            conn.execute("INSERT OR REPLACE INTO meta VALUES ('history_id', ?)", (str(history_id),))
+            self._last_sync = time.monotonic()
+
+    # --- reads ---
+
+    def _query(self, conn: sqlite3.Connection, label_ids: list, limit: int, since_date: int) -> list:
+        # Like messages().list, spam and trash are left out unless they are asked for
+        excluded = [label for label in ("SPAM", "TRASH") if label not in label_ids]
+        where = " AND ".join(["internal_date >= ?"] + ["labels LIKE ?"] * len(label_ids)
+                             + ["labels NOT LIKE ?"] * len(excluded))
+        params = [since_date] + [f"%,{label},%" for label in label_ids + excluded] + [limit]
+        return conn.execute(
+            f"SELECT id, sender, subject, body FROM messages WHERE {where} ORDER BY internal_date DESC LIMIT ?",
+            params).fetchall()
+
+    def list_messages(self, service, label_ids: list, limit: int) -> list:
+        """
+        Returns up to `limit` of the newest messages carrying all label_ids as (id, sender, subject, body)
+        tuples, newest first. Served from the cache when it covers them, otherwise listed from Gmail.
+        """
+        self.sync(service)
+        label_key = self._label_key(label_ids)
+        with self._lock, closing(self._connect()) as conn, conn:
+            covered = conn.execute("SELECT since_date FROM coverage WHERE label_key = ?", (label_key,)).fetchone()
+            if covered is not None:
+                rows = self._query(conn, label_ids, limit, covered[0])
+                # since_date 0 means every message with these labels is cached, however few there are
+                if len(rows) == limit or covered[0] == 0:
+                    self.local_hits += 1
+                    return rows
+
+            self.remote_listings += 1
+            listed = service.users().messages().list(userId="me", maxResults=limit, labelIds=label_ids).execute()
+            message_ids = [message["id"] for message in listed.get("messages", [])]
+            cached = {row[0] for row in conn.execute(
+                f"SELECT id FROM messages WHERE id IN ({','.join('?' * len(message_ids))})", message_ids)}
+            if not self._fetch_and_store(conn, service, [i for i in message_ids if i not in cached]):
+                # Don't claim coverage with messages missing; the next listing fetches them again
+                return conn.execute(
+                    f"SELECT id, sender, subject, body FROM messages WHERE id IN ({','.join('?' * len(message_ids))}) "
+                    "ORDER BY internal_date DESC", message_ids).fetchall()
+
+            if len(message_ids) < limit:
+                since_date = 0  # every message with these labels is cached now
+            else:
+                oldest = conn.execute(
+                    f"SELECT MIN(internal_date) FROM messages WHERE id IN ({','.join('?' * len(message_ids))})",
+                    message_ids).fetchone()[0]
+                since_date = oldest if oldest is not None else 0
+            if covered is None or since_date < covered[0]:
+                conn.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?)", (label_key, since_date))
+            return self._query(conn, label_ids, limit, since_date)
+
+    def get_message(self, message_id: str):
+        """Returns the cached raw Gmail message resource for message_id, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT raw FROM messages WHERE id = ?", (message_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        return {"messages": count, "local_hits": self.local_hits, "remote_listings": self.remote_listings,
+                "messages_fetched": self.messages_fetched}
+
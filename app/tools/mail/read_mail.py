@@ -1,10 +1,9 @@
-import base64
-
 from langchain_core.tools import tool
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from app.utils.google_cloud.cloud_config import get_credentials
-import streamlit as st
+from app.utils.google_cloud.service_registry import google_service
+from app.tools.mail.mailbox_cache import MailboxCache
+from app.tools.mail.email_body import extract_body, truncate_to_tokens
+from config.settings import GMAIL_BATCH_SIZE, EMAIL_BODY_MAX_TOKENS, EMAIL_FULL_BODY_MAX_TOKENS
 
 
 @tool
@@ -31,6 +30,40 @@ def list_emails_tool(limit: str, label_ids: list = None) -> str:
         print(f"Failed to retrieve emails: {str(e)}")
         return f"Failed to retrieve emails: {str(e)}"
 
+@tool
+def read_email_tool(email_id: str) -> str:
+    """
+    Retrieve the full content of one email, including the quoted earlier messages of the conversation.
+    Use it when the user wants the whole email and the listing cut its content short.
+
+    Parameters:
+    - email_id (str): The ID of the email, as shown in the email listing.
+
+    Returns:
+    - str: The sender, subject, date and full content of the email, or an error message.
+    """
+    print("Used read full email tool")
+
+    try:
+        msg_detail = mailbox_cache.get_message(email_id)
+        if msg_detail is None:
+            with google_service('gmail', 'v1') as service:
+                msg_detail = service.users().messages().get(userId='me', id=email_id, format='full').execute()
+
+        headers = msg_detail['payload'].get('headers', [])
+        sender = next((h['value'] for h in headers if h['name'] == 'From'), '(Unknown Sender)')
+        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
+        date = next((h['value'] for h in headers if h['name'] == 'Date'), '(Unknown Date)')
+        body, truncated = truncate_to_tokens(extract_body(msg_detail['payload'], strip_quotes=False),
+                                             EMAIL_FULL_BODY_MAX_TOKENS)
+        if truncated:
+            body += " [...] (the rest of this very long email was cut)"
+        return f"From: {sender}\nSubject: {subject}\nDate: {date}\nContent: {body}"
+    except HttpError as e:
+        print(f"Failed to retrieve email {email_id}: {e}")
+        return f"Failed to retrieve email {email_id}: {e}"
+
+
 def list_emails(limit: str, label_ids: list = None) -> list[str]:
     """
     Retrieves a list of emails from the Gmail inbox.
@@ -57,19 +90,10 @@ def list_emails(limit: str, label_ids: list = None) -> list[str]:
     - list[str]: A list of formatted strings, each representing an email summary.
     """
     try:
-        creds = get_credentials() # Assuming this function is defined and provides valid credentials
-        service = build('gmail', 'v1', credentials=creds)
-
         # Set default labels if none are provided
         if label_ids is None:
             label_ids = ['INBOX']
 
-        results = service.users().messages().list(
-            userId='me',
-            maxResults=int(limit),
-            labelIds=label_ids
-        ).execute()
-
         # messages = results.get('messages', [])
         # email_summaries = []
         # for msg in messages:
@@ -87,56 +111,63 @@ def list_emails(limit: str, label_ids: list = None) -> list[str]:
         #     email_summaries.append(f"From: {sender}\nSubject: {subject}\nContent: {content}")
         # return email_summaries
 
-        messages = results.get('messages', [])
+        # Served from the local mailbox cache, which only pulls changes and missing messages from Gmail
+        with google_service('gmail', 'v1') as service:
+            messages = mailbox_cache.list_messages(service, label_ids, int(limit))
         email_summaries = []
-
-        for msg in messages:
-            msg_detail = service.users().messages().get(
-                userId='me',
-                id=msg['id'],
-                # Change format to 'full' to get the entire message payload, including the body
-                format='full'
-            ).execute()
-
-            payload = msg_detail.get('payload')
-            headers = payload.get('headers', [])
-
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), '(Unknown Sender)')
-
-            email_body = ""
-            # Emails can have multiple parts (e.g., plain text, HTML, attachments)
-            parts = payload.get('parts')
-
-            if parts:
-                for part in parts:
-                    mime_type = part.get('mimeType')
-                    body = part.get('body')
-
-                    # Prioritize plain text content
-                    if mime_type == 'text/plain' and body and 'data' in body:
-                        data = body['data']
-                        decoded_bytes = base64.urlsafe_b64decode(data.encode('UTF-8'))
-                        email_body = decoded_bytes.decode('UTF-8')
-                        break  # We found the plain text body, no need to check further parts
-                    elif mime_type == 'text/html' and body and 'data' in body:
-                        # If no plain text, take the HTML. You might want to strip HTML tags later.
-                        data = body['data']
-                        decoded_bytes = base64.urlsafe_b64decode(data.encode('UTF-8'))
-                        email_body = decoded_bytes.decode('UTF-8')
-                        # Don't break here, in case there's a plain text version later in the parts
-            elif payload.get('body') and 'data' in payload['body']:
-                # Handle cases where the email body is directly in the payload (simpler emails)
-                data = payload['body']['data']
-                decoded_bytes = base64.urlsafe_b64decode(data.encode('UTF-8'))
-                email_body = decoded_bytes.decode('UTF-8')
-
-            email_summaries.append(f"From: {sender}\nSubject: {subject}\nContent: {email_body}")
-
+        for message_id, sender, subject, body in messages:
+            body, truncated = truncate_to_tokens(body, EMAIL_BODY_MAX_TOKENS)
+            if truncated:
+                body += " [...] (truncated, use read_email_tool with this ID for the full email)"
+            email_summaries.append(f"ID: {message_id}\nFrom: {sender}\nSubject: {subject}\nContent: {body}")
         return email_summaries
 
-
-
     except HttpError as error:
         print(f'An error occurred: {error}')
         return [f'An error occurred: {error}']
+
+
+def get_messages_batched(service, message_ids: list[str], message_format: str = 'full') -> list:
+    """
+    Fetches the given messages with Gmail batch requests (GMAIL_BATCH_SIZE gets per round-trip).
+    Results keep the order of message_ids; a message that fails to load is returned as its
+    exception instead of failing the whole batch.
+    """
+    results = [None] * len(message_ids)
+
+    def _on_response(request_id, response, exception):
+        results[int(request_id)] = exception if exception is not None else response
+
+    for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=_on_response)
+        for index in range(start, min(start + GMAIL_BATCH_SIZE, len(message_ids))):
+            batch.add(
+                service.users().messages().get(userId='me', id=message_ids[index], format=message_format),
+                request_id=str(index)
+            )
+        batch.execute()
+
+    return results
+
+
+def format_email_summary(msg_detail: dict) -> str:
+    """Formats a full Gmail message payload as a 'From / Subject / Content' summary."""
+    sender, subject, email_body = parse_email(msg_detail)
+    return f"From: {sender}\nSubject: {subject}\nContent: {email_body}"
+
+
+def parse_email(msg_detail: dict) -> tuple[str, str, str]:
+    """Extracts (sender, subject, body) from a full Gmail message payload, without quoted replies or signature."""
+    payload = msg_detail.get('payload')
+    headers = payload.get('headers', [])
+
+    subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
+    sender = next((h['value'] for h in headers if h['name'] == 'From'), '(Unknown Sender)')
+
+    # Prefers text/plain at any nesting depth, falls back to the HTML part converted to text
+    return sender, subject, extract_body(payload)
+
+
+# Bump PARSER_VERSION whenever parse_email changes what it returns, so cached bodies are re-parsed
+PARSER_VERSION = 2
+mailbox_cache = MailboxCache(fetch_messages=get_messages_batched, parse_message=parse_email, version=PARSER_VERSION)
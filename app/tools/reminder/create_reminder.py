@@ -1,7 +1,6 @@
-from _pydatetime import timedelta
-from app.utils.google_cloud.cloud_config import get_credentials
-from langchain.tools import tool
-from googleapiclient.discovery import build
+from app.utils.google_cloud.service_registry import google_service
+from langchain_core.tools import tool
+from app.tools.reminder.read_reminder import events_cache
 from datetime import datetime, timedelta
 import streamlit as st
 
@@ -45,14 +44,6 @@ def create_reminder_tool(summary: str = "", start_time: str = "", duration_minut
         end = start + timedelta(minutes=duration_minutes)
         print(f"📆 Calculated end_time: {end}")
 
-        print("🔐 Fetching credentials...")
-        creds = get_credentials()
-        print("✅ Credentials loaded")
-
-        print("🔧 Building Google Calendar service...")
-        service = build('calendar', 'v3', credentials=creds)
-        print("✅ Calendar service built")
-
         event = {
             'summary': summary,
             'start': {'dateTime': start.isoformat(), 'timeZone': 'UTC'},
@@ -60,8 +51,10 @@ def create_reminder_tool(summary: str = "", start_time: str = "", duration_minut
         }
 
         print("📤 Inserting event...")
-        result = service.events().insert(calendarId='primary', body=event).execute()
+        with google_service('calendar', 'v3') as service:
+            result = service.events().insert(calendarId='primary', body=event).execute()
         print(f"✅ Event inserted: {result}")
+        events_cache.invalidate()  # cached event lists may be missing the new reminder
 
         return f"✅ Reminder created successfully: {result.get('htmlLink')}"
 
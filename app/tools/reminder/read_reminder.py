@@ -1,63 +1,103 @@
-from langchain.tools import tool
-from googleapiclient.discovery import build
+from langchain_core.tools import tool
 from datetime import datetime, timedelta
 import pytz
 import streamlit as st
-from app.utils.google_cloud.cloud_config import get_credentials
+from app.utils.cache import TTLCache
+from app.utils.google_cloud.service_registry import google_service
+from config.settings import REMINDERS_CACHE_SIZE, REMINDERS_CACHE_TTL_SECONDS, REMINDERS_PAGE_SIZE, \
+    REMINDERS_MAX_RANGE_DAYS
+
+# Recent events().list pages keyed by (time_min, time_max, page_token); create_reminder_tool clears it
+events_cache = TTLCache("calendar_events", max_size=REMINDERS_CACHE_SIZE, ttl=REMINDERS_CACHE_TTL_SECONDS)
+
+
+def list_events(time_min: str, time_max: str, page_token: str = "") -> dict:
+    """
+    Returns one page of events between time_min and time_max (RFC 3339) from the primary calendar,
+    as {"items": [...], "nextPageToken": ...}, served from events_cache when it is fresh.
+    """
+    def _load() -> dict:
+        with google_service("calendar", "v3") as service:
+            result = service.events().list(
+                calendarId="primary",
+                timeMin=time_min,
+                timeMax=time_max,
+                singleEvents=True,
+                orderBy="startTime",
+                maxResults=REMINDERS_PAGE_SIZE,
+                pageToken=page_token or None
+            ).execute()
+        return {"items": result.get("items", []), "nextPageToken": result.get("nextPageToken")}
+
+    return events_cache.get_or_load((time_min, time_max, page_token), _load)
+
+
+def format_events_by_day(events: list) -> str:
+    """Groups events under a heading per day, in the order they were returned (by start time)."""
+    lines, current_day = [], None
+    for event in events:
+        start = event["start"].get("dateTime", event["start"].get("date"))
+        day = start[:10]
+        if day != current_day:
+            current_day = day
+            if lines:
+                lines.append("")
+            lines.append(f"📅 {datetime.strptime(day, '%Y-%m-%d').strftime('%A, %Y-%m-%d')}")
+        summary = event.get("summary", "No Title")
+        lines.append(f"🕒 {start}: {summary}")
+    return "\n".join(lines)
 
 
 @tool
-def read_reminders_tool(date: str = "") -> str:
+def read_reminders_tool(date: str = "", end_date: str = "", page_token: str = "") -> str:
     """
-    Reads reminders from Google Calendar on a specific date.
-    Take date and format it as required by the tool, don't ask user to format it.
+    Reads reminders from Google Calendar on a specific date, or for a whole range of days
+    (e.g. "this week") in a single call, grouped by day.
+    Take dates and format them as required by the tool, don't ask user to format them.
 
     Args:
-        date (str): Date in YYYY-MM-DD format (don't ask user to format it).
+        date (str): Date, or first date of the range, in YYYY-MM-DD format (don't ask user to format it).
+        end_date (str): Optional last date of the range (inclusive) in YYYY-MM-DD format.
+            Leave empty to read a single day.
+        page_token (str): Only to get more results, pass the page token returned by the previous call.
 
     Returns:
-        str: List of reminders or an error message.
+        str: Reminders grouped by day or an error message.
     """
     st.sidebar.info("Used read reminders tool")
-    print(f"📅 Reading reminders for date: {date}")
+    print(f"📅 Reading reminders for date: {date}" + (f" to {end_date}" if end_date else ""))
 
     try:
         # Validate date format
         try:
             query_date = datetime.strptime(date, "%Y-%m-%d")
+            last_date = datetime.strptime(end_date, "%Y-%m-%d") if end_date else query_date
         except ValueError:
             return "❌ Error: Invalid date format. Use YYYY-MM-DD."
+        if last_date < query_date:
+            return "❌ Error: end_date must not be before date."
+        if (last_date - query_date).days >= REMINDERS_MAX_RANGE_DAYS:
+            return f"❌ Error: The range can cover at most {REMINDERS_MAX_RANGE_DAYS} days."
 
         # Define time range in UTC
         tz = pytz.UTC
-        start_of_day = tz.localize(datetime(query_date.year, query_date.month, query_date.day))
-        end_of_day = start_of_day + timedelta(days=1)
-
-        creds = get_credentials()
-        service = build("calendar", "v3", credentials=creds)
+        start_of_range = tz.localize(datetime(query_date.year, query_date.month, query_date.day))
+        end_of_range = tz.localize(datetime(last_date.year, last_date.month, last_date.day)) + timedelta(days=1)
 
-        events_result = service.events().list(
-            calendarId="primary",
-            timeMin=start_of_day.isoformat(),
-            timeMax=end_of_day.isoformat(),
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-
-        events = events_result.get("items", [])
+        page = list_events(start_of_range.isoformat(), end_of_range.isoformat(), page_token)
+        events = page["items"]
         print(f"📌 Found {len(events)} reminders")
 
+        period = f"between {date} and {end_date}" if end_date else f"on {date}"
         if not events:
-            return f"No reminders found on {date}."
-
-        reminders = []
-        for event in events:
-            start = event["start"].get("dateTime", event["start"].get("date"))
-            summary = event.get("summary", "No Title")
-            reminders.append(f"🕒 {start}: {summary}")
+            return f"No reminders found {period}."
 
-        return "\n".join(reminders)
+        result = format_events_by_day(events)
+        if page["nextPageToken"]:
+            result += (f"\n\nThere are more reminders {period}, "
+                       f"call this tool again with page_token=\"{page['nextPageToken']}\" to read them.")
+        return result
 
     except Exception as e:
         print(f"❌ Unexpected error: {str(e)}")
-        return f"❌ Unexpected error: {str(e)}"
\ No newline at end of file
+        return f"❌ Unexpected error: {str(e)}"
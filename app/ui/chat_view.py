@@ -0,0 +1,98 @@
+import hashlib
+
+import streamlit as st
+
+from app.tools.general_chat.image_tool import split_cached_images, image_jobs
+from app.utils.cache import TTLCache
+from app.utils.voice.tts import speak_with_groq
+from config.settings import agent_image, user_image, CHAT_PAGE_SIZE, CHAT_RENDER_CACHE_SIZE, \
+    IMAGE_JOB_POLL_SECONDS, ACTIVITY_LOG_PAGE_SIZE
+
+# Parsed parts of each assistant message (markdown and image parts) by content hash, so a rerun
+# doesn't scan every message for images and check the image cache on disk again
+rendered_messages = TTLCache("rendered_messages", max_size=CHAT_RENDER_CACHE_SIZE, ttl=24 * 3600)
+
+
+def message_parts(content: str) -> list:
+    """split_cached_images(content), cached once no image in it is still generating."""
+    key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    parts = rendered_messages.get(key)
+    if parts is None:
+        parts = split_cached_images(content)
+        if not any(part_type == "image_job" for part_type, _ in parts):
+            rendered_messages.set(key, parts)
+    return parts
+
+
+def reset_chat_view() -> None:
+    """Shows only the latest page of messages again, e.g. after switching to another chat."""
+    st.session_state["chat_visible_messages"] = CHAT_PAGE_SIZE
+    st.session_state["activity_log_expanded"] = False
+
+
+@st.fragment(run_every=IMAGE_JOB_POLL_SECONDS)
+def render_image_job(job_id: str):
+    """Placeholder for an image still generating in the background; polls until the job finishes."""
+    job = image_jobs.get(job_id)
+    if job is None or job.finished:
+        st.rerun()  # full rerun renders the finished image (or its error) in place
+    st.info("🎨 Generating image...")
+
+
+def render_message(index: int, message: dict) -> None:
+    if message["role"] == "user":
+        with st.chat_message("user", avatar=user_image):
+            st.markdown(message["content"])
+        return
+
+    with st.chat_message("assistant", avatar=agent_image):
+        col1, col2 = st.columns([10, 1])  # 10:1 ratio for message and button
+        with col1:
+            # Images already in the local image cache are served from disk
+            for part_type, part in message_parts(message["content"]):
+                if part_type == "image":
+                    st.image(part)
+                elif part_type == "image_job":
+                    render_image_job(part)
+                else:
+                    st.markdown(part)
+        with col2:
+            if st.button("🔈", key=f"speak_{index}", help="Speak this message"):
+                speak_with_groq(message["content"])
+                st.rerun()  # the speech player lives outside this fragment
+
+
+def _load_earlier() -> None:
+    st.session_state["chat_visible_messages"] += CHAT_PAGE_SIZE
+
+
+@st.fragment
+def chat_history_view():
+    """
+    The chat pane: the last chat_visible_messages messages of the chat, with a button that loads
+    CHAT_PAGE_SIZE earlier ones. Being a fragment, its own buttons only rerun this pane.
+    """
+    history = st.session_state["chat_history"]
+    visible = st.session_state.setdefault("chat_visible_messages", CHAT_PAGE_SIZE)
+    start = max(0, len(history) - visible)
+    if start:
+        st.button(f"⬆️ Load earlier messages ({start} more)", key="load_earlier_messages", on_click=_load_earlier)
+    for index in range(start, len(history)):
+        render_message(index, history[index])
+
+
+def _toggle_activity_log() -> None:
+    st.session_state["activity_log_expanded"] = not st.session_state.get("activity_log_expanded", False)
+
+
+@st.fragment
+def activity_log_view():
+    """The latest ACTIVITY_LOG_PAGE_SIZE entries of the agent activity log, newest last, the rest on demand."""
+    log = st.session_state["active_agent_log"]
+    expanded = st.session_state.get("activity_log_expanded", False)
+    hidden = 0 if expanded else max(0, len(log) - ACTIVITY_LOG_PAGE_SIZE)
+    if hidden or expanded and len(log) > ACTIVITY_LOG_PAGE_SIZE:
+        st.button(f"Show all ({hidden} earlier)" if hidden else "Show fewer", key="toggle_activity_log",
+                  on_click=_toggle_activity_log)
+    for entry in log[hidden:]:
+        st.info(entry)
@@ -0,0 +1,102 @@
+import uuid
+
+import streamlit as st
+
+from app.history.chat_history import save_chat_session, load_chat_session, get_saved_sessions, delete_chat_session, \
+    count_saved_sessions
+from app.ui.chat_view import reset_chat_view
+from config.settings import SESSIONS_PAGE_SIZE
+
+
+def save_current_session() -> None:
+    """Saves the current chat, if it has any messages."""
+    if st.session_state["chat_history"]:
+        save_chat_session(
+            st.session_state["chat_history"],
+            st.session_state["active_agent_log"],
+            st.session_state["current_session_id"]
+        )
+
+
+def switch_session(chat_history: list, agent_log: list, session_id: str) -> None:
+    """Makes the given chat the current one (its LangGraph thread ID is the session ID)."""
+    st.session_state["chat_history"] = chat_history
+    st.session_state["active_agent_log"] = agent_log
+    st.session_state["current_session_id"] = session_id
+    st.session_state["thread_id"] = session_id
+    reset_chat_view()
+
+
+def _change_page(step: int) -> None:
+    st.session_state["sessions_page"] += step
+
+
+@st.fragment
+def saved_sessions_view(checkpointer):
+    """
+    The sidebar's chat sessions: new chat, the current page of saved chats and delete confirmation.
+    Paging only reruns this fragment; opening, starting or deleting a chat reruns the whole app.
+    Call it inside `with st.sidebar:`.
+    """
+    # Button to start a new chat
+    if st.button("➕ Start New Chat", key="new_chat_button", use_container_width=True):
+        # Save current session before starting a new one, if it has content
+        save_current_session()
+        switch_session([], [], str(uuid.uuid4()))
+        st.rerun()  # Rerun to clear chat and load new session
+
+    # Only the current page of saved chats is read from the session index
+    sessions_page_count = max(1, -(-count_saved_sessions() // SESSIONS_PAGE_SIZE))
+    st.session_state["sessions_page"] = min(st.session_state["sessions_page"], sessions_page_count - 1)
+    saved_sessions = get_saved_sessions(limit=SESSIONS_PAGE_SIZE,
+                                        offset=st.session_state["sessions_page"] * SESSIONS_PAGE_SIZE)
+
+    if saved_sessions:
+        st.subheader("Saved Chats")
+        # Iterate with an index to ensure unique keys for buttons
+        for i, (file_path, display_name, session_id) in enumerate(saved_sessions):
+            col1, col2 = st.columns([1, 0.2])
+
+            if col1.button(display_name, key=f"load_{session_id}__{i}", use_container_width=True):
+                # Save current session if it has content before loading new one
+                if st.session_state["current_session_id"] != session_id:
+                    save_current_session()
+
+                loaded_data = load_chat_session(file_path)
+                switch_session(loaded_data["chat_history"], loaded_data["agent_log"], loaded_data["id"])
+                st.rerun()  # Rerun to display loaded chat
+
+            if col2.button("🗑️", key=f"delete_{session_id}__{i}"):
+                st.session_state["confirm_delete"] = file_path  # Store path for confirmation
+                st.session_state["confirm_delete_id"] = session_id  # Store ID for confirmation message
+
+        if sessions_page_count > 1:
+            col_prev, col_page, col_next = st.columns([1, 1, 1])
+            col_prev.button("◀", key="sessions_prev", disabled=st.session_state["sessions_page"] == 0,
+                            on_click=_change_page, args=(-1,))
+            col_page.caption(f"{st.session_state['sessions_page'] + 1} / {sessions_page_count}")
+            col_next.button("▶", key="sessions_next",
+                            disabled=st.session_state["sessions_page"] >= sessions_page_count - 1,
+                            on_click=_change_page, args=(1,))
+
+    # Confirmation for deletion
+    if st.session_state.get("confirm_delete"):
+        file_to_delete = st.session_state["confirm_delete"]
+        session_id_to_delete = st.session_state["confirm_delete_id"]
+        st.warning(f"Are you sure you want to delete chat session {session_id_to_delete[:8]}...?")
+        col_confirm_yes, col_confirm_no = st.columns(2)
+
+        # Ensure confirmation buttons also have unique keys
+        if col_confirm_yes.button("Yes, Delete", key=f"confirm_yes_{session_id_to_delete}"):
+            delete_chat_session(file_to_delete)
+            checkpointer.delete_thread(session_id_to_delete)  # thread_id == session_id
+            # If current session was deleted, start a new one
+            if st.session_state["current_session_id"] == session_id_to_delete:
+                switch_session([], [], str(uuid.uuid4()))
+            del st.session_state["confirm_delete"]
+            del st.session_state["confirm_delete_id"]
+            st.rerun()
+        if col_confirm_no.button("No, Cancel", key=f"confirm_no_{session_id_to_delete}"):
+            del st.session_state["confirm_delete"]
+            del st.session_state["confirm_delete_id"]
+            st.rerun(scope="fragment")
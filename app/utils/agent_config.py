@@ -1,14 +1,63 @@
-from langgraph.checkpoint.memory import InMemorySaver
-from langgraph_swarm import create_swarm
+import threading
+from concurrent.futures import Future
 
+from app.utils.checkpointer import get_checkpointer
 
-def create_and_compile_swarm(agents, default_active_agent_name):
+
+def create_and_compile_swarm(registry, default_active_agent_name, checkpointer=None):
     """
     Creates and compiles the LangGraph swarm workflow.
-    Requires a list of agents and the name of the default active agent.
+    Requires an AgentRegistry and the name of the default active agent.
+    Each agent is a node that builds the agent on its first activation, so compiling the
+    swarm doesn't build (or import) any of them; call registry.warm_up() to build them ahead.
+    The checkpointer backend comes from CHECKPOINTER_BACKEND in the settings.
     """
-    checkpointer = InMemorySaver()
-    workflow = create_swarm(agents, default_active_agent=default_active_agent_name)
+    # LangGraph's graph modules are only imported here, so BackgroundSwarm keeps them off the page render
+    from langgraph.graph import StateGraph
+    from langgraph_swarm import SwarmState, add_active_agent_router
+
+    checkpointer = checkpointer or get_checkpointer()
+    workflow = StateGraph(SwarmState)
+    add_active_agent_router(workflow, route_to=registry.names, default_active_agent=default_active_agent_name)
+    for name in registry.names:
+        workflow.add_node(name, registry.node(name), destinations=registry.handoffs(name))
     app = workflow.compile(checkpointer=checkpointer)
     return app, checkpointer
 
+
+class BackgroundSwarm:
+    """
+    The swarm app, compiled on a background thread once start() is called (e.g. after the first
+    page render), which then builds the agents too. The checkpointer is available right away.
+    """
+
+    def __init__(self, registry, default_active_agent_name):
+        self.registry = registry
+        self.default_active_agent_name = default_active_agent_name
+        self.checkpointer = get_checkpointer()
+        self._app = Future()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _compile(self) -> None:
+        try:
+            app, _ = create_and_compile_swarm(self.registry, self.default_active_agent_name, self.checkpointer)
+            self._app.set_result(app)
+        except Exception as e:
+            print(f"Error compiling the swarm: {e}")
+            self._app.set_exception(e)
+            return
+        self.registry.warm_up(first=self.default_active_agent_name).join()
+
+    def start(self) -> threading.Thread:
+        """Starts compiling (once); returns the background thread."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._compile, name="swarm-compile", daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def app(self, timeout: float = None):
+        """The compiled swarm app, waiting for the compilation (and starting it, if needed)."""
+        self.start()
+        return self._app.result(timeout)
@@ -0,0 +1,219 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Every cache registers itself here so its counters can be shown in one place
+_caches = []
+# Background refreshes for stale-while-revalidate
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    get_or_load() adds two things on top of plain get/set:
+    - stale-while-revalidate: for `stale_ttl` seconds after expiry the old value is still
+      returned immediately while a background refresh fetches a new one;
+    - request coalescing: concurrent misses for the same key share a single loader call.
+
+    With `persist_path` set, entries (which must be JSON-serializable, with string keys) are
+    also written to that file and loaded back on start-up, so they survive restarts. Changes
+    mark the cache dirty and are written `write_delay` seconds later, so a burst of sets costs a
+    single write; flush() writes them immediately (and runs at exit).
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float, stale_ttl: float = 0, persist_path: str = None,
+                 write_delay: float = 2):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.persist_path = persist_path
+        self.write_delay = write_delay
+        self._entries = OrderedDict()  # key -> (value, stored_at wall-clock time)
+        self._in_flight = {}  # key -> Future
+        self._generation = 0  # bumped by invalidate(), so loads started before it aren't stored
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # serializes file writes, which happen outside _lock
+        self._dirty = False
+        self._timer = None
+        self.writes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        if persist_path:
+            self._load_from_disk()
+            atexit.register(self.flush)
+        _caches.append(self)
+
+    def _load_from_disk(self) -> None:
+        try:
+            with open(self.persist_path, "r") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable cache file {self.persist_path}: {e}")
+            return
+        now = time.time()
+        for key, value, stored_at in entries[-self.max_size:]:
+            if now - stored_at <= self.ttl + self.stale_ttl:
+                self._entries[key] = (value, stored_at)
+
+    def _mark_dirty(self) -> None:
+        """Schedules a write of the entries after write_delay seconds. Caller holds the lock."""
+        if not self.persist_path:
+            return
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """
+        Writes all entries to persist_path if anything changed since the last write
+        (tmp file + os.replace, so readers never see half a file).
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                entries = [[key, value, stored_at] for key, (value, stored_at) in self._entries.items()]
+
+            tmp_path = self.persist_path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.persist_path) or ".", exist_ok=True)
+                with open(tmp_path, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.persist_path)
+                self.writes += 1
+            except (OSError, TypeError) as e:
+                print(f"Warning: Could not persist cache {self.name}: {e}")
+                with self._lock:
+                    self._mark_dirty()  # retry later
+
+    def _lookup(self, key):
+        """Returns (value, age) or None. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.time() - entry[1]
+        if age > self.ttl + self.stale_ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0], age
+
+    def get(self, key, default=None):
+        """Returns the cached value if it is still fresh, otherwise default."""
+        with self._lock:
+            found = self._lookup(key)
+            if found is not None and found[1] <= self.ttl:
+                self.hits += 1
+                return found[0]
+            self.misses += 1
+            return default
+
+    def _store(self, key, value) -> None:
+        """Caller holds the lock."""
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._mark_dirty()
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key=None) -> None:
+        """
+        Drops one key, or every entry when key is None. Loads already running for them are
+        detached: later lookups start a new load, and the old results are not stored.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._in_flight.clear()
+            else:
+                self._entries.pop(key, None)
+                self._in_flight.pop(key, None)
+            self._mark_dirty()
+
+    def _load(self, key, loader, future: Future, generation: int):
+        try:
+            value = loader()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            with self._lock:
+                if self._generation == generation:
+                    self._store(key, value)
+            future.set_result(value)
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    def get_or_load(self, key, loader):
+        """Returns the cached value for key, calling loader() to fetch it when needed."""
+        with self._lock:
+            found = self._lookup(key)
+            if found is not None and found[1] <= self.ttl:
+                self.hits += 1
+                return found[0]
+
+            future = self._in_flight.get(key)
+            if found is not None:
+                # Stale but usable: answer now, refresh in the background (once per key)
+                self.stale_hits += 1
+                if future is None:
+                    self._in_flight[key] = future = Future()
+                    _refresh_executor.submit(self._load, key, loader, future, self._generation)
+                return found[0]
+
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                self._in_flight[key] = future = Future()
+                owner = True
+            generation = self._generation
+
+        if owner:
+            self._load(key, loader, future, generation)
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.stale_hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+
+def get_all_cache_stats() -> list[dict]:
+    """Returns stats() of every cache created in this process."""
+    return [cache.stats() for cache in _caches]
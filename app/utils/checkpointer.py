@@ -0,0 +1,223 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from config.settings import CHECKPOINTER_BACKEND, CHECKPOINT_DB_PATH, CHECKPOINT_RETENTION_DEPTH, \
+    CHECKPOINT_MAX_THREADS
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    """
+    SQLite checkpointer that survives restarts and stays bounded:
+    only the newest `retention_depth` checkpoints of each thread are kept, and once more than
+    `max_threads` threads are stored the least recently used (cold) ones are evicted.
+
+    Retention is counted on the thread's root namespace. Every agent run writes its own subgraph
+    namespace ("<Agent>:<task_id>") after the root checkpoint it started from, so subgraph rows
+    older than the oldest root checkpoint kept belong to expired steps and are dropped with them.
+    Newer ones (e.g. of the step already running while its root checkpoint is saved) are kept.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, retention_depth: int, max_threads: int):
+        super().__init__(conn)
+        self.retention_depth = retention_depth
+        self.max_threads = max_threads
+        self.evicted_threads = 0
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_access (thread_id TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def _touch(self, cur: sqlite3.Cursor, thread_id: str) -> None:
+        cur.execute("INSERT OR REPLACE INTO thread_access (thread_id, last_access) VALUES (?, ?)",
+                    (thread_id, time.time()))
+
+    def get_tuple(self, config):
+        checkpoint_tuple = super().get_tuple(config)
+        if checkpoint_tuple is not None:
+            with self.cursor() as cur:
+                self._touch(cur, str(config["configurable"]["thread_id"]))
+        return checkpoint_tuple
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+
+        with self.cursor() as cur:
+            self._touch(cur, thread_id)
+            if checkpoint_ns == "":
+                self._prune(cur, thread_id)
+
+            cur.execute("SELECT thread_id FROM thread_access ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+                        (self.max_threads,))
+            cold_threads = [row[0] for row in cur.fetchall()]
+            for cold_thread in cold_threads:
+                cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (cold_thread,))
+                cur.execute("DELETE FROM writes WHERE thread_id = ?", (cold_thread,))
+                cur.execute("DELETE FROM thread_access WHERE thread_id = ?", (cold_thread,))
+            self.evicted_threads += len(cold_threads)
+
+        return saved_config
+
+    def _prune(self, cur: sqlite3.Cursor, thread_id: str) -> None:
+        """Drops root checkpoints past the retention depth and the subgraph rows of their steps."""
+        # Checkpoint ids are time-ordered, so everything past the newest N is old history
+        cur.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, self.retention_depth)
+        )
+        expired = [(thread_id, row[0]) for row in cur.fetchall()]
+        if expired:
+            cur.executemany(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id = ?", expired)
+            cur.executemany(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id = ?", expired)
+
+        oldest_kept = cur.execute("SELECT MIN(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ''",
+                                  (thread_id,)).fetchone()[0]
+        if oldest_kept is not None:
+            cur.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns != '' AND checkpoint_id < ?",
+                        (thread_id, oldest_kept))
+            cur.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns != '' AND checkpoint_id < ?",
+                        (thread_id, oldest_kept))
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_access WHERE thread_id = ?", (str(thread_id),))
+
+    def get_metrics(self) -> dict:
+        """Returns thread/checkpoint counts and the on-disk size of the store."""
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute("SELECT COUNT(*) FROM thread_access").fetchone()[0]
+            checkpoints = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            writes = cur.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+            page_count = cur.execute("PRAGMA page_count").fetchone()[0]
+            page_size = cur.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "bytes": page_count * page_size,
+            "evicted_threads": self.evicted_threads,
+        }
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """
+    In-memory checkpointer with the same bounds as BoundedSqliteSaver: a per-thread
+    retention depth (subgraph checkpoints dropped with the steps that wrote them) and LRU
+    eviction of threads beyond `max_threads`. State is lost on restart.
+    """
+
+    def __init__(self, retention_depth: int, max_threads: int):
+        super().__init__()
+        self.retention_depth = retention_depth
+        self.max_threads = max_threads
+        self.evicted_threads = 0
+        self._lru = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _touch(self, thread_id: str) -> None:
+        self._lru[thread_id] = None
+        self._lru.move_to_end(thread_id)
+
+    def get_tuple(self, config):
+        with self._lock:
+            checkpoint_tuple = super().get_tuple(config)
+            if checkpoint_tuple is not None:
+                self._touch(config["configurable"]["thread_id"])
+            return checkpoint_tuple
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            saved_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            self._touch(thread_id)
+            if config["configurable"]["checkpoint_ns"] == "":
+                self._prune(thread_id)
+
+            while len(self._lru) > self.max_threads:
+                cold_thread, _ = self._lru.popitem(last=False)
+                super().delete_thread(cold_thread)
+                self.evicted_threads += 1
+            return saved_config
+
+    def _prune(self, thread_id: str) -> None:
+        """
+        Drops root checkpoints past the retention depth and the subgraph checkpoints of their
+        steps (see BoundedSqliteSaver), with their writes and the channel blobs nothing references anymore.
+        """
+        namespaces = self.storage[thread_id]
+        root = namespaces[""]
+        for checkpoint_id in sorted(root)[:-self.retention_depth]:
+            del root[checkpoint_id]
+            self.writes.pop((thread_id, "", checkpoint_id), None)
+
+        oldest_kept = min(root, default=None)
+        for checkpoint_ns in [ns for ns in namespaces if ns != ""]:
+            checkpoints = namespaces[checkpoint_ns]
+            for checkpoint_id in [i for i in checkpoints if oldest_kept is not None and i < oldest_kept]:
+                del checkpoints[checkpoint_id]
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            if not checkpoints:
+                del namespaces[checkpoint_ns]
+
+        referenced = set()
+        for checkpoint_ns, checkpoints in namespaces.items():
+            for serialized_checkpoint, _, _ in checkpoints.values():
+                channel_versions = self.serde.loads_typed(serialized_checkpoint)["channel_versions"]
+                referenced.update((checkpoint_ns, channel, version) for channel, version in channel_versions.items())
+        for key in [k for k in self.blobs if k[0] == thread_id]:
+            if key[1:] not in referenced:
+                del self.blobs[key]
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._lru.pop(thread_id, None)
+
+    def get_metrics(self) -> dict:
+        """Returns thread/checkpoint counts and the approximate serialized size held in memory."""
+        with self._lock:
+            checkpoints = sum(len(c) for namespaces in self.storage.values() for c in namespaces.values())
+            size = sum(len(data) for _, data in self.blobs.values())
+            size += sum(len(c[1]) + len(m[1]) for namespaces in self.storage.values()
+                        for ns in namespaces.values() for c, m, _ in ns.values())
+            return {
+                "backend": "memory",
+                "threads": len(self._lru),
+                "checkpoints": checkpoints,
+                "writes": len(self.writes),
+                "bytes": size,
+                "evicted_threads": self.evicted_threads,
+            }
+
+
+def get_checkpointer(backend: str = CHECKPOINTER_BACKEND):
+    """Creates the checkpointer configured by CHECKPOINTER_BACKEND ('sqlite' or 'memory')."""
+    if backend == "sqlite":
+        os.makedirs(os.path.dirname(CHECKPOINT_DB_PATH) or ".", exist_ok=True)
+        # The saver serializes access with its own lock, so the connection can be shared across threads
+        conn = sqlite3.connect(CHECKPOINT_DB_PATH, check_same_thread=False)
+        return BoundedSqliteSaver(conn, CHECKPOINT_RETENTION_DEPTH, CHECKPOINT_MAX_THREADS)
+    if backend == "memory":
+        return BoundedInMemorySaver(CHECKPOINT_RETENTION_DEPTH, CHECKPOINT_MAX_THREADS)
+    raise ValueError(f"Unknown checkpointer backend: {backend}")
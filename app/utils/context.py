@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+
+from app.utils.profile_store import profile_store, get_user_id, format_profile
+from config.settings import MAX_CONTEXT_TOKENS, CONTEXT_SUMMARIZATION, CONTEXT_SUMMARY_MAX_TOKENS, \
+    MAX_PREVIOUS_MESSAGES_FOR_CONTEXT
+
+SUMMARY_PROMPT = """Summarize the conversation below between a user and an assistant in a few sentences.
+Keep names, email addresses, dates, times and any decisions or pending requests.
+
+{previous_summary}{transcript}"""
+
+# Summaries of the messages that no longer fit the budget, so a summary is only extended
+# when more messages fall out of the window: {first_dropped_id: (last_dropped_id, summary)}
+_summaries = OrderedDict()
+_summaries_lock = threading.Lock()
+_MAX_CACHED_SUMMARIES = 256
+
+
+def build_invoke_messages(app, thread_id: str, chat_history: list) -> list:
+    """
+    Returns the messages to pass to app.invoke for the newest user message in chat_history.
+    Normally only that message is sent and the rest comes from the checkpointed thread state;
+    if the thread has no state (e.g. it was evicted) the recent chat history is sent to seed it.
+    """
+    latest = chat_history[-1]
+    state = app.get_state({"configurable": {"thread_id": thread_id}})
+    if state.values.get("messages"):
+        return [HumanMessage(content=latest["content"])]
+
+    messages = []
+    for msg in chat_history[-MAX_PREVIOUS_MESSAGES_FOR_CONTEXT:]:
+        if msg["role"] == "user":
+            messages.append(HumanMessage(content=msg["content"]))
+        elif msg["role"] == "assistant":
+            messages.append(AIMessage(content=msg["content"]))
+    return messages
+
+
+def make_profile_prompt(instructions: str):
+    """
+    Builds a create_react_agent prompt that appends the current user's stored profile (looked up
+    in the profile store by configurable.user_id) to the agent's instructions, so no agent has to
+    call get_user_info or hand off to Charlie just to know who it is talking to.
+    """
+
+    def prompt(state: dict, config) -> list:
+        profile = profile_store.get(get_user_id(config))
+        if profile:
+            profile_text = f"\n\nThe user's stored profile:\n{format_profile(profile)}"
+        else:
+            profile_text = "\n\nNo personal information is stored for this user yet."
+        return [SystemMessage(content=instructions + profile_text)] + state["messages"]
+
+    return prompt
+
+
+def _summarize(summarizer, dropped: list) -> str:
+    """Summarizes the dropped messages, extending a cached summary of an earlier prefix when possible."""
+    key = dropped[0].id
+    with _summaries_lock:
+        cached = _summaries.get(key)
+
+    previous_summary, new_messages = "", dropped
+    if cached is not None:
+        last_id, summary = cached
+        ids = [m.id for m in dropped]
+        if last_id == ids[-1]:
+            return summary
+        if last_id in ids:
+            previous_summary = f"Summary so far: {summary}\n\n"
+            new_messages = dropped[ids.index(last_id) + 1:]
+
+    transcript = "\n".join(f"{m.type}: {m.content}" for m in new_messages if m.content)
+    response = summarizer.invoke(SUMMARY_PROMPT.format(previous_summary=previous_summary, transcript=transcript))
+    summary = response.content
+
+    with _summaries_lock:
+        _summaries[key] = (dropped[-1].id, summary)
+        _summaries.move_to_end(key)
+        while len(_summaries) > _MAX_CACHED_SUMMARIES:
+            _summaries.popitem(last=False)
+    return summary
+
+
+def make_context_trimmer(max_tokens: int = MAX_CONTEXT_TOKENS, summarizer=None):
+    """
+    Builds a pre_model_hook for create_react_agent that keeps the model input within max_tokens.
+    The newest messages that fit are kept (starting on a user turn so tool calls stay paired);
+    older ones are replaced by a running summary when CONTEXT_SUMMARIZATION is on.
+    The checkpointed thread state itself is left untouched.
+    """
+
+    def trim_context(state: dict) -> dict:
+        nonlocal summarizer
+        messages = state["messages"]
+        if count_tokens_approximately(messages) <= max_tokens:
+            return {"llm_input_messages": messages}
+
+        budget = max_tokens - (CONTEXT_SUMMARY_MAX_TOKENS if CONTEXT_SUMMARIZATION else 0)
+        kept = trim_messages(
+            messages,
+            max_tokens=budget,
+            strategy="last",
+            token_counter=count_tokens_approximately,
+            start_on="human",
+            allow_partial=False,
+        )
+        if not kept:
+            kept = messages[-1:]  # a single oversized message still has to go through
+        dropped = messages[:len(messages) - len(kept)]
+        if not CONTEXT_SUMMARIZATION or not dropped:
+            return {"llm_input_messages": kept}
+
+        if summarizer is None:
+            from app.utils.llm import get_llm
+            summarizer = get_llm("summarizer")
+        try:
+            summary = _summarize(summarizer, dropped)
+        except Exception as e:
+            print(f"Failed to summarize earlier conversation: {e}")
+            return {"llm_input_messages": kept}
+        return {"llm_input_messages": [SystemMessage(content=f"Summary of the earlier conversation: {summary}")] + kept}
+
+    return trim_context
@@ -0,0 +1,147 @@
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+from langchain_core.messages import AIMessage
+
+from app.utils.metrics import LatencyStats
+from app.utils.streaming import turn_latency_stats
+from config.settings import FAST_PATH_ENABLED, FAST_PATH_INTENTS, FAST_PATH_MAX_EMAILS
+
+# Only whole messages that match one of these exactly are answered without the agents, so
+# anything with extra conditions ("weather in lahore tomorrow", "emails from bob") falls through.
+_CITY = r"(?P<city>[a-z][a-z .'-]{1,40}?)"
+_DATE = r"(?P<date>\d{4}-\d{2}-\d{2}|today|tomorrow)"
+_PATTERNS = {
+    "weather": [
+        re.compile(rf"^(?:(?:what(?:'s| is) the |how(?:'s| is) the |current )?weather(?: like)? (?:in|for|at) {_CITY}"
+                   rf"(?: (?:right )?now| today)?)$"),
+        re.compile(rf"^{_CITY} weather(?: (?:right )?now| today)?$"),
+    ],
+    "reminders": [
+        re.compile(rf"^(?:what(?:'s| is) on my (?:calendar|schedule|agenda)|(?:show |list |read )?(?:me )?my "
+                   rf"(?:reminders|events|schedule|agenda)|(?:do i have )?any reminders|what reminders do i have)"
+                   rf"(?: (?:on|for))? {_DATE}$"),
+    ],
+    "emails": [
+        re.compile(r"^(?:(?:do i have )?any (?P<unread>new |unread )?e-?mails|check my (?:inbox|e-?mails?))$"),
+        re.compile(r"^(?:show|list|read|get)(?: me)? my (?:last |latest )?(?P<limit>\d{1,2} )?(?P<unread>new |unread )?"
+                   r"e-?mails$"),
+    ],
+}
+# Words that would change the answer but that the patterns above could capture as part of a city
+_NOT_A_CITY = re.compile(r"\b(tomorrow|tonight|yesterday|week|weekend|next|forecast|and|or)\b")
+
+
+class FastPathStats:
+    """Counts fast-path hits per intent and misses, and times the turns it answered."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = {intent: 0 for intent in _PATTERNS}
+        self.misses = 0
+        self.latency = LatencyStats()
+
+    def record(self, intent) -> None:
+        with self._lock:
+            if intent is None:
+                self.misses += 1
+            else:
+                self.hits[intent] += 1
+
+    def snapshot(self) -> dict:
+        """Hits, hit rate, fast-path latency and the time saved against the median agent turn."""
+        with self._lock:
+            hits, misses = dict(self.hits), self.misses
+        total_hits = sum(hits.values())
+        latency, agent_turns = self.latency.snapshot(), turn_latency_stats.snapshot()
+        saved_ms = max(0.0, agent_turns["p50_ms"] - latency["p50_ms"]) * total_hits if agent_turns["count"] else 0.0
+        return {"hits": hits, "misses": misses, "hit_rate": total_hits / (total_hits + misses) if total_hits else 0.0,
+                "latency": latency, "saved_ms": saved_ms}
+
+
+fast_path_stats = FastPathStats()
+
+
+def _normalize(text: str) -> str:
+    text = " ".join(text.lower().split()).strip(" ?!.")
+    return text.removeprefix("please ").removesuffix(" please").strip(" ,?!.")
+
+
+def _markdown_lines(text: str) -> str:
+    """Keeps the tool output's line breaks when the answer is rendered as markdown."""
+    return text.replace("\n", "  \n")
+
+
+# Each handler imports its tool when it first runs, so the fast path doesn't pull every
+# tool module (and its API client) into the app's startup
+def _weather(match, config: dict) -> tuple:
+    from app.tools.general_chat.weather_tool import get_weather_by_city
+
+    city = match["city"].strip(" ,")
+    if _NOT_A_CITY.search(city):
+        return None
+    output = get_weather_by_city.invoke({"city_name": city}, config)
+    if not output.startswith("Weather in"):
+        return None  # unknown city or API error, let Charlie deal with it
+    return "Charlie", f"☀️ {output}"
+
+
+def _reminders(match, config: dict) -> tuple:
+    from app.tools.reminder.read_reminder import read_reminders_tool
+
+    day = {"today": date.today(), "tomorrow": date.today() + timedelta(days=1)}.get(match["date"])
+    day = day.isoformat() if day else match["date"]
+    output = read_reminders_tool.invoke({"date": day}, config)
+    if output.startswith("No reminders found"):
+        return "Bravo", f"You have no reminders on {day}. 🎉"
+    if output.startswith("❌"):
+        return None
+    return "Bravo", f"Here are your reminders for {day} ⏰\n\n{_markdown_lines(output)}"
+
+
+def _emails(match, config: dict) -> tuple:
+    from app.tools.mail.read_mail import list_emails_tool
+
+    limit = min(int(match.groupdict().get("limit") or 5), FAST_PATH_MAX_EMAILS)
+    label_ids = ["INBOX", "UNREAD"] if match["unread"] else ["INBOX"]
+    output = list_emails_tool.invoke({"limit": str(limit), "label_ids": label_ids}, config)
+    if output.startswith("No emails found"):
+        return "Alpha", "📭 No emails found, your inbox is all caught up!"
+    if output.startswith(("Failed", "An error occurred")):
+        return None
+    return "Alpha", f"📧 Here are your latest emails:\n\n{_markdown_lines(output)}"
+
+
+_HANDLERS = {"weather": _weather, "reminders": _reminders, "emails": _emails}
+
+
+def try_fast_path(app, config: dict, messages: list, text: str, previous_reply: str = ""):
+    """
+    Answers a simple single-tool request (see FAST_PATH_INTENTS) by calling the tool directly and
+    filling in a template, with no model call. The turn (messages, which end with the user's
+    message, plus the answer) is appended to the thread with app.update_state, and the agent
+    that owns the tool becomes the active agent, so follow-up questions work as usual. The tool
+    runs with config too, so a turn tracer in its callbacks records the call.
+    Returns (intent, answer) or None when the request should go to the agents.
+    """
+    if not FAST_PATH_ENABLED or previous_reply.rstrip().endswith("?"):
+        return None
+
+    started = time.perf_counter()
+    normalized = _normalize(text)
+    for intent in FAST_PATH_INTENTS:
+        match = next((m for m in (p.match(normalized) for p in _PATTERNS[intent]) if m), None)
+        result = _HANDLERS[intent](match, config) if match else None
+        if result is None:
+            continue
+        agent, answer = result
+        app.update_state(config, {"messages": messages + [AIMessage(content=answer, name=agent)],
+                                  "active_agent": agent}, as_node=agent)
+        fast_path_stats.latency.record(time.perf_counter() - started)
+        fast_path_stats.record(intent)
+        return intent, answer
+
+    fast_path_stats.record(None)
+    return None
@@ -1,20 +1,112 @@
+import threading
+import time
+from datetime import datetime, timezone
+
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 import os
 from google.auth.transport.requests import Request
-from config.settings import GOOGLE_SCOPES
+from config.settings import GOOGLE_SCOPES, CREDENTIAL_REFRESH_MARGIN_SECONDS
 
+TOKEN_FILE = 'token.json'
+CLIENT_SECRET_FILE = 'client_secret.json'
 
-def get_credentials():
+_creds_lock = threading.RLock()
+_cached_creds = None
+_cached_token_mtime = None
+_credentials_version = 0
+_refresher_thread = None
+
+
+def _token_mtime():
+    try:
+        return os.stat(TOKEN_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _save_token(creds):
+    global _cached_token_mtime
+    with open(TOKEN_FILE, 'w') as token:
+        token.write(creds.to_json())
+    _cached_token_mtime = _token_mtime()
+
+
+def _load_credentials():
     creds = None
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', GOOGLE_SCOPES)
+    if os.path.exists(TOKEN_FILE):
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE, GOOGLE_SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
         else:
-            flow = InstalledAppFlow.from_client_secrets_file('client_secret.json', GOOGLE_SCOPES)
+            flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_FILE, GOOGLE_SCOPES)
             creds = flow.run_local_server(port=0)
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
-    return creds
\ No newline at end of file
+        _save_token(creds)
+    return creds
+
+
+def _seconds_until_refresh(creds) -> float:
+    """Seconds until the credentials should be refreshed (negative means overdue)."""
+    if not creds.expiry:
+        return float('inf')
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth keeps expiry as naive UTC
+    return (creds.expiry - now).total_seconds() - CREDENTIAL_REFRESH_MARGIN_SECONDS
+
+
+def _refresh_loop():
+    """Background loop that refreshes the cached credentials shortly before they expire."""
+    while True:
+        with _creds_lock:
+            creds = _cached_creds
+        if creds is None or not creds.refresh_token:
+            time.sleep(60)
+            continue
+
+        delay = _seconds_until_refresh(creds)
+        if delay > 0:
+            # Wake up at least once a minute in case the credentials were replaced meanwhile
+            time.sleep(min(delay, 60))
+            continue
+
+        try:
+            with _creds_lock:
+                if creds is _cached_creds and _seconds_until_refresh(creds) <= 0:
+                    print("Refreshing Google credentials before expiry...")
+                    creds.refresh(Request())
+                    _save_token(creds)
+        except Exception as e:
+            print(f"Failed to refresh Google credentials: {e}")
+            time.sleep(60)
+
+
+def _ensure_refresher_running():
+    global _refresher_thread
+    if _refresher_thread is None or not _refresher_thread.is_alive():
+        _refresher_thread = threading.Thread(target=_refresh_loop, name="google-credentials-refresher", daemon=True)
+        _refresher_thread.start()
+
+
+def get_credentials():
+    """
+    Returns the Google credentials held in memory.
+    token.json is only read again when the file changes (e.g. a new token was uploaded),
+    and a background thread refreshes the token before it expires.
+    """
+    global _cached_creds, _cached_token_mtime, _credentials_version
+    with _creds_lock:
+        if _cached_creds is None or _token_mtime() != _cached_token_mtime:
+            _cached_creds = _load_credentials()
+            _cached_token_mtime = _token_mtime()
+            _credentials_version += 1
+            _ensure_refresher_running()
+        elif not _cached_creds.valid and _cached_creds.refresh_token:
+            # The background refresh hasn't run yet (e.g. the host was asleep), refresh inline
+            _cached_creds.refresh(Request())
+            _save_token(_cached_creds)
+        return _cached_creds
+
+
+def get_credentials_version() -> int:
+    """Returns a counter that changes whenever the cached credentials object is replaced."""
+    return _credentials_version
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from app.utils.google_cloud.cloud_config import get_credentials, get_credentials_version
+from app.utils.metrics import LatencyStats
+from config.settings import GOOGLE_HTTP_TIMEOUT_SECONDS, GOOGLE_SERVICE_POOL_SIZE
+
+# Parsed discovery documents, shared by every thread: {(api, version): dict}
+_documents = {}
+_documents_lock = threading.Lock()
+
+# googleapiclient/httplib2 objects are not thread-safe, so a client is used by one call at a time:
+# calls check one out of this pool and back in afterwards, and the next call on any thread reuses it
+# with its keep-alive httplib2 connection. {(api, version, credentials version): [idle clients]}
+_pool = {}
+_pool_lock = threading.Lock()
+
+build_stats = LatencyStats()
+hit_stats = LatencyStats()
+
+
+def _get_document(api: str, version: str) -> dict:
+    from googleapiclient.discovery_cache import get_static_doc
+
+    key = (api, version)
+    with _documents_lock:
+        if key not in _documents:
+            _documents[key] = json.loads(get_static_doc(api, version))
+        return _documents[key]
+
+
+def _build(api: str, version: str, creds):
+    import google_auth_httplib2
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT_SECONDS))
+    return build_from_document(_get_document(api, version), http=http)
+
+
+def _check_in(key: tuple, service) -> None:
+    with _pool_lock:
+        # Drop clients that were bound to credentials which have since been replaced
+        for stale_key in [k for k in _pool if k[2] != get_credentials_version()]:
+            del _pool[stale_key]
+        if key[2] != get_credentials_version():
+            return
+        idle = _pool.setdefault(key, [])
+        if len(idle) < GOOGLE_SERVICE_POOL_SIZE:
+            idle.append(service)
+
+
+@contextmanager
+def google_service(api: str, version: str):
+    """
+    Checks a Google API client for (api, version) out of the shared pool for the duration of
+    the with block, e.g. `with google_service('gmail', 'v1') as service:`.
+    The discovery document is parsed once per process and a client is only built when no idle
+    one is left (i.e. once per concurrent call), then reused by later tool calls on any thread
+    until the credentials are replaced.
+    googleapiclient is imported by the first build, so it stays out of the app's startup.
+    """
+    started = time.perf_counter()
+    creds = get_credentials()
+    key = (api, version, get_credentials_version())
+    with _pool_lock:
+        idle = _pool.get(key)
+        service = idle.pop() if idle else None
+    if service is not None:
+        hit_stats.record(time.perf_counter() - started)
+    else:
+        service = _build(api, version, creds)
+        build_stats.record(time.perf_counter() - started)
+    try:
+        yield service
+    finally:
+        _check_in(key, service)
+
+
+def get_setup_stats() -> dict:
+    """
+    Per-call setup cost of Google clients: builds vs cached hits, and the time the cache
+    saved compared to building a client on every call.
+    """
+    builds, hits = build_stats.snapshot(), hit_stats.snapshot()
+    saved_ms = hits["count"] * max(builds["mean_ms"] - hits["mean_ms"], 0.0)
+    return {"builds": builds, "hits": hits, "estimated_saved_ms": saved_ms}
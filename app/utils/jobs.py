@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING, RUNNING, DONE, FAILED, TIMED_OUT = "pending", "running", "done", "failed", "timed out"
+
+
+class Job:
+    """A unit of background work; `result`/`error` are set once it finishes."""
+
+    def __init__(self, job_id: str, timeout: float):
+        self.id = job_id
+        self.timeout = timeout
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._status = PENDING
+
+    @property
+    def status(self) -> str:
+        if self._status in (PENDING, RUNNING) and time.time() - self.submitted_at > self.timeout:
+            return TIMED_OUT
+        return self._status
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, TIMED_OUT)
+
+
+class JobQueue:
+    """
+    Runs jobs on a bounded thread pool so slow tools don't block the agent turn.
+    Submitting an id that is already queued, running or done returns the existing job.
+    Only the most recent `max_jobs` jobs are remembered.
+    """
+
+    def __init__(self, name: str, max_workers: int, timeout: float, max_jobs: int = 200):
+        self.name = name
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        job.started_at = time.time()
+        job._status = RUNNING
+        try:
+            job.result = fn(*args, **kwargs)
+            job._status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job._status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def submit(self, job_id: str, fn, *args, **kwargs) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status not in (FAILED, TIMED_OUT):
+                return job
+            job = self._jobs[job_id] = Job(job_id, self.timeout)
+            self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in (PENDING, RUNNING, DONE, FAILED, TIMED_OUT)}
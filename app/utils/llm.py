@@ -1,24 +1,53 @@
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-from config.settings import temperature, active_model, groq_api_key
-
-
-def get_llm():
-    """Initializes and returns the Gemini LLM."""
-    try:
-        llm = ChatGroq(
-            temperature=temperature,
-            model=active_model,
-            api_key=groq_api_key
-        )
-        # llm = ChatGoogleGenerativeAI(
-        #     model="gemini-2.0-flash",
-        #     temperature=0.1,
-        #     google_api_key=os.getenv("GEMINI_API_KEY")
-        # )
-        print("LLM initialized successfully.")
-        return llm
-    except Exception as e:
-        print(f"Error initializing LLM. Make sure API key is set: {e}")
-        return None
\ No newline at end of file
+import threading
+
+import httpx
+from config.settings import temperature, active_model, groq_api_key, AGENT_LLM_OVERRIDES
+
+# One client per (model, temperature), shared by every agent that uses that configuration
+_llms = {}
+_llms_lock = threading.Lock()
+# All Groq clients share a single keep-alive connection pool
+_http_client = None
+
+
+def get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+    return _http_client
+
+
+def get_llm(agent_name: str = None):
+    """
+    Returns the shared LLM client for an agent (or task, e.g. "summarizer").
+    The model and temperature come from AGENT_LLM_OVERRIDES for that name, falling back to
+    active_model/temperature; each distinct configuration is built once, on first use
+    (langchain_groq itself is only imported then, keeping it out of the app's startup).
+    """
+    overrides = AGENT_LLM_OVERRIDES.get(agent_name, {})
+    key = (overrides.get("model", active_model), overrides.get("temperature", temperature))
+
+    with _llms_lock:
+        if key in _llms:
+            return _llms[key]
+        try:
+            from langchain_groq import ChatGroq
+
+            llm = ChatGroq(
+                temperature=key[1],
+                model=key[0],
+                api_key=groq_api_key,
+                http_client=get_http_client()
+            )
+            # from langchain_google_genai import ChatGoogleGenerativeAI
+            # llm = ChatGoogleGenerativeAI(
+            #     model="gemini-2.0-flash",
+            #     temperature=0.1,
+            #     google_api_key=os.getenv("GEMINI_API_KEY")
+            # )
+            print(f"LLM initialized successfully ({key[0]}, temperature {key[1]}).")
+            _llms[key] = llm
+            return llm
+        except Exception as e:
+            print(f"Error initializing LLM. Make sure API key is set: {e}")
+            return None
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class LatencyStats:
+    """
+    Thread-safe latency recorder.
+    Keeps a running count/total and a bounded window of recent samples for percentiles.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    @contextmanager
+    def time(self):
+        """Context manager that records the wall time of its block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        """Returns count, mean and p50/p95/max (in milliseconds) of the recorded samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self.count, self.total
+
+        if not samples:
+            return {"count": count, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        def _percentile(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000,
+            "p50_ms": _percentile(0.50),
+            "p95_ms": _percentile(0.95),
+            "max_ms": samples[-1] * 1000,
+        }
+
+    def histogram(self, bounds_ms=(10, 50, 100, 250, 500, 1000, 2500, 5000)) -> dict:
+        """Counts the recent samples per latency bucket, e.g. {"<=100ms": 4, ..., ">5000ms": 1}."""
+        with self._lock:
+            samples = list(self._samples)
+        buckets = {f"<={bound}ms": 0 for bound in bounds_ms}
+        buckets[f">{bounds_ms[-1]}ms"] = 0
+        for sample in samples:
+            ms = sample * 1000
+            label = next((f"<={bound}ms" for bound in bounds_ms if ms <= bound), f">{bounds_ms[-1]}ms")
+            buckets[label] += 1
+        return buckets
@@ -0,0 +1,126 @@
+import atexit
+import json
+import os
+import re
+import threading
+
+from config.settings import USER_PROFILES_DIR, DEFAULT_USER_ID, PROFILE_WRITE_DELAY_SECONDS
+
+LEGACY_USER_DATA_FILE = "user_data.json"  # the single global profile used before per-user profiles
+
+
+class ProfileStore:
+    """
+    In-memory cache of user profiles, one JSON file per user ID in `directory`.
+
+    Reads are served from memory; a profile is reloaded only when its file's mtime changes
+    (e.g. it was edited by hand or by another process). Updates are applied in memory right
+    away and written to disk atomically after `write_delay` seconds, so a burst of updates
+    costs a single write. flush() writes everything pending immediately.
+    """
+
+    def __init__(self, directory: str = USER_PROFILES_DIR, write_delay: float = PROFILE_WRITE_DELAY_SECONDS):
+        self.directory = directory
+        self.write_delay = write_delay
+        self._profiles = {}  # user_id -> (profile dict, file mtime_ns or None)
+        self._dirty = set()
+        self._timer = None
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.writes = 0
+
+    def path_for(self, user_id: str) -> str:
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", user_id) or DEFAULT_USER_ID
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    @staticmethod
+    def _mtime(path: str):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self, user_id: str, path: str, mtime) -> dict:
+        """Reads a profile from disk. Caller holds the lock."""
+        self.loads += 1
+        source = path
+        if mtime is None and user_id == DEFAULT_USER_ID and os.path.exists(LEGACY_USER_DATA_FILE):
+            source = LEGACY_USER_DATA_FILE  # carried over on the first write
+        try:
+            with open(source, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read profile {source}: {e}")
+            return {}
+
+    def get(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Returns a copy of the user's profile ({} if nothing is stored yet)."""
+        path = self.path_for(user_id)
+        with self._lock:
+            cached = self._profiles.get(user_id)
+            if user_id not in self._dirty:
+                mtime = self._mtime(path)
+                if cached is None or cached[1] != mtime:
+                    cached = self._profiles[user_id] = (self._load(user_id, path, mtime), mtime)
+            return dict(cached[0])
+
+    def update(self, user_id: str = DEFAULT_USER_ID, **fields) -> list[str]:
+        """Sets the given (non-None) fields and schedules a write. Returns the names of the updated fields."""
+        updated = {key: value for key, value in fields.items() if value is not None}
+        if not updated:
+            return []
+        with self._lock:
+            profile = self.get(user_id)
+            profile.update(updated)
+            self._profiles[user_id] = (profile, self._profiles[user_id][1])
+            self._dirty.add(user_id)
+            if self._timer is None:
+                self._schedule_write()
+        return list(updated)
+
+    def _schedule_write(self) -> None:
+        """Starts the write-behind timer. Caller holds the lock."""
+        self._timer = threading.Timer(self.write_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Writes every profile with pending updates (tmp file + os.replace, so readers never see half a file)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty, self._dirty = self._dirty, set()
+            for user_id in dirty:
+                profile = self._profiles[user_id][0]
+                path = self.path_for(user_id)
+                tmp_path = path + ".tmp"
+                try:
+                    os.makedirs(self.directory, exist_ok=True)
+                    with open(tmp_path, "w") as f:
+                        json.dump(profile, f, separators=(",", ":"))
+                    os.replace(tmp_path, path)
+                except OSError as e:
+                    print(f"Warning: Could not save profile {path}: {e}")
+                    self._dirty.add(user_id)
+                    continue
+                self.writes += 1
+                self._profiles[user_id] = (profile, self._mtime(path))
+            if self._dirty:
+                self._schedule_write()  # retry the failed ones later
+
+
+profile_store = ProfileStore()
+atexit.register(profile_store.flush)
+
+
+def format_profile(profile: dict) -> str:
+    """One "Field: value" line per stored field."""
+    return "\n".join(f"{key.capitalize()}: {value}" for key, value in profile.items())
+
+
+def get_user_id(config) -> str:
+    """The user ID from a RunnableConfig's configurable section, falling back to DEFAULT_USER_ID."""
+    return ((config or {}).get("configurable") or {}).get("user_id") or DEFAULT_USER_ID
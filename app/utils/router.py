@@ -0,0 +1,84 @@
+import re
+import threading
+
+from config.settings import ROUTER_ENABLED, ROUTER_MIN_SCORE, ROUTER_MIN_CONFIDENCE
+
+# Weighted keyword patterns per agent. A message's score for an agent is the sum of the
+# weights of its matching patterns; strong, unambiguous words weigh 3, weaker hints 1-2.
+INTENT_RULES = {
+    "Alpha": [
+        (re.compile(r"\b(e-?mails?|gmail|inbox|mailbox|unread|spam|drafts?)\b"), 3),
+        (re.compile(r"\bmails?\b"), 2),
+        (re.compile(r"\b(reply|forward|compose)\b"), 1),
+    ],
+    "Bravo": [
+        (re.compile(r"\b(remind(ers?)?|calendar|agenda|appointments?)\b"), 3),
+        (re.compile(r"\b(schedule[ds]?|meetings?|events?)\b"), 2),
+        (re.compile(r"\b(what'?s on|am i (free|busy))\b"), 2),
+    ],
+    "Charlie": [
+        (re.compile(r"\b(weather|temperature|forecast|raining|humidity)\b"), 3),
+        (re.compile(r"\b(image|picture|photo|drawing|painting)s? of\b|\b(draw|paint)\b"), 3),
+        (re.compile(r"\bmy name is\b|\bi am \d+\b"), 3),
+        (re.compile(r"^(hi|hello|hey|salam|assalam|good (morning|afternoon|evening))\b"), 2),
+        (re.compile(r"\b(search|look up|google|news|price of|reviews?|who is|who was|how is)\b"), 1),
+    ],
+}
+
+
+class RouterStats:
+    """Counts how many turns the router sent straight to an agent and how many it left to the swarm."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routed = {agent: 0 for agent in INTENT_RULES}
+        self.fallbacks = 0
+
+    def record(self, agent) -> None:
+        with self._lock:
+            if agent is None:
+                self.fallbacks += 1
+            else:
+                self.routed[agent] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = sum(self.routed.values()) + self.fallbacks
+            return {"routed": dict(self.routed), "fallbacks": self.fallbacks,
+                    "route_rate": sum(self.routed.values()) / total if total else 0.0}
+
+
+router_stats = RouterStats()
+
+
+def score_intents(text: str) -> dict:
+    """Returns {agent: score} for the agents whose patterns match text."""
+    text = text.lower().strip()
+    scores = {}
+    for agent, rules in INTENT_RULES.items():
+        score = sum(weight for pattern, weight in rules if pattern.search(text))
+        if score:
+            scores[agent] = score
+    return scores
+
+
+def route_intent(text: str, previous_reply: str = "", min_score: int = ROUTER_MIN_SCORE,
+                 min_confidence: float = ROUTER_MIN_CONFIDENCE):
+    """
+    Picks the agent that should answer a new user message before any model call, so the swarm
+    starts there instead of spending a model call and a handoff to get there.
+    Returns the agent name, or None to leave the swarm's active agent as it is: when the router
+    is disabled, when no agent scores at least min_score, when the best agent has less than
+    min_confidence of the total score, or when the previous reply asked the user a question
+    (the message is most likely the answer, meant for the agent that asked).
+    """
+    if not ROUTER_ENABLED or previous_reply.rstrip().endswith("?"):
+        router_stats.record(None)
+        return None
+
+    scores = score_intents(text)
+    agent = max(scores, key=scores.get, default=None)
+    if agent is None or scores[agent] < min_score or scores[agent] / sum(scores.values()) < min_confidence:
+        agent = None
+    router_stats.record(agent)
+    return agent
@@ -0,0 +1,70 @@
+import time
+
+from langchain_core.messages import AIMessageChunk, AIMessage, ToolMessage
+
+from app.utils.metrics import LatencyStats
+
+# Time from submitting a message to the first visible answer token, and to the end of the turn
+time_to_first_token_stats = LatencyStats()
+turn_latency_stats = LatencyStats()
+
+
+def stream_swarm_turn(app, messages: list, config: dict, active_agent: str = None):
+    """
+    Runs one turn through the swarm with LangGraph streaming and yields UI events as they happen
+    (active_agent, if given, is the agent the turn starts at, e.g. from route_intent):
+      ("agent", name)         an agent started working on the turn
+      ("tool", name)          the active agent called a tool (handoffs included)
+      ("tool_result", name)   a tool call returned
+      ("token", text)         a piece of the active agent's reply
+      ("message_start", "")   a new model message started, the previous text was intermediate
+      ("done", stats)         the turn finished; stats has time_to_first_token and total seconds
+    """
+    started = time.perf_counter()
+    time_to_first_token = None
+    current_agent = None
+    current_message_id = None
+
+    inputs = {"messages": messages}
+    if active_agent:
+        inputs["active_agent"] = active_agent
+
+    for namespace, mode, data in app.stream(inputs, config=config,
+                                            stream_mode=["messages", "updates"], subgraphs=True):
+        # Events from inside an agent's subgraph carry a namespace like ("Charlie:<task id>",)
+        agent = namespace[0].split(":", 1)[0] if namespace else None
+        if agent and agent != current_agent:
+            current_agent = agent
+            yield "agent", agent
+
+        if mode == "messages":
+            message, metadata = data
+            # Only the agents' own model calls are shown (not e.g. the context summarizer)
+            if metadata.get("langgraph_node") != "agent" or not isinstance(message, (AIMessageChunk, AIMessage)):
+                continue
+            tool_calls = message.tool_call_chunks if isinstance(message, AIMessageChunk) else message.tool_calls
+            text = message.content if isinstance(message.content, str) else ""
+            if not text and not tool_calls:
+                continue
+
+            if message.id != current_message_id:
+                current_message_id = message.id
+                yield "message_start", ""
+            for tool_call in tool_calls:
+                if tool_call.get("name"):
+                    yield "tool", tool_call["name"]
+            if text:
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - started
+                    time_to_first_token_stats.record(time_to_first_token)
+                yield "token", text
+
+        elif mode == "updates" and agent:
+            for update in data.values():
+                for message in (update or {}).get("messages", []):
+                    if isinstance(message, ToolMessage):
+                        yield "tool_result", message.name
+
+    total = time.perf_counter() - started
+    turn_latency_stats.record(total)
+    yield "done", {"time_to_first_token": time_to_first_token, "total": total}
@@ -0,0 +1,276 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.utils.metrics import LatencyStats
+from config.settings import TRACING_ENABLED, TRACE_EXPORT_PATH, TRACE_EXPORT_FORMAT, TRACE_HOT_SPOTS
+
+
+class Span:
+    """One timed operation of a turn: the turn itself, an agent, an agent step, an LLM call or a tool call."""
+
+    __slots__ = ("span_id", "name", "kind", "agent", "namespace", "attributes", "start_ns", "end_ns", "error",
+                 "children")
+
+    def __init__(self, name: str, kind: str, parent=None, agent: str = None, namespace: str = None, **attributes):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.kind = kind
+        self.agent = agent
+        self.namespace = namespace  # LangGraph checkpoint namespace of agent and step spans
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self.children = []
+        if parent is not None:
+            parent.children.append(self)
+
+    def end(self, error: BaseException = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if error is not None:
+                self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def walk(self, parent=None):
+        """Yields (span, parent) for this span and every span below it."""
+        yield self, parent
+        for child in self.children:
+            yield from child.walk(self)
+
+    def to_dict(self, turn_start_ns: int) -> dict:
+        span = {"name": self.name, "kind": self.kind, "agent": self.agent,
+                "start_ms": round((self.start_ns - turn_start_ns) / 1e6, 3),
+                "duration_ms": round(self.duration * 1000, 3), "attributes": self.attributes}
+        if self.error:
+            span["error"] = self.error
+        if self.children:
+            span["children"] = [child.to_dict(turn_start_ns) for child in self.children]
+        return span
+
+
+class TurnTracer(BaseCallbackHandler):
+    """
+    LangChain callback handler that records one turn as a span tree:
+      turn > swarm (the app run) > agent (Alpha, Bravo, Charlie) > step (pre_model_hook, agent, tools)
+      > llm (with token counts) / tool / handoff
+    LangChain's own plumbing runs (prompts, sequences, routers) are left out; their children go to
+    the nearest traced run. Callbacks may come from several threads.
+    """
+
+    def __init__(self, **attributes):
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span("turn", "turn", **attributes)
+        self._lock = threading.Lock()
+        self._runs = {}  # run_id -> its span, or the nearest traced ancestor's for untraced runs
+        self._open = {}  # run_id -> span, for the runs that have a span of their own
+
+    def _parent(self, parent_run_id) -> Span:
+        return self._runs.get(parent_run_id, self.root)
+
+    def _start(self, run_id, span: Span) -> None:
+        self._runs[run_id] = self._open[run_id] = span
+
+    def _end(self, run_id, error: BaseException = None, **attributes) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+            span = self._open.pop(run_id, None)
+        if span is not None:
+            span.attributes.update(attributes)
+            span.end(error)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "chain")
+        metadata = metadata or {}
+        namespace = metadata.get("langgraph_checkpoint_ns")
+        with self._lock:
+            parent = self._parent(parent_run_id)
+            if parent_run_id is None:
+                self._start(run_id, Span("swarm", "invoke", parent))
+            # A graph node's own run (not the runnables inside it, which share its namespace)
+            elif name == metadata.get("langgraph_node") and not name.startswith("__") and namespace != parent.namespace:
+                if "|" in (namespace or ""):
+                    self._start(run_id, Span(name, "step", parent, agent=parent.agent, namespace=namespace))
+                else:
+                    self._start(run_id, Span(name, "agent", parent, agent=name, namespace=namespace))
+            else:
+                self._runs[run_id] = parent
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        from langgraph.errors import GraphBubbleUp
+
+        # A handoff leaves its agent by raising ParentCommand; that's not a failure
+        self._end(run_id, None if isinstance(error, GraphBubbleUp) else error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        model = (metadata or {}).get("ls_model_name") or kwargs.get("invocation_params", {}).get("model") \
+            or kwargs.get("name") or (serialized or {}).get("name", "llm")
+        with self._lock:
+            parent = self._parent(parent_run_id)
+            self._start(run_id, Span(model, "llm", parent, agent=parent.agent, messages=len(messages[0])))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            self._end(run_id, input_tokens=usage["input_tokens"], output_tokens=usage["output_tokens"])
+        else:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            self._end(run_id, input_tokens=usage.get("prompt_tokens"), output_tokens=usage.get("completion_tokens"))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        with self._lock:
+            parent = self._parent(parent_run_id)
+            kind = "handoff" if name.startswith("transfer_to_") else "tool"
+            self._start(run_id, Span(name, kind, parent, agent=parent.agent))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        goto = getattr(output, "goto", None)  # a handoff returns Command(goto=<agent>)
+        if goto:
+            self._end(run_id, to=goto if isinstance(goto, str) else str(goto))
+        else:
+            self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+class TraceStats:
+    """Latency of every kind of span across turns, per agent, for finding the p95 hot spots."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}  # (agent, kind, name) -> LatencyStats
+        self._tokens = {}  # (agent, kind, name) -> [input tokens, output tokens]
+
+    def record(self, root: Span) -> None:
+        for span, _ in root.walk():
+            key = (span.agent or "-", span.kind, span.name)
+            with self._lock:
+                latency = self._latency.get(key)
+                if latency is None:
+                    latency = self._latency[key] = LatencyStats()
+                    self._tokens[key] = [0, 0]
+                if span.kind == "llm":
+                    self._tokens[key][0] += span.attributes.get("input_tokens") or 0
+                    self._tokens[key][1] += span.attributes.get("output_tokens") or 0
+            latency.record(span.duration)
+
+    def hot_spots(self, limit: int = TRACE_HOT_SPOTS) -> list:
+        """The `limit` slowest spans by p95 (turns and app runs excluded), with their token totals."""
+        with self._lock:
+            items = [(key, latency, list(self._tokens[key])) for key, latency in self._latency.items()
+                     if key[1] not in ("turn", "invoke")]
+        spots = [{"agent": agent, "kind": kind, "name": name, **latency.snapshot(),
+                  "input_tokens": tokens[0], "output_tokens": tokens[1]}
+                 for (agent, kind, name), latency, tokens in items]
+        return sorted(spots, key=lambda spot: spot["p95_ms"], reverse=True)[:limit]
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class TraceExporter:
+    """
+    Appends every finished turn to a local file as one JSON line:
+      'jsonl'  the turn's span tree, times in ms from the start of the turn
+      'otlp'   an OTLP/JSON ExportTraceServiceRequest, as written by OpenTelemetry's file exporter
+               (readable by the collector's otlpjsonfile receiver, Jaeger and similar tools)
+    """
+
+    def __init__(self, path: str, export_format: str):
+        if export_format not in ("jsonl", "otlp"):
+            raise ValueError(f"Unknown trace export format: {export_format}")
+        self.path = path
+        self.export_format = export_format
+        self._lock = threading.Lock()
+
+    def to_jsonl(self, tracer: TurnTracer) -> dict:
+        return {"trace_id": tracer.trace_id, "start_time_unix_ns": tracer.root.start_ns,
+                **tracer.root.to_dict(tracer.root.start_ns)}
+
+    def to_otlp(self, tracer: TurnTracer) -> dict:
+        spans = []
+        for span, parent in tracer.root.walk():
+            attributes = {"span.kind": span.kind, **({"agent.name": span.agent} if span.agent else {}),
+                          **{key: value for key, value in span.attributes.items() if value is not None}}
+            spans.append({
+                "traceId": tracer.trace_id, "spanId": span.span_id,
+                "parentSpanId": parent.span_id if parent else "",
+                "name": f"{span.kind} {span.name}" if span.kind not in ("turn", "invoke") else span.name,
+                "kind": 3 if span.kind == "llm" else 1,  # SPAN_KIND_CLIENT for model calls, else INTERNAL
+                "startTimeUnixNano": str(span.start_ns), "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            })
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "multi-agent-assistant"}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]}
+
+    def export(self, tracer: TurnTracer) -> None:
+        record = self.to_jsonl(tracer) if self.export_format == "jsonl" else self.to_otlp(tracer)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+trace_stats = TraceStats()
+trace_exporter = TraceExporter(TRACE_EXPORT_PATH, TRACE_EXPORT_FORMAT)
+
+
+def start_turn_trace(**attributes):
+    """
+    A TurnTracer for a new turn (attributes describe it, e.g. thread_id), or None when
+    TRACING_ENABLED is off; the other functions here then do nothing and no callback is attached.
+    """
+    return TurnTracer(**attributes) if TRACING_ENABLED else None
+
+
+def traced_config(config: dict, tracer) -> dict:
+    """The run config with the tracer added to its callbacks (config itself when not tracing)."""
+    if tracer is None:
+        return config
+    return {**config, "callbacks": [*(config.get("callbacks") or []), tracer]}
+
+
+def annotate_turn(tracer, **attributes) -> None:
+    """Adds attributes to the turn's span, e.g. which agent answered."""
+    if tracer is not None:
+        tracer.root.attributes.update(attributes)
+
+
+def finish_turn_trace(tracer, error: BaseException = None) -> None:
+    """Ends the turn's span (failed, if error is given), adds it to trace_stats and appends it to the trace file."""
+    if tracer is None:
+        return
+    tracer.root.end(error)
+    trace_stats.record(tracer.root)
+    try:
+        trace_exporter.export(tracer)
+    except OSError as e:
+        print(f"Error exporting trace {tracer.trace_id}: {e}")
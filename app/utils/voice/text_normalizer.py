@@ -0,0 +1,128 @@
+import re
+from functools import lru_cache
+
+from config.settings import TTS_NORMALIZER_CACHE_SIZE
+
+_ONES = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven",
+         "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+_SCALES = [(10 ** 9, "billion"), (10 ** 6, "million"), (1000, "thousand"), (100, "hundred")]
+_ORDINAL_WORDS = {"one": "first", "two": "second", "three": "third", "five": "fifth", "eight": "eighth",
+                  "nine": "ninth", "twelve": "twelfth"}
+_MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+           "November", "December"]
+_UNITS = {"C": " degrees Celsius", "F": " degrees Fahrenheit", "": " degrees"}
+
+# Everything the normalizer rewrites, as one alternation so the text is scanned a single time.
+# Order matters: earlier alternatives win (e.g. an image before a link, a date before a number).
+# The leading guard lets the scan skip the inside of words and single spaces without trying
+# every alternative there, which is where most of the characters are.
+_PATTERN = re.compile(r"""
+  (?:(?<!\w)(?=\w)|(?=[^\w\x20]|_))
+  (?:
+    (?P<fence>```[\s\S]*?(?:```|\Z))
+  | (?P<image>!\[[^\]]*\]\([^)]*\))
+  | \[(?P<link>[^\]]+)\]\([^)]*\)
+  | (?P<url>(?:https?://|www\.)\S+|(?:[\w-]+\.)+[a-z]{2,}/\S*)
+  | (?P<line_start>(?:\A|\n)[ \t]*(?:\#{1,6}|>|[-*+•]|\d+[.)])[ \t]+)
+  | (?P<emphasis>\*{1,3}|_{2,3}|~~|`)
+  | (?P<emoji>[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2190-\u21FF\u2B00-\u2BFF\uFE0F\u200D]+)
+  | (?P<control>[\x00-\x08\x0b-\x1f\x7f]+)
+  | \b(?P<year>\d{4})-(?P<month>0[1-9]|1[0-2])-(?P<day>0[1-9]|[12]\d|3[01])\b
+  | \b(?P<hour>[01]?\d|2[0-3]):(?P<minute>[0-5]\d)\b
+  | \$(?P<dollars>\d{1,3}(?:,\d{3})+|\d+)(?:\.(?P<cents>\d{2}))?(?!\d|\.\d)
+  | (?P<long_number>\b\d{6,}\b)
+  | \b(?P<ordinal>\d+)(?:st|nd|rd|th)\b
+  | (?<![\w.])(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)(?!\w)
+  | (?P<percent>%)
+  | (?P<degrees>°(?:\s?(?P<unit>[CF])(?!\w))?)
+  )
+""", re.VERBOSE)
+
+
+def number_to_words(n: int) -> str:
+    """0 -> "zero", 42 -> "forty-two", 1205 -> "one thousand two hundred five"."""
+    if n < 20:
+        return _ONES[n]
+    if n < 100:
+        return _TENS[n // 10] + (f"-{_ONES[n % 10]}" if n % 10 else "")
+    for scale, name in _SCALES:
+        if n >= scale:
+            rest = n % scale
+            return f"{number_to_words(n // scale)} {name}" + (f" {number_to_words(rest)}" if rest else "")
+    return str(n)
+
+
+def ordinal_to_words(n: int) -> str:
+    """1 -> "first", 22 -> "twenty-second", 30 -> "thirtieth"."""
+    words = number_to_words(n)
+    cut = max(words.rfind(" "), words.rfind("-")) + 1
+    head, last = words[:cut], words[cut:]
+    if last in _ORDINAL_WORDS:
+        return head + _ORDINAL_WORDS[last]
+    if last.endswith("y"):
+        return head + last[:-1] + "ieth"
+    return head + last + "th"
+
+
+def year_to_words(year: int) -> str:
+    """2025 -> "twenty twenty-five", 2005 -> "two thousand five", 1900 -> "nineteen hundred"."""
+    if 2000 <= year < 2010 or year % 1000 == 0:
+        return number_to_words(year)
+    high, low = divmod(year, 100)
+    if low == 0:
+        return f"{number_to_words(high)} hundred"
+    return f"{number_to_words(high)} {'oh ' if low < 10 else ''}{number_to_words(low)}"
+
+
+def _decimal_to_words(text: str) -> str:
+    whole, _, fraction = text.replace(",", "").partition(".")
+    words = number_to_words(int(whole))
+    if fraction:
+        words += " point " + " ".join(_ONES[int(digit)] for digit in fraction)
+    return words
+
+
+def _replace(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == "link":
+        return match.group("link")
+    if kind in ("fence", "image", "url", "emphasis", "long_number"):
+        return ""
+    if kind in ("emoji", "control"):
+        return " "
+    if kind == "line_start":
+        return "\n" if match.group(0).startswith("\n") else ""
+    if kind == "day":
+        month = _MONTHS[int(match.group("month")) - 1]
+        return f"{month} {ordinal_to_words(int(match.group('day')))}, {year_to_words(int(match.group('year')))}"
+    if kind == "minute":
+        hour, minute = number_to_words(int(match.group("hour"))), int(match.group("minute"))
+        if minute == 0:
+            return f"{hour} o'clock"
+        return f"{hour} {'oh ' if minute < 10 else ''}{number_to_words(minute)}"
+    if kind in ("dollars", "cents"):
+        dollars = int(match.group("dollars").replace(",", ""))
+        words = f"{number_to_words(dollars)} dollar{'' if dollars == 1 else 's'}"
+        cents = int(match.group("cents") or 0)
+        return words + (f" and {number_to_words(cents)} cent{'' if cents == 1 else 's'}" if cents else "")
+    if kind == "ordinal":
+        return ordinal_to_words(int(match.group("ordinal")))
+    if kind == "number":
+        return _decimal_to_words(match.group("number"))
+    if kind == "percent":
+        return " percent"
+    if kind == "degrees":
+        return _UNITS[match.group("unit") or ""]
+    return match.group(0)
+
+
+@lru_cache(maxsize=TTS_NORMALIZER_CACHE_SIZE)
+def normalize_for_speech(text: str) -> str:
+    """
+    Turns an assistant reply into text that reads well aloud, in a single regex pass:
+    markdown (code blocks, images, link targets, emphasis, headings, list markers), URLs, emojis
+    and long IDs are dropped, and numbers, amounts, ordinals, dates, times, percentages and degrees are
+    spelled out. Results are memoized, so speaking the same message again costs nothing.
+    """
+    return _PATTERN.sub(_replace, text).strip()
@@ -1,37 +1,87 @@
-import json
+import base64
+import hashlib
+import os
 import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
-from groq import Groq
+import streamlit.components.v1 as components
+
+from app.utils.cache import TTLCache
+from app.utils.llm import get_http_client
+from app.utils.metrics import LatencyStats
+from app.utils.voice.text_normalizer import normalize_for_speech
+from config.settings import groq_api_key, TTS_MODEL, TTS_VOICE, TTS_CACHE_SIZE, TTS_CACHE_TTL_SECONDS, \
+    TTS_FIRST_CHUNK_CHARS, TTS_CHUNK_CHARS, TTS_SYNTH_CONCURRENCY, TTS_CHUNK_POLL_SECONDS
+
+
+# A single speech player in the page; speak() and speak_with_groq() only hand it the next thing to read
+_speech_component = components.declare_component(
+    "speech_player", path=os.path.join(os.path.dirname(__file__), "speech_component"))
 
-from config.settings import groq_api_key
+
+def _replace_speech_request(request: dict) -> None:
+    previous = st.session_state.get("speech_request")
+    for future in (previous or {}).get("pending", []):
+        future.cancel()  # chunks of the previous message that haven't been synthesized yet
+    st.session_state["speech_request"] = request
 
 
 def speak(text: str):
-    # Clean and prepare text
-    safe_text = re.sub(r"[^\x20-\x7E]+", " ", text).strip()  # remove non-printable chars
+    """Queues text for the browser's speech synthesis; it is spoken when speech_player() renders."""
+    _replace_speech_request({"text": normalize_for_speech(text), "nonce": uuid.uuid4().hex})
+
 
-    safe_text_without_numbers = re.sub(r"\b\d{6,}\b", "", safe_text)
+def speech_player():
+    """
+    Renders the persistent speech component. Call it once per run, at a fixed place in the layout.
+    While chunks of a speak_with_groq() message are being synthesized, the player is a fragment
+    rerunning every TTS_CHUNK_POLL_SECONDS that passes each finished chunk on to the browser;
+    once the last one is passed on, it reruns the app so the player stops polling.
+    """
+    pending = st.session_state.get("speech_request", {}).get("pending")
+    st.fragment(_render_speech_player, run_every=TTS_CHUNK_POLL_SECONDS if pending else None)()
 
-    url_pattern = r"(?:https?://|www\.)\S+|(?:\S+\.[a-z]{2,})/\S*"  # This is a more comprehensive URL pattern
 
-    safe_text_without_urls = re.sub(url_pattern, "", safe_text_without_numbers)
+def _render_speech_player():
+    request = st.session_state.get("speech_request", {"text": "", "nonce": ""})
+    pending = request.get("pending", [])
+    was_pending = bool(pending)
+    if request.get("error"):
+        st.error(f"Error generating speech: {request.pop('error')}")
+    audio = []
+    while pending and pending[0].done():
+        try:
+            audio_bytes = pending.pop(0).result()
+        except Exception as e:
+            request["error"] = e
+            for future in pending:
+                future.cancel()
+            pending.clear()
+            break
+        if not request["sent"] and not audio:
+            time_to_first_audio_stats.record(time.perf_counter() - request["started"])
+        audio.append("data:audio/wav;base64," + base64.b64encode(audio_bytes).decode("ascii"))
 
-    js_safe_text = json.dumps(safe_text_without_urls)  # safely escape quotes, newlines, etc.
+    # Chunks are sent once; the browser queues them after the ones of the same nonce it already has
+    # (and ignores the ones it has, so the last batch can safely be sent again)
+    offset = request.get("sent", 0)
+    if audio:
+        request["sent"] = offset + len(audio)
+        request["last_batch"] = (offset, audio)
+    elif request.pop("resend", False):
+        offset, audio = request["last_batch"]
+    _speech_component(text=request["text"], nonce=request["nonce"], audio=audio, offset=offset,
+                      key="speech_player", default=None)
 
-    # Inject TTS JS and call it
-    st.components.v1.html(f"""
-    <script>
-    const speak = (text) => {{
-        if (window.speechSynthesis.speaking) {{
-            window.speechSynthesis.cancel();
-        }}
-        const utterance = new SpeechSynthesisUtterance(text);
-        utterance.lang = "en-US";
-        window.speechSynthesis.speak(utterance);
-    }};
-    speak({js_safe_text});
-    </script>
-    """, height=0)
+    if was_pending and not pending:
+        # Rebuild the player without run_every; that run sends the last batch again in case this
+        # one was cut short by the rerun
+        request["resend"] = "last_batch" in request
+        st.rerun()
 
 
 # def speak(text: str):
@@ -185,38 +235,79 @@ def speak(text: str):
 
 
 ## for groq
-def generate_and_play_groq_audio(text: str, voice: str = "Angelo-PlayAI"):
-    """
-    Generates speech from text using Groq's Text-to-Speech API
-    and plays it directly in Streamlit using st.audio.
+# Synthesized WAV chunks keyed by a hash of model, voice and text, so replaying a message is free
+tts_cache = TTLCache("tts_audio", max_size=TTS_CACHE_SIZE, ttl=TTS_CACHE_TTL_SECONDS)
+time_to_first_audio_stats = LatencyStats()
+_tts_executor = ThreadPoolExecutor(max_workers=TTS_SYNTH_CONCURRENCY, thread_name_prefix="tts")
+_groq_client = None
+_groq_client_lock = threading.Lock()
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
 
-    Args:
-        text (str): The text to convert to speech.
-        voice (str): The voice to use for audio generation.
-                     Refer to Groq API documentation for available voices.
-                     Default is "allura-playai".
-    """
-    # Ensure Groq API key is set
 
+def _get_groq_client():
+    global _groq_client
+    with _groq_client_lock:
+        if _groq_client is None:
+            from groq import Groq  # imported on the first synthesis, not at app startup
 
-    client = Groq(api_key=groq_api_key)
+            _groq_client = Groq(api_key=groq_api_key, http_client=get_http_client())
+        return _groq_client
 
-    try:
-        with st.spinner(f"Generating speech with '{voice}' voice..."):
-            chat_completion = client.audio.speech.create(
-                model="playai-tts",  # Use the Groq TTS model
-                voice=voice,
-                input=text,
-                response_format="wav" # WAV format is generally well-supported
-            )
-            audio_bytes = chat_completion.read()
 
-        if audio_bytes:
-            st.audio(audio_bytes, format="audio/wav", autoplay=True)
-            st.success("Audio generated and playing!")
+def split_into_chunks(text: str, first_chunk_chars: int = TTS_FIRST_CHUNK_CHARS,
+                      chunk_chars: int = TTS_CHUNK_CHARS) -> list[str]:
+    """
+    Groups the sentences of text into chunks of at most chunk_chars (first_chunk_chars for the
+    first one, so it is quick to synthesize). A single longer sentence becomes its own chunk.
+    """
+    chunks, current = [], ""
+    for sentence in _SENTENCE_BREAK.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        limit = chunk_chars if chunks else first_chunk_chars
+        if current and len(current) + 1 + len(sentence) > limit:
+            chunks.append(current)
+            current = sentence
         else:
-            st.warning("No audio data received from Groq. Check your text and API key.")
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def synthesize_chunk(text: str, voice: str = TTS_VOICE) -> bytes:
+    """Returns the WAV audio for one chunk of text, from the cache when it was synthesized before."""
+    key = hashlib.sha256(f"{TTS_MODEL}\0{voice}\0{text}".encode("utf-8")).hexdigest()
 
-    except Exception as e:
-        st.error(f"Error generating or playing speech: {e}")
+    def _load() -> bytes:
+        response = _get_groq_client().audio.speech.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text,
+            response_format="wav"  # WAV format is generally well-supported
+        )
+        return response.read()
 
+    return tts_cache.get_or_load(key, _load)
+
+
+def speak_with_groq(text: str, voice: str = TTS_VOICE):
+    """
+    Queues text for Groq's Text-to-Speech API. The chunks are synthesized in the background
+    (later ones while the earlier ones play) and speech_player() hands each to the browser as
+    soon as it is ready, which plays them in order. The script doesn't wait for synthesis or playback.
+
+    Args:
+        text (str): The text to convert to speech.
+        voice (str): The voice to use for audio generation.
+                     Refer to Groq API documentation for available voices.
+                     Default is TTS_VOICE.
+    """
+    chunks = split_into_chunks(normalize_for_speech(text))
+    if not chunks:
+        return
+    _replace_speech_request({
+        "text": "", "nonce": uuid.uuid4().hex, "started": time.perf_counter(), "sent": 0,
+        "pending": [_tts_executor.submit(synthesize_chunk, chunk, voice) for chunk in chunks],
+    })
@@ -0,0 +1,97 @@
+"""
+Benchmark: cold start of the Streamlit app, each run in a fresh Python process.
+
+imports            importing everything main.py imports
+first interactive  imports plus the first run of main.py (the page is rendered and the chat
+                   input accepts a message)
+agents ready       until the swarm is compiled and every agent is built, which now happens in
+                   the background after the first render (BackgroundSwarm)
+
+eager   compiles the swarm and builds every agent and its clients (LLM, Tavily, Google API
+        discovery) before the page, the way the app started before the agent registry
+lazy    the app as it is: agents, tool clients and their imports on first use
+
+Uses streamlit.testing's AppTest, which runs the script like the server does. No network is
+needed: nothing calls an API on startup (GROQ_API_KEY and TAVILY_API_KEY may be dummies).
+
+Run from the project root:
+    python -m benchmarks.cold_start
+"""
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+RUNS = 3
+MAIN = os.path.abspath("main.py")
+
+
+def main_imports() -> list:
+    """main.py's top-level import statements, as source."""
+    with open(MAIN, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def child(mode: str) -> dict:
+    started = time.perf_counter()
+    for statement in main_imports():
+        exec(statement, {})
+    imports = time.perf_counter() - started
+
+    from streamlit.testing.v1 import AppTest
+    from app.agents.registry import agent_registry
+
+    if mode == "eager":
+        from app.utils.agent_config import create_and_compile_swarm
+        from app.tools.general_chat.web_search import get_tavily
+        from app.utils.google_cloud.service_registry import _get_document
+        for name in agent_registry.names:
+            agent_registry.get(name)
+        create_and_compile_swarm(agent_registry, "Charlie")
+        get_tavily()
+        _get_document("gmail", "v1"), _get_document("calendar", "v3")
+
+    app_test = AppTest.from_file(MAIN, default_timeout=120)
+    app_test.run()
+    assert not app_test.exception, app_test.exception
+    first_interactive = time.perf_counter() - started
+    modules = len(sys.modules)
+
+    for thread in threading.enumerate():
+        if thread.name in ("swarm-compile", "agent-warm-up"):
+            thread.join()
+    assert not agent_registry.stats()["pending"]
+    return {"imports": imports, "first_interactive": first_interactive,
+            "agents_ready": time.perf_counter() - started, "modules": modules}
+
+
+def run_child(mode: str) -> dict:
+    env = dict(os.environ)
+    for name in ("GROQ_API_KEY", "TAVILY_API_KEY", "LANGSMITH_TRACING", "LANGSMITH_API_KEY", "LANGSMITH_PROJECT"):
+        env.setdefault(name, "benchmark")
+    env["LANGSMITH_TRACING"] = "false"
+    output = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", mode], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    print(f"median of {RUNS} fresh processes\n")
+    print(f"{'':>6} | {'imports':>9} {'modules':>8} | {'first interactive':>17} | {'agents ready':>12}")
+    for mode in ("eager", "lazy"):
+        runs = [run_child(mode) for _ in range(RUNS)]
+        median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(f"{mode:>6} | {median['imports'] * 1000:>7.0f}ms {median['modules']:>8.0f} | "
+              f"{median['first_interactive'] * 1000:>15.0f}ms | {median['agents_ready'] * 1000:>10.0f}ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(json.dumps(child(sys.argv[1])))
+    else:
+        main()
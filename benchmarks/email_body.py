@@ -0,0 +1,201 @@
+"""
+Benchmark: prompt tokens and parse time of the email bodies list_emails sends to the model.
+
+legacy  the old parse_email: first text/plain or last text/html among the top-level parts,
+        raw HTML included, nested multipart ignored, no size limit
+new     extract_body (nested walk, HTML converted to text, quoted replies and signatures
+        stripped) cut to EMAIL_BODY_MAX_TOKENS by truncate_to_tokens
+
+The built-in corpus mimics common real-world mail (newsletters, Gmail/Outlook replies, nested
+multipart with attachments, non-UTF-8 charsets, invites, forwards). Pass a directory of .eml
+files to benchmark a real mailbox export instead.
+
+Run from the project root:
+    python -m benchmarks.email_body [path/to/eml/dir]
+"""
+import base64
+import math
+import sys
+import time
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
+from pathlib import Path
+
+from app.tools.mail.email_body import extract_body, truncate_to_tokens
+from benchmarks.fake_gmail import payload_from_mime
+from config.settings import EMAIL_BODY_MAX_TOKENS, EMAIL_CHARS_PER_TOKEN
+
+REPEAT = 200
+
+PROSE = ("The quarterly numbers came in slightly ahead of plan, mostly thanks to the new onboarding flow. "
+         "Churn is flat, and support volume dropped after the billing page redesign. ")
+
+QUOTED_THREAD = "\n".join(
+    f"{'>' * depth} {line}" for depth in (1, 2, 3) for line in (PROSE * 3).split(". ")
+)
+
+SIGNATURE = """--
+Ali Khan
+Senior Engineer | Platform Team
++92 300 1234567 | ali.khan@example.com
+This email and any attachments are confidential and intended solely for the addressee."""
+
+NEWSLETTER_HTML = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Weekly digest</title>
+<style>{css}</style></head><body style="margin:0;padding:0">
+<!--[if mso]><table role="presentation"><tr><td><![endif]-->
+<table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background:#f4f4f4">
+{items}
+</table>
+<img src="https://track.example.com/open?u=8f2a0c&amp;c=91b" width="1" height="1" alt="">
+<p style="font-size:11px;color:#999">You are receiving this because you subscribed. <a href="https://example.com/unsubscribe?u=8f2a0c&amp;token=abcdef0123456789">Unsubscribe</a></p>
+<!--[if mso]></td></tr></table><![endif]--></body></html>"""
+
+NEWSLETTER_ITEM = """<tr><td style="padding:24px 32px;font-family:Helvetica,Arial,sans-serif;font-size:16px;line-height:24px;color:#333333">
+<h2 style="margin:0 0 12px 0;font-size:22px">Story {n}: what&rsquo;s new this week</h2>
+<p style="margin:0 0 12px 0">{prose}</p>
+<a href="https://links.example.com/click?upn=aHR0cHM6Ly9leGFtcGxlLmNvbS9zdG9yeS97bn0&amp;utm_source=newsletter&amp;utm_medium=email&amp;utm_campaign=weekly" style="background:#0066ff;color:#ffffff;padding:10px 18px;border-radius:4px;text-decoration:none">Read more &rarr;</a>
+</td></tr>"""
+
+
+def _message(subject: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "Sender <sender@example.com>"
+    message["To"] = "me@example.com"
+    message["Subject"] = subject
+    message["Date"] = "Tue, 14 Oct 2025 10:02:00 +0500"
+    return message
+
+
+def build_corpus() -> list:
+    corpus = []
+
+    newsletter = _message("Your weekly digest")
+    css = "".join(f".c{i}{{margin:0;padding:{i}px;font-family:Helvetica,Arial,sans-serif}}" for i in range(150))
+    items = "".join(NEWSLETTER_ITEM.format(n=n, prose=PROSE * 2) for n in range(12))
+    newsletter.set_content(NEWSLETTER_HTML.format(css=css, items=items), subtype="html")
+    corpus.append(("newsletter (html only)", newsletter))
+
+    gmail_reply = _message("Re: Q3 numbers")
+    reply = (f"Sounds good, let's go through it on Thursday.\n\n{SIGNATURE}\n\n"
+             f"On Mon, Oct 13, 2025 at 6:41 PM Sara Ahmed <sara@example.com>\nwrote:\n\n{QUOTED_THREAD}")
+    gmail_reply.set_content(reply)
+    gmail_reply.add_alternative("<div dir=\"ltr\">" + reply.replace("\n", "<br>") + "</div>", subtype="html")
+    corpus.append(("gmail reply thread", gmail_reply))
+
+    outlook_reply = _message("RE: Contract renewal")
+    outlook_reply.set_content(
+        "<html><head><style>" + "p.MsoNormal{margin:0cm;font-size:11.0pt;font-family:\"Calibri\",sans-serif}" * 20
+        + "</style></head><body lang=\"EN-US\"><div class=\"WordSection1\"><p class=\"MsoNormal\">Hi,<o:p></o:p></p>"
+        + "<p class=\"MsoNormal\">Approved from our side, please send the final copy.<o:p></o:p></p>"
+        + "<p class=\"MsoNormal\">Thanks,<br>Bilal<o:p></o:p></p><div><div style=\"border:none;border-top:solid #E1E1E1 1.0pt\">"
+        + "<p class=\"MsoNormal\"><b>From:</b> Legal Team &lt;legal@example.com&gt;<br><b>Sent:</b> Monday, October 13, 2025 4:12 PM"
+        + "<br><b>To:</b> Bilal<br><b>Subject:</b> Contract renewal<o:p></o:p></p></div></div>"
+        + "".join(f"<p class=\"MsoNormal\">{PROSE}<o:p></o:p></p>" for _ in range(15)) + "</div></body></html>",
+        subtype="html")
+    corpus.append(("outlook reply (html only)", outlook_reply))
+
+    nested = _message("Invoice October")
+    nested.set_content("Hi, the invoice for October is attached. Payment is due on the 30th.\n\nThanks!")
+    nested.add_alternative("<p>Hi, the invoice for October is attached. Payment is due on the 30th.</p>"
+                           "<p><img src=\"cid:logo\"></p><p>Thanks!</p>", subtype="html")
+    nested.get_payload()[1].add_related(b"\x89PNG" + bytes(20_000), "image", "png", cid="<logo>")
+    nested.add_attachment(bytes(200_000), maintype="application", subtype="pdf", filename="invoice.pdf")
+    corpus.append(("mixed>alternative>related", nested))
+
+    latin1 = _message("Café menu")
+    latin1.set_content("Le menu du café est prêt, voir la pièce jointe pour le résumé.\n\nSent from my iPhone",
+                       charset="iso-8859-1")
+    corpus.append(("iso-8859-1 plain, mobile", latin1))
+
+    report = _message("Incident report")
+    report.set_content(PROSE * 120)
+    corpus.append(("long plain report", report))
+
+    receipt = _message("Your order receipt")
+    rows = "".join(f"<tr><td>Item {i}</td><td>1</td><td>$ {i * 3}.99</td></tr>" for i in range(1, 16))
+    receipt.set_content(f"<html><body><h1>Thanks for your order</h1><table>{rows}</table>"
+                        f"<p>Total: $ 371.85</p></body></html>", subtype="html")
+    corpus.append(("receipt (html table)", receipt))
+
+    invite = _message("Invitation: Design review @ Thu 3pm")
+    invite.set_content("You have been invited to Design review on Thursday at 3pm.\nJoin: https://meet.example.com/abc")
+    invite.add_alternative("<p>You have been invited to <b>Design review</b> on Thursday at 3pm.</p>", subtype="html")
+    invite.make_mixed()
+    invite.attach(EmailMessage())
+    invite.get_payload()[-1].set_content("BEGIN:VCALENDAR\n" + "X-PROP:value\n" * 200 + "END:VCALENDAR",
+                                         subtype="calendar")
+    corpus.append(("calendar invite", invite))
+
+    forward = _message("Fwd: Offsite plan")
+    forward.set_content("FYI, see the plan below.\n\n---------- Forwarded message ---------\n"
+                        "From: Events <events@example.com>\nDate: Mon, Oct 13, 2025\nSubject: Offsite plan\n\n"
+                        + PROSE * 4)
+    corpus.append(("forwarded message", forward))
+    return corpus
+
+
+def load_corpus(directory: str) -> list:
+    parser = BytesParser(policy=policy.default)
+    return [(path.name, parser.parse(path.open("rb"))) for path in sorted(Path(directory).glob("*.eml"))]
+
+
+def legacy_body(payload: dict) -> str:
+    """The body extraction of parse_email before nested walking and cleaning (for comparison)."""
+    email_body = ""
+    parts = payload.get('parts')
+    if parts:
+        for part in parts:
+            mime_type = part.get('mimeType')
+            body = part.get('body')
+            if mime_type == 'text/plain' and body and 'data' in body:
+                email_body = base64.urlsafe_b64decode(body['data'].encode('UTF-8')).decode('UTF-8')
+                break
+            elif mime_type == 'text/html' and body and 'data' in body:
+                email_body = base64.urlsafe_b64decode(body['data'].encode('UTF-8')).decode('UTF-8')
+    elif payload.get('body') and 'data' in payload['body']:
+        email_body = base64.urlsafe_b64decode(payload['body']['data'].encode('UTF-8')).decode('UTF-8')
+    return email_body
+
+
+def new_body(payload: dict) -> str:
+    return truncate_to_tokens(extract_body(payload), EMAIL_BODY_MAX_TOKENS)[0]
+
+
+def measure(extract, payload: dict) -> tuple:
+    try:
+        text = extract(payload)
+    except UnicodeDecodeError:
+        return None, 0.0
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        extract(payload)
+    return text, (time.perf_counter() - started) / REPEAT
+
+
+def tokens(text) -> str:
+    return "error" if text is None else str(math.ceil(len(text) / EMAIL_CHARS_PER_TOKEN))
+
+
+def main():
+    corpus = load_corpus(sys.argv[1]) if len(sys.argv) > 1 else build_corpus()
+    print(f"{len(corpus)} messages, per-message budget {EMAIL_BODY_MAX_TOKENS} tokens\n")
+    print(f"{'message':>26} | {'legacy tokens':>13} {'parse':>9} | {'new tokens':>10} {'parse':>9}")
+    totals = [0, 0.0, 0, 0.0]
+    for name, mime in corpus:
+        payload = payload_from_mime(mime)
+        (old_text, old_time), (text, new_time) = measure(legacy_body, payload), measure(new_body, payload)
+        print(f"{name[:26]:>26} | {tokens(old_text):>13} {old_time * 1e6:>7.0f}µs | "
+              f"{tokens(text):>10} {new_time * 1e6:>7.0f}µs")
+        totals = [totals[0] + len(old_text or "") / EMAIL_CHARS_PER_TOKEN, totals[1] + old_time,
+                  totals[2] + len(text) / EMAIL_CHARS_PER_TOKEN, totals[3] + new_time]
+    print(f"{'total':>26} | {totals[0]:>13.0f} {totals[1] * 1e6:>7.0f}µs | {totals[2]:>10.0f} {totals[3] * 1e6:>7.0f}µs")
+
+    if len(sys.argv) == 1:
+        print("\nExtracted bodies:")
+        for name, mime in corpus:
+            print(f"--- {name}\n{new_body(payload_from_mime(mime))[:300]}")
+
+
+if __name__ == "__main__":
+    main()
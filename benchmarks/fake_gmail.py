@@ -0,0 +1,230 @@
+"""
+A small local fake of the Gmail REST API used by the benchmarks.
+
+It serves messages().list, messages().get, getProfile, history().list and the multipart
+batch endpoint, and sleeps LATENCY seconds per HTTP round-trip to simulate network distance.
+add_message/delete_message/modify_labels change the mailbox and record history, so incremental
+sync can be exercised. payload_from_mime turns real MIME messages into Gmail payloads.
+"""
+import base64
+import json
+import re
+import threading
+import time
+from email.parser import Parser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+MESSAGE_PATH = re.compile(r"^/gmail/v1/users/me/messages/([^/?]+)$")
+
+
+def make_message(message_id: str, body_size: int = 2000, internal_date: int = 0, labels: list = None) -> dict:
+    """Builds a Gmail 'full' format message with a text/plain and a text/html part."""
+    text = (f"Hello, this is message {message_id}. " * (body_size // 32 + 1))[:body_size]
+    encoded = base64.urlsafe_b64encode(text.encode()).decode()
+    return {
+        "id": message_id,
+        "threadId": message_id,
+        "labelIds": list(labels or ["INBOX"]),
+        "internalDate": str(internal_date),
+        "payload": {
+            "mimeType": "multipart/alternative",
+            "headers": [
+                {"name": "From", "value": f"sender{message_id}@example.com"},
+                {"name": "Subject", "value": f"Subject {message_id}"},
+            ],
+            "parts": [
+                {"mimeType": "text/plain", "body": {"data": encoded}},
+                {"mimeType": "text/html", "body": {"data": encoded}},
+            ],
+        },
+    }
+
+
+def payload_from_mime(part) -> dict:
+    """
+    Converts an email.message.Message into the 'payload' of a Gmail 'full' format message:
+    the same MIME tree with base64url bodies, attachments referenced by attachmentId.
+    """
+    payload = {
+        "mimeType": part.get_content_type(),
+        "filename": part.get_filename() or "",
+        "headers": [{"name": name, "value": str(value)} for name, value in part.items()],
+    }
+    if part.is_multipart():
+        payload["body"] = {"size": 0}
+        payload["parts"] = [payload_from_mime(child) for child in part.get_payload()]
+        return payload
+    data = part.get_payload(decode=True) or b""
+    if payload["filename"]:
+        payload["body"] = {"attachmentId": f"att-{len(data)}", "size": len(data)}
+    else:
+        payload["body"] = {"data": base64.urlsafe_b64encode(data).decode(), "size": len(data)}
+    return payload
+
+
+class FakeGmail:
+    """Holds the fake mailbox and runs the HTTP server in a background thread."""
+
+    def __init__(self, message_count: int = 100, latency: float = 0.03, missing_ids: set = None):
+        self.latency = latency
+        self.messages = {}
+        self.missing_ids = missing_ids or set()
+        self.history = []  # Gmail history records, oldest first
+        self.history_id = 1000
+        self.oldest_history_id = self.history_id  # older startHistoryIds get a 404, like Gmail
+        self.round_trips = 0
+        for i in range(message_count):
+            self.add_message(f"m{i:04d}", record=False)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def service(self):
+        """Builds a real googleapiclient Gmail service pointed at this fake server."""
+        document = json.loads(get_static_doc("gmail", "v1"))
+        document["rootUrl"] = self.root_url
+        return build_from_document(document, http=httplib2.Http())
+
+    # --- mailbox changes ---
+
+    def _record(self, kind: str, message_id: str, labels: list = None) -> None:
+        self.history_id += 1
+        record = {"id": str(self.history_id)}
+        entry = {"message": {"id": message_id, "threadId": message_id}}
+        if labels is not None:
+            entry["labelIds"] = labels
+        record[kind] = [entry]
+        self.history.append(record)
+
+    def add_message(self, message_id: str, labels: list = None, record: bool = True) -> None:
+        self.messages[message_id] = make_message(message_id, internal_date=len(self.messages) + 1, labels=labels)
+        if record:
+            self._record("messagesAdded", message_id)
+
+    def delete_message(self, message_id: str) -> None:
+        del self.messages[message_id]
+        self._record("messagesDeleted", message_id)
+
+    def modify_labels(self, message_id: str, add: list = (), remove: list = ()) -> None:
+        labels = self.messages[message_id]["labelIds"]
+        for label in add:
+            if label not in labels:
+                labels.append(label)
+        for label in remove:
+            if label in labels:
+                labels.remove(label)
+        if add:
+            self._record("labelsAdded", message_id, list(add))
+        if remove:
+            self._record("labelsRemoved", message_id, list(remove))
+
+    def expire_history(self) -> None:
+        """Forgets all history, as Gmail does after about a week."""
+        self.history = []
+        self.oldest_history_id = self.history_id + 1
+
+    # --- request handling ---
+
+    def _get(self, path: str, query: dict) -> tuple[int, dict]:
+        if path == "/gmail/v1/users/me/messages":
+            limit = int(query.get("maxResults", ["100"])[0])
+            labels = query.get("labelIds", [])
+            # Spam and trash are only listed when asked for, by label or includeSpamTrash
+            hidden = set() if query.get("includeSpamTrash") == ["true"] else {"SPAM", "TRASH"} - set(labels)
+            matching = [m for m in self.messages.values() if all(label in m["labelIds"] for label in labels)
+                        and not hidden.intersection(m["labelIds"])]
+            matching.sort(key=lambda m: int(m["internalDate"]), reverse=True)
+            return 200, {"messages": [{"id": m["id"], "threadId": m["id"]} for m in matching[:limit]]}
+
+        if path == "/gmail/v1/users/me/profile":
+            return 200, {"emailAddress": "me@example.com", "messagesTotal": len(self.messages),
+                         "historyId": str(self.history_id)}
+
+        if path == "/gmail/v1/users/me/history":
+            start = int(query["startHistoryId"][0])
+            if start < self.oldest_history_id - 1:
+                return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+            records = [r for r in self.history if int(r["id"]) > start]
+            return 200, {"history": records, "historyId": str(self.history_id)}
+
+        match = MESSAGE_PATH.match(path)
+        if match:
+            message_id = match.group(1)
+            if message_id in self.missing_ids or message_id not in self.messages:
+                return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+            return 200, dict(self.messages[message_id], historyId=str(self.history_id))
+
+        return 404, {"error": {"code": 404, "message": f"Unknown path {path}"}}
+
+    def _batch(self, content_type: str, body: str) -> tuple[str, str]:
+        parsed = Parser().parsestr(f"Content-Type: {content_type}\r\n\r\n{body}")
+        boundary = "batch_fake_gmail"
+        parts = []
+        for part in parsed.get_payload():
+            request_line = part.get_payload().splitlines()[0]
+            _, url, _ = request_line.split(" ", 2)
+            parsed_url = urlparse(url)
+            status, payload = self._get(parsed_url.path, parse_qs(parsed_url.query))
+            content_id = part["Content-ID"].replace("<", "<response-", 1)
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: {content_id}\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+        return f"multipart/mixed; boundary={boundary}", "".join(parts) + f"--{boundary}--\r\n"
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, content_type: str, payload: str):
+                data = payload.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _delay(self):
+                fake.round_trips += 1
+                time.sleep(fake.latency)
+
+            def do_GET(self):
+                self._delay()
+                url = urlparse(self.path)
+                status, payload = fake._get(url.path, parse_qs(url.query))
+                self._send(status, "application/json", json.dumps(payload))
+
+            def do_POST(self):
+                self._delay()
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode()
+                if urlparse(self.path).path != "/batch":
+                    self._send(404, "application/json", "{}")
+                    return
+                content_type, payload = fake._batch(self.headers["Content-Type"], body)
+                self._send(200, content_type, payload)
+
+        return Handler
@@ -0,0 +1,68 @@
+"""
+A scripted fake chat model for benchmarks that run the real agent graphs offline.
+
+Every call records its prompt size, sleeps to simulate model latency (a fixed cost
+plus a prefill cost per prompt token) and answers with whatever `responder` returns.
+"""
+import json
+import time
+from typing import Any, Callable
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def default_responder(messages: list) -> AIMessage:
+    return AIMessage(content="Sure! Here is a short, friendly answer to your question with the details you asked for.")
+
+
+class ScriptedChatModel(BaseChatModel):
+    responder: Callable[[list], AIMessage] = default_responder
+    call_latency: float = 0.005
+    token_latency: float = 0.00002
+    output_token_latency: float = 0.0  # per generated word
+    calls: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _respond(self, messages) -> AIMessage:
+        prompt_tokens = count_tokens_approximately(messages)
+        time.sleep(self.call_latency + prompt_tokens * self.token_latency)
+        message = self.responder(messages)
+        message.id = message.id or f"fake-{len(self.calls)}"
+        output_tokens = count_tokens_approximately([message])
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        }
+        self.calls.append({"prompt_tokens": prompt_tokens, "messages": messages, "response": message})
+        return message
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._respond(messages)
+        # Generating the words takes the same time whether or not they are streamed
+        time.sleep(len(message.content.split(" ")) * self.output_token_latency if message.content else 0)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._respond(messages)
+        words = message.content.split(" ") if message.content else []
+        for word in words:
+            time.sleep(self.output_token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " ", id=message.id))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", id=message.id, usage_metadata=message.usage_metadata,
+            tool_call_chunks=[{"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                              for i, c in enumerate(message.tool_calls)]
+        ))
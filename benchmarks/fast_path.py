@@ -0,0 +1,182 @@
+"""
+Benchmark: simple single-tool requests answered by the agents vs by the deterministic fast path.
+
+agents     the request goes to the agent that owns the tool (as if the intent router sent it
+           there): one model call to pick the tool call, the tool, one model call for the answer
+fast path  try_fast_path calls the same tool directly and fills in a template
+
+Both use the real tools against local fakes: OpenWeatherMap, Google Calendar and Gmail (with
+API_DELAY per call) and a scripted model (MODEL_DELAY per call). Requests the fast path must not
+answer are checked to fall through to the agents.
+
+Run from the project root:
+    python -m benchmarks.fast_path
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+from langgraph_swarm import create_swarm
+
+from app.tools.general_chat import weather_tool
+from app.tools.mail import read_mail
+from app.tools.mail.mailbox_cache import MailboxCache
+from app.tools.reminder import read_reminder
+from app.utils.fast_path import try_fast_path, fast_path_stats
+from benchmarks.fake_gmail import FakeGmail
+from benchmarks.fake_llm import ScriptedChatModel
+
+API_DELAY = 0.1
+MODEL_DELAY = 0.5
+
+# (request, agent, tool, tool args) for requests the fast path should answer
+SIMPLE_REQUESTS = [
+    ("weather in Lahore", "Charlie", "get_weather_by_city", {"city_name": "Lahore"}),
+    ("What's the weather in Karachi?", "Charlie", "get_weather_by_city", {"city_name": "Karachi"}),
+    ("islamabad weather now", "Charlie", "get_weather_by_city", {"city_name": "islamabad"}),
+    ("what's on my calendar 2025-06-02", "Bravo", "read_reminders_tool", {"date": "2025-06-02"}),
+    ("show my reminders for 2025-06-03", "Bravo", "read_reminders_tool", {"date": "2025-06-03"}),
+    ("any unread emails?", "Alpha", "list_emails_tool", {"limit": "5", "label_ids": ["INBOX", "UNREAD"]}),
+    ("show me my last 3 emails", "Alpha", "list_emails_tool", {"limit": "3", "label_ids": ["INBOX"]}),
+]
+
+# Requests that need the model: conditions, several tools, or no tool at all
+OTHER_REQUESTS = [
+    "weather in lahore tomorrow",
+    "weather in lahore and karachi",
+    "what's on my calendar next week?",
+    "any emails from sara about the invoice?",
+    "remind me at 7 PM tomorrow",
+    "hi",
+    "generate an image of a cat",
+]
+
+
+class FakeOpenWeatherMap(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(API_DELAY)
+        city = parse_qs(urlparse(self.path).query)["q"][0]
+        body = json.dumps({"name": city.title(), "main": {"temp": 31, "humidity": 40},
+                           "weather": [{"description": "clear sky"}], "wind": {"speed": 3}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeCalendar:
+    """Just enough of the Calendar service for read_reminders_tool: events().list(...).execute()."""
+
+    def events(self):
+        return self
+
+    def list(self, timeMin, **kwargs):
+        day = timeMin[:10]
+        self._items = [{"summary": "Standup", "start": {"dateTime": f"{day}T10:00:00+05:00"}},
+                       {"summary": "Dentist", "start": {"dateTime": f"{day}T17:30:00+05:00"}}]
+        return self
+
+    def execute(self):
+        time.sleep(API_DELAY)
+        return {"items": self._items}
+
+
+def make_responder(tool_calls: dict):
+    """Plays the owning agent: first the tool call for the request, then an answer from its result."""
+    def respond(messages: list) -> AIMessage:
+        if isinstance(messages[-1], ToolMessage):
+            return AIMessage(content=f"Here you go! 😊\n\n{messages[-1].content}")
+        request = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+        name, args = tool_calls[request]
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": str(uuid.uuid4())}])
+    return respond
+
+
+def build_app(model):
+    tools = {"Alpha": [read_mail.list_emails_tool], "Bravo": [read_reminder.read_reminders_tool],
+             "Charlie": [weather_tool.get_weather_by_city]}
+    agents = [create_react_agent(model, tools=agent_tools, prompt=f"You are {name}.", name=name)
+              for name, agent_tools in tools.items()]
+    return create_swarm(agents, default_active_agent="Charlie").compile(checkpointer=InMemorySaver())
+
+
+def reset_caches():
+    weather_tool.weather_cache.invalidate()
+    read_reminder.events_cache.invalidate()
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenWeatherMap)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    weather_tool.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/data/2.5/weather"
+    read_reminder.google_service = lambda *args: nullcontext(FakeCalendar())
+
+    with FakeGmail(message_count=20, latency=API_DELAY) as fake, tempfile.TemporaryDirectory() as tmp:
+        for message_id in list(fake.messages)[-8:]:
+            fake.messages[message_id]["labelIds"].append("UNREAD")
+        gmail = fake.service()
+        read_mail.google_service = lambda *args: nullcontext(gmail)
+
+        tool_calls = {request: (tool, args) for request, _, tool, args in SIMPLE_REQUESTS}
+        model = ScriptedChatModel(calls=[], responder=make_responder(tool_calls), call_latency=MODEL_DELAY)
+        app = build_app(model)
+
+        print(f"model {MODEL_DELAY * 1000:.0f} ms/call, APIs {API_DELAY * 1000:.0f} ms/call\n")
+        print(f"{'request':>34} | {'agents: calls':>13} {'latency':>9} | {'fast path: calls':>16} {'latency':>9}")
+        totals = [0, 0.0, 0, 0.0]
+        for request, agent, _, _ in SIMPLE_REQUESTS:
+            messages = [HumanMessage(content=request)]
+
+            reset_caches()
+            read_mail.mailbox_cache = MailboxCache(read_mail.get_messages_batched, read_mail.parse_email,
+                                                   path=os.path.join(tmp, f"agents-{uuid.uuid4()}.db"))
+            calls_before = len(model.calls)
+            started = time.perf_counter()
+            app.invoke({"messages": messages, "active_agent": agent},
+                       config={"configurable": {"thread_id": str(uuid.uuid4())}})
+            agents = (len(model.calls) - calls_before, time.perf_counter() - started)
+
+            reset_caches()
+            read_mail.mailbox_cache = MailboxCache(read_mail.get_messages_batched, read_mail.parse_email,
+                                                   path=os.path.join(tmp, f"fast-{uuid.uuid4()}.db"))
+            config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            calls_before = len(model.calls)
+            started = time.perf_counter()
+            result = try_fast_path(app, config, messages, request)
+            fast = (len(model.calls) - calls_before, time.perf_counter() - started)
+            assert result is not None, request
+            state = app.get_state(config).values
+            assert state["active_agent"] == agent and state["messages"][-1].content == result[1], request
+
+            totals = [totals[0] + agents[0], totals[1] + agents[1], totals[2] + fast[0], totals[3] + fast[1]]
+            print(f"{request[:34]:>34} | {agents[0]:>13} {agents[1] * 1000:>7.0f}ms | "
+                  f"{fast[0]:>16} {fast[1] * 1000:>7.0f}ms")
+        print(f"{'total':>34} | {totals[0]:>13} {totals[1] * 1000:>7.0f}ms | {totals[2]:>16} {totals[3] * 1000:>7.0f}ms")
+
+        for request in OTHER_REQUESTS:
+            assert try_fast_path(app, {"configurable": {"thread_id": str(uuid.uuid4())}},
+                                 [HumanMessage(content=request)], request) is None, request
+
+    stats = fast_path_stats.snapshot()
+    print(f"\nfast path: hits {stats['hits']}, {stats['misses']} fell through to the agents "
+          f"(hit rate {stats['hit_rate']:.0%}), p50 {stats['latency']['p50_ms']:.0f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
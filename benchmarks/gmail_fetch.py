@@ -0,0 +1,61 @@
+"""
+Benchmark: sequential messages().get vs batched fetch in list_emails.
+
+Run from the project root:
+    python -m benchmarks.gmail_fetch
+"""
+import time
+
+from app.tools.mail.read_mail import format_email_summary, get_messages_batched
+from benchmarks.fake_gmail import FakeGmail
+
+LIMITS = [1, 5, 10, 20, 50, 100]
+
+
+def fetch_sequential(service, message_ids):
+    return [
+        service.users().messages().get(userId='me', id=message_id, format='full').execute()
+        for message_id in message_ids
+    ]
+
+
+def main():
+    with FakeGmail(message_count=max(LIMITS), latency=0.03, missing_ids={"m0097"}) as fake:
+        service = fake.service()
+        print(f"Fake Gmail at {fake.root_url} (30 ms per round-trip)\n")
+        print(f"{'limit':>6} {'sequential':>12} {'batched':>10} {'trips seq':>10} {'trips batch':>12}")
+
+        for limit in LIMITS:
+            listed = service.users().messages().list(userId='me', maxResults=limit).execute()
+            message_ids = [msg['id'] for msg in listed['messages']]
+
+            fake.round_trips = 0
+            started = time.perf_counter()
+            sequential = []
+            for message_id in message_ids:
+                try:
+                    sequential.extend(fetch_sequential(service, [message_id]))
+                except Exception as e:
+                    sequential.append(e)
+            sequential_time = time.perf_counter() - started
+            sequential_trips = fake.round_trips
+
+            fake.round_trips = 0
+            started = time.perf_counter()
+            batched = get_messages_batched(service, message_ids)
+            batched_time = time.perf_counter() - started
+            batched_trips = fake.round_trips
+
+            # Same order and same per-message failures on both paths
+            assert [m['id'] if isinstance(m, dict) else type(m) for m in batched] == \
+                   [m['id'] if isinstance(m, dict) else type(m) for m in sequential]
+            for msg in batched:
+                if isinstance(msg, dict):
+                    format_email_summary(msg)
+
+            print(f"{limit:>6} {sequential_time * 1000:>10.1f}ms {batched_time * 1000:>8.1f}ms "
+                  f"{sequential_trips:>10} {batched_trips:>12}")
+
+
+if __name__ == "__main__":
+    main()
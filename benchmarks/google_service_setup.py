@@ -0,0 +1,116 @@
+"""
+Benchmark: per-call Google client setup, old paths vs the shared service pool.
+
+token.json + build()  re-reads token.json and runs discovery.build() on every tool call
+thread-local          the previous registry: one client per thread, kept in a threading.local()
+pool                  the service registry: clients checked out of a pool shared by all threads
+
+Tool calls run the way the ToolNode runs them: every tool step opens a new executor with
+get_executor_for_config and runs its (parallel) tool calls on it, so each step's threads are new.
+No network is used (static discovery documents and a not-yet-expired fake token); a call holds
+its client for CALL_SECONDS, as a request would.
+
+Run from the project root:
+    python -m benchmarks.google_service_setup
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from langchain_core.runnables.config import get_executor_for_config
+
+from app.utils.google_cloud import service_registry
+from app.utils.google_cloud.cloud_config import get_credentials
+from config.settings import GOOGLE_SCOPES
+
+STEPS = 10  # tool steps, each on a new executor
+PARALLEL = 3  # tool calls per step
+CALL_SECONDS = 0.005
+APIS = [("gmail", "v1"), ("calendar", "v3")]
+
+
+def write_fake_token(path: str):
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    with open(path, "w") as f:
+        json.dump({
+            "token": "fake-access-token",
+            "refresh_token": "fake-refresh-token",
+            "client_id": "fake-client-id",
+            "client_secret": "fake-client-secret",
+            "scopes": GOOGLE_SCOPES,
+            "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        }, f)
+
+
+def old_call(api: str, version: str) -> None:
+    creds = Credentials.from_authorized_user_file("token.json", GOOGLE_SCOPES)
+    build(api, version, credentials=creds)
+    time.sleep(CALL_SECONDS)
+
+
+_local = threading.local()
+thread_local_builds = 0
+
+
+def thread_local_call(api: str, version: str) -> None:
+    global thread_local_builds
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+    if (api, version) not in services:
+        services[(api, version)] = service_registry._build(api, version, get_credentials())
+        thread_local_builds += 1
+    time.sleep(CALL_SECONDS)
+
+
+def pool_call(api: str, version: str) -> None:
+    with service_registry.google_service(api, version):
+        time.sleep(CALL_SECONDS)
+
+
+def run_steps(call, api: str, version: str) -> float:
+    """Runs STEPS tool steps of PARALLEL calls; returns ms per call."""
+    started = time.perf_counter()
+    for _ in range(STEPS):
+        with get_executor_for_config({}) as executor:
+            for future in [executor.submit(call, api, version) for _ in range(PARALLEL)]:
+                future.result()
+    return (time.perf_counter() - started) * 1000 / (STEPS * PARALLEL)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            write_fake_token("token.json")
+            print(f"{STEPS} tool steps x {PARALLEL} parallel calls, each step on a new executor "
+                  f"({CALL_SECONDS * 1000:.0f} ms per call included)\n")
+            for api, version in APIS:
+                old_ms = run_steps(old_call, api, version)
+                builds_before = thread_local_builds
+                thread_local_ms = run_steps(thread_local_call, api, version)
+                thread_local = thread_local_builds - builds_before
+                builds_before = service_registry.build_stats.snapshot()["count"]
+                pool_ms = run_steps(pool_call, api, version)
+                pooled = service_registry.build_stats.snapshot()["count"] - builds_before
+                print(f"{api}/{version}: token.json + build() {old_ms:.2f} ms/call | "
+                      f"thread-local {thread_local_ms:.2f} ms/call, {thread_local} builds | "
+                      f"pool {pool_ms:.2f} ms/call, {pooled} builds")
+                assert pooled <= PARALLEL, pooled
+        finally:
+            os.chdir(cwd)
+
+    stats = service_registry.get_setup_stats()
+    print(f"\npool builds: {stats['builds']['count']} (mean {stats['builds']['mean_ms']:.2f} ms), "
+          f"hits: {stats['hits']['count']} (mean {stats['hits']['mean_ms']:.3f} ms), "
+          f"estimated saved: {stats['estimated_saved_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
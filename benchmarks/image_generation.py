@@ -0,0 +1,95 @@
+"""
+Benchmark: latency and bandwidth of generate_image_tool validation modes.
+
+full      the old behaviour: download the whole image just to check the status code
+            (and the browser then downloads it a second time)
+stream    read the headers and first chunk, then close the connection
+cache     stream the image once into the local image cache; repeats are served from disk
+
+stream/cache run as background jobs: "blocked" is how long the agent turn waits for the tool,
+"total" is until every image is ready.
+
+A local fake of Pollinations waits GENERATION_DELAY before answering with a ~IMAGE_KB image.
+
+Run from the project root:
+    python -m benchmarks.image_generation
+"""
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.tools.general_chat import image_tool
+from app.utils.jobs import JobQueue
+
+GENERATION_DELAY = 0.5
+IMAGE_KB = 300
+PROMPTS = ["a cat", "a dog", "a cat"]  # the repeated prompt shows the cache
+
+
+class FakePollinations(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(GENERATION_DELAY)
+        body = os.urandom(IMAGE_KB * 1024)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            for offset in range(0, len(body), 16 * 1024):
+                self.wfile.write(body[offset:offset + 16 * 1024])
+                time.sleep(0.002)  # ~8 MB/s link
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client closed early after validating
+
+
+def run(mode: str, base_url: str) -> tuple[float, float, int]:
+    image_tool.IMAGE_API_URL = base_url
+    image_tool.transfer_stats.update(requests=0, bytes_downloaded=0, cache_hits=0)
+    image_tool.image_jobs = JobQueue("image", max_workers=2, timeout=60)
+    started = time.perf_counter()
+    urls = []
+    for prompt in PROMPTS:
+        url = image_tool.build_image_url(prompt)
+        if mode == "full":
+            image_tool._count_transfer(len(requests.get(url).content))
+        else:
+            image_tool.generate_image_tool.func(prompt)
+            urls.append(url)
+    blocked = time.perf_counter() - started
+    while any(not image_tool.image_jobs.get(url).finished for url in urls if image_tool.image_jobs.get(url)):
+        time.sleep(0.01)
+    return blocked, time.perf_counter() - started, image_tool.transfer_stats["bytes_downloaded"]
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePollinations)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/p/"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = {"full": run("full", base_url)}
+        image_tool.IMAGE_CACHE_DIR = None
+        results["stream"] = run("stream", base_url)
+        image_tool.IMAGE_CACHE_DIR = cache_dir
+        results["cache"] = run("cache", base_url)
+
+    print(f"{len(PROMPTS)} generations, prompts {PROMPTS}")
+    for mode, (blocked, elapsed, downloaded) in results.items():
+        browser_kb = IMAGE_KB * len(PROMPTS) if mode != "cache" else 0
+        print(f"{mode:>6}: blocked {blocked * 1000:6.0f} ms, total {elapsed * 1000:6.0f} ms, "
+              f"tool downloaded {downloaded / 1024:6.0f} KB, "
+              f"browser downloads {browser_kb} KB more from Pollinations")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
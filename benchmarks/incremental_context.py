@@ -0,0 +1,84 @@
+"""
+Benchmark: prompt tokens and latency per turn over a 50-turn scripted conversation.
+
+legacy       re-sends the last MAX_PREVIOUS_MESSAGES_FOR_CONTEXT chat messages on every
+             app.invoke, on top of what the checkpointer already holds for the thread.
+incremental  sends only the new user message and trims/summarizes to a token budget.
+
+Run from the project root:
+    python -m benchmarks.incremental_context
+"""
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+from langgraph_swarm import create_handoff_tool, create_swarm
+
+from app.utils.context import build_invoke_messages, make_context_trimmer
+from benchmarks.fake_llm import ScriptedChatModel
+from config.settings import MAX_PREVIOUS_MESSAGES_FOR_CONTEXT
+
+TURNS = 50
+BENCHMARK_CONTEXT_TOKENS = 1500  # small budget so trimming kicks in within 50 turns
+REPORT_TURNS = [1, 5, 10, 20, 30, 40, 50]
+
+
+def build_app(model, pre_model_hook):
+    agents = [
+        create_react_agent(
+            model,
+            tools=[create_handoff_tool(agent_name=other) for other in ("Alpha", "Bravo", "Charlie") if other != name],
+            prompt=f"You are {name}.",
+            pre_model_hook=pre_model_hook,
+            name=name,
+        )
+        for name in ("Alpha", "Bravo", "Charlie")
+    ]
+    return create_swarm(agents, default_active_agent="Charlie").compile(checkpointer=InMemorySaver())
+
+
+def run(mode: str) -> list:
+    model = ScriptedChatModel(calls=[])
+    summarizer = ScriptedChatModel(
+        calls=[], responder=lambda messages: AIMessage(content="The user asked a series of questions about trips."))
+    trimmer = make_context_trimmer(BENCHMARK_CONTEXT_TOKENS, summarizer) if mode == "incremental" else None
+    app = build_app(model, trimmer)
+    thread_id = str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id}}
+    chat_history = []
+    results = []
+
+    for turn in range(1, TURNS + 1):
+        chat_history.append({"role": "user", "content": f"Turn {turn}: can you help me plan day {turn} of my trip?"})
+        if mode == "legacy":
+            messages = [HumanMessage(content=m["content"]) if m["role"] == "user" else AIMessage(content=m["content"])
+                        for m in chat_history[-MAX_PREVIOUS_MESSAGES_FOR_CONTEXT:]]
+        else:
+            messages = build_invoke_messages(app, thread_id, chat_history)
+
+        calls_before = len(model.calls)
+        started = time.perf_counter()
+        response = app.invoke({"messages": messages}, config=config)
+        latency = time.perf_counter() - started
+        chat_history.append({"role": "assistant", "content": response["messages"][-1].content})
+
+        prompt_tokens = sum(c["prompt_tokens"] for c in model.calls[calls_before:])
+        results.append((turn, prompt_tokens, latency, len(response["messages"])))
+    return results
+
+
+def main():
+    legacy, incremental = run("legacy"), run("incremental")
+    print(f"{'turn':>4} | {'legacy tokens':>13} {'latency':>9} {'state msgs':>10} | "
+          f"{'incr. tokens':>12} {'latency':>9} {'state msgs':>10}")
+    for (turn, lt, ll, lm), (_, it, il, im) in zip(legacy, incremental):
+        if turn in REPORT_TURNS:
+            print(f"{turn:>4} | {lt:>13} {ll * 1000:>7.1f}ms {lm:>10} | {it:>12} {il * 1000:>7.1f}ms {im:>10}")
+    print(f"\ntotal prompt tokens: legacy {sum(r[1] for r in legacy)}, incremental {sum(r[1] for r in incremental)}")
+    print(f"total latency: legacy {sum(r[2] for r in legacy):.2f}s, incremental {sum(r[2] for r in incremental):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: LLM calls and handoffs per query with and without the keyword intent router.
+
+Each labelled query runs through stream_swarm_turn (as main.py does) in a fresh thread of a
+swarm whose agents are played by a scripted model: an agent that is not the right one for the query hands off to it (one LLM call and a
+handoff), the right one answers. Queries start on Charlie, like a new conversation, or on the
+agent a previous turn left active.
+
+swarm   every turn starts at the swarm's active agent (the old behaviour)
+router  route_intent picks the starting agent when it is confident, otherwise as above
+
+Run from the project root:
+    python -m benchmarks.intent_router
+"""
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+from langgraph_swarm import create_handoff_tool, create_swarm
+
+from app.utils.router import route_intent
+from app.utils.streaming import stream_swarm_turn
+from benchmarks.fake_llm import ScriptedChatModel
+
+AGENTS = ["Alpha", "Bravo", "Charlie"]
+
+# (query, agent active when it arrives, agent that should answer it)
+LABELLED_QUERIES = [
+    ("any unread emails?", "Charlie", "Alpha"),
+    ("show me my last 5 emails", "Charlie", "Alpha"),
+    ("check my inbox", "Charlie", "Alpha"),
+    ("send an email to bob@example.com saying I'll be late", "Charlie", "Alpha"),
+    ("anything in spam?", "Charlie", "Alpha"),
+    ("did sara reply to my mail", "Bravo", "Alpha"),
+    ("remind me at 7 PM tomorrow to call mom", "Charlie", "Bravo"),
+    ("what's on my calendar on 2025-06-02?", "Charlie", "Bravo"),
+    ("set a reminder for the dentist appointment on friday", "Charlie", "Bravo"),
+    ("do I have any meetings tomorrow", "Charlie", "Bravo"),
+    ("what reminders do I have this week", "Alpha", "Bravo"),
+    ("schedule a standup at 10am", "Alpha", "Bravo"),
+    ("weather tomorrow in lahore", "Charlie", "Charlie"),
+    ("what's the temperature in karachi", "Alpha", "Charlie"),
+    ("generate an image of a cat", "Charlie", "Charlie"),
+    ("draw a dragon flying over mountains", "Bravo", "Charlie"),
+    ("hi", "Charlie", "Charlie"),
+    ("hello there, how are you?", "Alpha", "Charlie"),
+    ("how is the redmi note 14", "Alpha", "Charlie"),
+    ("my name is Ali and I am 27", "Bravo", "Charlie"),
+    ("who won the cricket match yesterday", "Charlie", "Charlie"),
+    ("tell me a joke", "Bravo", "Charlie"),
+    ("any emails about the meeting on friday?", "Charlie", "Alpha"),
+    ("remind me to email the report to sara", "Charlie", "Bravo"),
+    ("thanks!", "Alpha", "Alpha"),
+]
+
+
+def build_app(model):
+    agents = [
+        create_react_agent(
+            model,
+            tools=[create_handoff_tool(agent_name=other) for other in AGENTS if other != name],
+            prompt=f"You are {name}.",
+            name=name,
+        )
+        for name in AGENTS
+    ]
+    return create_swarm(agents, default_active_agent="Charlie").compile(checkpointer=InMemorySaver())
+
+
+def make_responder(labels: dict):
+    def respond(messages: list) -> AIMessage:
+        agent = messages[0].content.removeprefix("You are ").rstrip(".")
+        query = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+        target = labels[query]
+        if agent != target:
+            return AIMessage(content="", tool_calls=[{"name": f"transfer_to_{target.lower()}", "args": {},
+                                                      "id": str(uuid.uuid4())}])
+        return AIMessage(content=f"{agent} here, done!")
+    return respond
+
+
+def run(use_router: bool) -> dict:
+    labels = {query: target for query, _, target in LABELLED_QUERIES}
+    model = ScriptedChatModel(calls=[], responder=make_responder(labels), call_latency=0.2)
+    app = build_app(model)
+    results = {"llm_calls": 0, "handoffs": 0, "seconds": 0.0, "routed": 0, "misrouted": 0, "fallbacks": 0}
+    for query, active, target in LABELLED_QUERIES:
+        start_agent = active
+        if use_router:
+            routed = route_intent(query)
+            if routed is None:
+                results["fallbacks"] += 1
+            else:
+                start_agent = routed
+                results["routed" if routed == target else "misrouted"] += 1
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        calls_before = len(model.calls)
+        started = time.perf_counter()
+        for _ in stream_swarm_turn(app, [HumanMessage(content=query)], config, active_agent=start_agent):
+            pass
+        results["seconds"] += time.perf_counter() - started
+        results["llm_calls"] += len(model.calls) - calls_before
+        state = app.get_state(config).values
+        handoffs = sum(1 for m in state["messages"] if isinstance(m, ToolMessage) and m.name.startswith("transfer_to"))
+        results["handoffs"] += handoffs
+        assert state["messages"][-1].content.strip() == f"{target} here, done!", (query, state["messages"][-1])
+        # A turn that starts at the right agent must not be handed off
+        assert handoffs == (start_agent != target), (query, start_agent, handoffs)
+    return results
+
+
+class RecordingApp:
+    """Stands in for the compiled swarm and keeps the inputs stream_swarm_turn passes to app.stream."""
+
+    def __init__(self):
+        self.inputs = []
+
+    def stream(self, inputs, **kwargs):
+        self.inputs.append(inputs)
+        return iter(())
+
+
+def check_start_agent_is_passed():
+    app = RecordingApp()
+    for _ in stream_swarm_turn(app, [HumanMessage(content="any unread emails?")], {}, active_agent="Alpha"):
+        pass
+    for _ in stream_swarm_turn(app, [HumanMessage(content="hi")], {}):
+        pass
+    assert app.inputs[0]["active_agent"] == "Alpha", app.inputs[0]
+    assert "active_agent" not in app.inputs[1], app.inputs[1]
+
+
+def main():
+    check_start_agent_is_passed()
+    swarm, router = run(use_router=False), run(use_router=True)
+    count = len(LABELLED_QUERIES)
+    print(f"{count} labelled queries, model 200 ms/call\n")
+    print(f"{'':>8} {'LLM calls':>10} {'per query':>10} {'handoffs':>9} {'latency':>9}")
+    for name, results in (("swarm", swarm), ("router", router)):
+        print(f"{name:>8} {results['llm_calls']:>10} {results['llm_calls'] / count:>10.2f} "
+              f"{results['handoffs']:>9} {results['seconds'] * 1000:>7.0f}ms")
+    print(f"\nrouter: {router['routed']} routed correctly, {router['misrouted']} misrouted, "
+          f"{router['fallbacks']} left to the swarm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: repeated inbox listings, fetched from Gmail every time vs the incremental mailbox cache.
+
+direct  messages().list + batched messages().get of every listed message, on every query
+cached  MailboxCache: history().list deltas, only new or missing messages are downloaded
+
+Between queries the fake mailbox changes (new mail, deletions, archiving, mail moved to trash or
+spam, an expired history), and every cached listing is checked against the direct one.
+
+Run from the project root:
+    python -m benchmarks.mailbox_sync
+"""
+import os
+import tempfile
+import time
+
+from app.tools.mail.mailbox_cache import MailboxCache
+from app.tools.mail.read_mail import get_messages_batched, parse_email
+from benchmarks.fake_gmail import FakeGmail
+
+LIMIT = 10
+
+
+def direct_listing(service, label_ids: list, limit: int) -> list:
+    listed = service.users().messages().list(userId="me", maxResults=limit, labelIds=label_ids).execute()
+    ids = [message["id"] for message in listed.get("messages", [])]
+    return [message["id"] for message in get_messages_batched(service, ids) if isinstance(message, dict)]
+
+
+STEPS = [
+    ("first query", lambda fake: None, ["INBOX"], LIMIT),
+    ("same query again", lambda fake: None, ["INBOX"], LIMIT),
+    ("2 new emails", lambda fake: [fake.add_message("n001"), fake.add_message("n002")], ["INBOX"], LIMIT),
+    ("one deleted", lambda fake: fake.delete_message("n001"), ["INBOX"], LIMIT),
+    ("one archived", lambda fake: fake.modify_labels("m0098", remove=["INBOX"]), ["INBOX"], LIMIT),
+    ("one unarchived", lambda fake: fake.modify_labels("m0098", add=["INBOX"]), ["INBOX"], LIMIT),
+    ("smaller listing", lambda fake: None, ["INBOX"], 5),
+    ("larger listing", lambda fake: None, ["INBOX"], 20),
+    ("starred, new label set", lambda fake: fake.modify_labels("m0050", add=["STARRED"]), ["STARRED"], LIMIT),
+    ("unread, new label set", lambda fake: [fake.modify_labels(i, add=["UNREAD"]) for i in ("m0097", "m0096")],
+     ["UNREAD"], LIMIT),
+    ("one unread trashed", lambda fake: fake.modify_labels("m0097", add=["TRASH"], remove=["INBOX"]), ["UNREAD"], LIMIT),
+    ("one unread to spam", lambda fake: fake.modify_labels("m0096", add=["SPAM"], remove=["INBOX"]), ["UNREAD"], LIMIT),
+    ("trash", lambda fake: None, ["TRASH"], LIMIT),
+    ("history expired", lambda fake: [fake.expire_history(), fake.add_message("n003")], ["INBOX"], LIMIT),
+    ("same query again", lambda fake: None, ["INBOX"], LIMIT),
+]
+
+
+def main():
+    with FakeGmail(message_count=100, latency=0.03) as fake, tempfile.TemporaryDirectory() as tmp:
+        service = fake.service()
+        cache = MailboxCache(get_messages_batched, parse_email, path=os.path.join(tmp, "mailbox.db"),
+                             sync_interval=0)
+        print(f"{'step':>24} | {'direct trips':>12} {'time':>8} | {'cached trips':>12} {'time':>8}")
+        totals = [0, 0.0, 0, 0.0]
+        direct_downloads = 0
+        for name, change, label_ids, limit in STEPS:
+            change(fake)
+
+            fake.round_trips = 0
+            started = time.perf_counter()
+            expected = direct_listing(service, label_ids, limit)
+            direct = (fake.round_trips, time.perf_counter() - started)
+            direct_downloads += len(expected)
+
+            fake.round_trips = 0
+            started = time.perf_counter()
+            rows = cache.list_messages(service, label_ids, limit)
+            cached = (fake.round_trips, time.perf_counter() - started)
+
+            assert [row[0] for row in rows] == expected, (name, [row[0] for row in rows], expected)
+            totals = [totals[0] + direct[0], totals[1] + direct[1], totals[2] + cached[0], totals[3] + cached[1]]
+            print(f"{name:>24} | {direct[0]:>12} {direct[1] * 1000:>6.0f}ms | {cached[0]:>12} {cached[1] * 1000:>6.0f}ms")
+
+        print(f"{'total':>24} | {totals[0]:>12} {totals[1] * 1000:>6.0f}ms | {totals[2]:>12} {totals[3] * 1000:>6.0f}ms")
+        print(f"messages downloaded: direct {direct_downloads}, cached {cache.messages_fetched}")
+        print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
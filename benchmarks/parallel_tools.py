@@ -0,0 +1,95 @@
+"""
+Benchmark: weather for three cities, one tool call per model turn vs parallel tool calls.
+
+one_at_a_time  what "NEVER use a tool twice at once" forced: a model round-trip per city
+parallel       one model message with three get_weather_by_city calls, which ToolNode runs side by
+               side on its executor (bounded by max_concurrency, as main.py sets it)
+
+A local fake of OpenWeatherMap answers after API_DELAY; the model takes MODEL_DELAY per call.
+
+Run from the project root:
+    python -m benchmarks.parallel_tools
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from app.tools.general_chat import weather_tool
+from benchmarks.fake_llm import ScriptedChatModel
+from config.settings import TOOL_CONCURRENCY
+
+API_DELAY = 0.4
+MODEL_DELAY = 0.3
+CITIES = ["Lahore", "Karachi", "Islamabad"]
+
+
+class FakeOpenWeatherMap(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(API_DELAY)
+        city = parse_qs(urlparse(self.path).query)["q"][0]
+        body = json.dumps({"name": city.title(), "main": {"temp": 31, "humidity": 40},
+                           "weather": [{"description": "clear sky"}], "wind": {"speed": 3}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _weather_call(city: str) -> dict:
+    return {"name": "get_weather_by_city", "args": {"city_name": city}, "id": str(uuid.uuid4())}
+
+
+def one_at_a_time(messages: list) -> AIMessage:
+    done = sum(1 for m in messages if isinstance(m, ToolMessage))
+    if done < len(CITIES):
+        return AIMessage(content="", tool_calls=[_weather_call(CITIES[done])])
+    return AIMessage(content="Here is the weather in all three cities.")
+
+
+def parallel(messages: list) -> AIMessage:
+    if not any(isinstance(m, ToolMessage) for m in messages):
+        return AIMessage(content="", tool_calls=[_weather_call(city) for city in CITIES])
+    return AIMessage(content="Here is the weather in all three cities.")
+
+
+def run(responder) -> tuple[int, float]:
+    weather_tool.weather_cache.invalidate()
+    model = ScriptedChatModel(calls=[], responder=responder, call_latency=MODEL_DELAY)
+    agent = create_react_agent(model, tools=[weather_tool.get_weather_by_city], checkpointer=InMemorySaver())
+    inputs = {"messages": [HumanMessage(content="weather in Lahore, Karachi and Islamabad?")]}
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}, "max_concurrency": TOOL_CONCURRENCY}
+    started = time.perf_counter()
+    agent.invoke(inputs, config=config)
+    return len(model.calls), time.perf_counter() - started
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenWeatherMap)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    weather_tool.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/data/2.5/weather"
+
+    results = {
+        "one_at_a_time": run(one_at_a_time),
+        "parallel": run(parallel),
+    }
+    print(f"{len(CITIES)} cities, model {MODEL_DELAY * 1000:.0f} ms/call, weather API {API_DELAY * 1000:.0f} ms/call")
+    for name, (calls, elapsed) in results.items():
+        print(f"{name:>13}: {calls} LLM calls, {elapsed * 1000:6.0f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
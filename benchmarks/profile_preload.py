@@ -0,0 +1,112 @@
+"""
+Benchmark: LLM calls, handoffs and latency saved by preloading the user profile into the prompts.
+
+tool       the old flow: Charlie calls get_user_info before answering, and Alpha hands off to
+           Charlie whenever it needs the user's details (e.g. their email address)
+preloaded  make_profile_prompt puts the stored profile in every agent's system prompt
+
+Scenarios (each in a fresh thread):
+  greeting      "hi" to Charlie
+  email         an email request that starts on Charlie and is handed off to Alpha
+  email_resume  an email request on a thread where Alpha is already the active agent
+
+Run from the project root:
+    python -m benchmarks.profile_preload
+"""
+import tempfile
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+from langgraph_swarm import create_handoff_tool, create_swarm
+
+from app.tools.general_chat.user_info import get_user_info
+from app.utils.context import make_profile_prompt
+from app.utils.profile_store import profile_store
+from benchmarks.fake_llm import ScriptedChatModel
+
+EMAIL = "ali@example.com"
+SCENARIOS = {
+    "greeting": ("hi", None),
+    "email": ("send an email to bob saying I'll be late, from my address", None),
+    "email_resume": ("send an email to bob saying I'll be late, from my address", "Alpha"),
+}
+
+
+def _call(name: str) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": str(uuid.uuid4())}])
+
+
+def respond(messages: list) -> AIMessage:
+    """Plays the agents: each needs the user's profile before it can answer."""
+    system = messages[0].content if isinstance(messages[0], SystemMessage) else ""
+    agent = system.split(",")[0].removeprefix("You are ")
+    knows_profile = any(EMAIL in str(m.content) for m in messages)
+    request = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+    wants_email = "email" in request
+    if agent == "Charlie":
+        if not knows_profile:
+            return _call("get_user_info")
+        if wants_email:
+            return _call("transfer_to_alpha")
+        return AIMessage(content="Hi Ali! 👋 How can I help you today?")
+    if not knows_profile:
+        return _call("transfer_to_charlie")
+    return AIMessage(content=f"Done! I sent the email to bob from {EMAIL}. ✅")
+
+
+def build_app(model, preloaded: bool):
+    def prompt(instructions: str):
+        return make_profile_prompt(instructions) if preloaded else instructions
+
+    charlie = create_react_agent(
+        model,
+        tools=[get_user_info, create_handoff_tool(agent_name="Alpha")],
+        prompt=prompt("You are Charlie, a general chat agent."),
+        name="Charlie",
+    )
+    alpha = create_react_agent(
+        model,
+        tools=[create_handoff_tool(agent_name="Charlie")],
+        prompt=prompt("You are Alpha, an email agent."),
+        name="Alpha",
+    )
+    return create_swarm([charlie, alpha], default_active_agent="Charlie").compile(checkpointer=InMemorySaver())
+
+
+def run(preloaded: bool) -> dict:
+    model = ScriptedChatModel(calls=[], responder=respond, call_latency=0.3)
+    app = build_app(model, preloaded)
+    results = {}
+    for scenario, (request, active_agent) in SCENARIOS.items():
+        inputs = {"messages": [HumanMessage(content=request)]}
+        if active_agent:
+            inputs["active_agent"] = active_agent
+        calls_before = len(model.calls)
+        started = time.perf_counter()
+        state = app.invoke(inputs, config={"configurable": {"thread_id": str(uuid.uuid4())}})
+        handoffs = sum(1 for m in state["messages"] if isinstance(m, ToolMessage) and m.name.startswith("transfer_to"))
+        results[scenario] = (len(model.calls) - calls_before, handoffs, time.perf_counter() - started)
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as profiles_dir:
+        profile_store.directory = profiles_dir
+        profile_store.update(name="Ali", mail=EMAIL)
+        profile_store.flush()
+        tool, preloaded = run(preloaded=False), run(preloaded=True)
+
+    print(f"{'scenario':>12} | {'tool: calls':>11} {'handoffs':>8} {'latency':>9} | "
+          f"{'preloaded: calls':>16} {'handoffs':>8} {'latency':>9}")
+    for scenario in SCENARIOS:
+        (tc, th, tl), (pc, ph, pl) = tool[scenario], preloaded[scenario]
+        print(f"{scenario:>12} | {tc:>11} {th:>8} {tl * 1000:>7.0f}ms | {pc:>16} {ph:>8} {pl * 1000:>7.0f}ms")
+    print(f"\ntotal: {sum(r[0] for r in tool.values())} -> {sum(r[0] for r in preloaded.values())} LLM calls, "
+          f"{sum(r[1] for r in tool.values())} -> {sum(r[1] for r in preloaded.values())} handoffs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: Streamlit rerun wall time of the chat pane against chat history length.
+
+legacy  every message rendered on every rerun (chat bubble, columns, 🔈 button), each assistant
+        message scanned for images again
+paged   chat_history_view: the last CHAT_PAGE_SIZE messages, parsed parts cached per message,
+        and "load earlier" reruns only the chat fragment
+
+Measured with streamlit.testing's AppTest, which runs the script like the server does (without
+the network and browser side, which also grow with the number of elements).
+
+Run from the project root:
+    python -m benchmarks.streamlit_rerun
+"""
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from config.settings import CHAT_PAGE_SIZE
+
+HISTORY_LENGTHS = [10, 50, 200, 1000]
+RERUNS = 3
+
+REPLY = """Sure! Here's what I found 😊
+
+1. **Weather in Lahore:** 31°C, clear sky
+2. **Reminders:** standup at 10:00, dentist at 17:30
+3. **Emails:** 2 unread, one from Sara about the *Q3 numbers*
+
+Let me know if you want me to reply to any of them!"""
+
+
+def legacy_page():
+    import streamlit as st
+    from app.tools.general_chat.image_tool import split_cached_images
+    from config.settings import agent_image, user_image
+
+    for i, message in enumerate(st.session_state["chat_history"]):
+        if message["role"] == "user":
+            with st.chat_message("user", avatar=user_image):
+                st.markdown(message["content"])
+        else:
+            with st.chat_message("assistant", avatar=agent_image):
+                col1, col2 = st.columns([10, 1])
+                with col1:
+                    for part_type, part in split_cached_images(message["content"]):
+                        if part_type == "image":
+                            st.image(part)
+                        else:
+                            st.markdown(part)
+                with col2:
+                    st.button("🔈", key=f"speak_{i}", help="Speak this message")
+
+
+def paged_page():
+    from app.ui.chat_view import chat_history_view
+
+    chat_history_view()
+
+
+def make_history(length: int) -> list:
+    return [{"role": "user", "content": f"question {i}"} if i % 2 == 0 else
+            {"role": "assistant", "content": f"{REPLY}\n\n(answer {i})"} for i in range(length)]
+
+
+def time_reruns(app_test: AppTest) -> float:
+    started = time.perf_counter()
+    for _ in range(RERUNS):
+        app_test.run()
+    return (time.perf_counter() - started) / RERUNS
+
+
+def main():
+    print(f"page size {CHAT_PAGE_SIZE}, mean of {RERUNS} reruns\n")
+    print(f"{'messages':>8} | {'legacy':>9} | {'paged':>9} {'load earlier':>13}")
+    for length in HISTORY_LENGTHS:
+        results = []
+        for page in (legacy_page, paged_page):
+            app_test = AppTest.from_function(page, default_timeout=300)
+            app_test.session_state["chat_history"] = make_history(length)
+            app_test.run()  # first run imports the app modules
+            assert not app_test.exception, app_test.exception
+            results.append(time_reruns(app_test))
+
+            if page is paged_page:
+                assert len(app_test.chat_message) == min(length, CHAT_PAGE_SIZE)
+                if length > CHAT_PAGE_SIZE:
+                    started = time.perf_counter()
+                    app_test.button(key="load_earlier_messages").click().run()
+                    results.append(time.perf_counter() - started)
+                    assert len(app_test.chat_message) == min(length, 2 * CHAT_PAGE_SIZE)
+                else:
+                    results.append(None)
+
+        legacy, paged, load_earlier = results
+        load_earlier = f"{load_earlier * 1000:>11.0f}ms" if load_earlier is not None else f"{'-':>13}"
+        print(f"{length:>8} | {legacy * 1000:>7.0f}ms | {paged * 1000:>7.0f}ms {load_earlier}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: when does the user first see the answer, blocking app.invoke vs streaming.
+
+With app.invoke nothing is shown until the whole turn (handoff included) is done;
+with stream_swarm_turn the first token is rendered as soon as the answering agent emits it.
+
+Run from the project root:
+    python -m benchmarks.time_to_first_token
+"""
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.utils.streaming import stream_swarm_turn
+from benchmarks.fake_llm import ScriptedChatModel
+from benchmarks.incremental_context import build_app
+
+RUNS = 5
+ANSWER = " ".join(["Here is a detailed answer to your question about your inbox."] * 8)
+
+
+def handoff_then_answer(messages: list) -> AIMessage:
+    """Charlie hands off to Alpha, which then answers (a typical email turn)."""
+    if not any(isinstance(m, ToolMessage) for m in messages):
+        return AIMessage(content="", tool_calls=[{"name": "transfer_to_alpha", "args": {}, "id": str(uuid.uuid4())}])
+    return AIMessage(content=ANSWER)
+
+
+def main():
+    model = ScriptedChatModel(calls=[], responder=handoff_then_answer, call_latency=0.3, output_token_latency=0.02)
+    app = build_app(model, None)
+
+    blocking, first_tokens, streamed_totals = [], [], []
+    for _ in range(RUNS):
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        started = time.perf_counter()
+        app.invoke({"messages": [HumanMessage(content="any unread emails?")]}, config=config)
+        blocking.append(time.perf_counter() - started)
+
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        for event, value in stream_swarm_turn(app, [HumanMessage(content="any unread emails?")], config):
+            if event == "done":
+                first_tokens.append(value["time_to_first_token"])
+                streamed_totals.append(value["total"])
+
+    print(f"blocking invoke, first visible output: {sum(blocking) / RUNS * 1000:.0f} ms")
+    print(f"streaming, time to first token:        {sum(first_tokens) / RUNS * 1000:.0f} ms "
+          f"(turn total {sum(streamed_totals) / RUNS * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmark: cost of the built-in turn tracing, and what it records.
+
+none      turns streamed with stream_swarm_turn and no tracing calls at all
+disabled  the same turns through start_turn_trace/traced_config/finish_turn_trace with
+          TRACING_ENABLED off (what every turn pays when tracing is off)
+enabled   TRACING_ENABLED on: a TurnTracer per turn, exported as JSONL
+
+The swarm is Alpha, Bravo and Charlie with local tools and a scripted model; every turn starts at
+Charlie, uses a tool and some hand off to Alpha or Bravo. Overhead is measured with zero model
+latency, then a run with model and tool latency checks the exported span trees (JSONL and OTLP)
+and prints the p95 hot spots found by trace_stats.
+
+Run from the project root:
+    python -m benchmarks.tracing
+"""
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import timeit
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.prebuilt import create_react_agent
+from langgraph_swarm import create_handoff_tool, create_swarm
+
+from app.utils import tracing
+from app.utils.streaming import stream_swarm_turn
+from benchmarks.fake_llm import ScriptedChatModel
+
+TURNS = 40  # per round
+ROUNDS = 5
+TRACED_TURNS = 60
+TOOL_DELAY = 0.0  # set per run
+
+# request -> (tool Charlie calls, agent Charlie hands off to afterwards, tool that agent calls)
+REQUESTS = {
+    "what's new in AI?": ("web_search", None, None),
+    "weather in lahore": ("get_weather", None, None),
+    "any unread emails?": ("web_search", "Alpha", "list_emails"),
+    "remind me at 7 PM": ("get_weather", "Bravo", "create_reminder"),
+}
+
+
+def _slow(name: str):
+    @tool(name)
+    def slow_tool(query: str = "") -> str:
+        """Local stand-in for a real tool."""
+        time.sleep(TOOL_DELAY * random.uniform(0.5, 2))
+        return f"{name} result for {query!r}"
+    return slow_tool
+
+
+def respond(messages: list) -> AIMessage:
+    """Charlie calls its tool then hands off (or answers); the other agents call their tool then answer."""
+    request = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+    charlie_tool, handoff, agent_tool = REQUESTS[request]
+    tool_names = [m.name for m in messages if isinstance(m, ToolMessage)]
+    if not tool_names:
+        name = charlie_tool
+    elif handoff and len(tool_names) == 1:
+        name = f"transfer_to_{handoff.lower()}"
+    elif handoff and len(tool_names) == 2:
+        name = agent_tool
+    else:
+        return AIMessage(content=f"Here's what I found about {request} 😊", usage_metadata={
+            "input_tokens": len(messages) * 50, "output_tokens": 12, "total_tokens": len(messages) * 50 + 12})
+    return AIMessage(content="", tool_calls=[{"name": name, "args": {"query": request}, "id": str(uuid.uuid4())}])
+
+
+def build_app(model):
+    handoffs = {name: create_handoff_tool(agent_name=name) for name in ("Alpha", "Bravo", "Charlie")}
+    agents = [
+        create_react_agent(model, tools=[_slow("web_search"), _slow("get_weather"), handoffs["Alpha"], handoffs["Bravo"]],
+                           prompt="You are Charlie.", name="Charlie"),
+        create_react_agent(model, tools=[_slow("list_emails"), handoffs["Bravo"], handoffs["Charlie"]],
+                           prompt="You are Alpha.", name="Alpha"),
+        create_react_agent(model, tools=[_slow("create_reminder"), handoffs["Alpha"], handoffs["Charlie"]],
+                           prompt="You are Bravo.", name="Bravo"),
+    ]
+    return create_swarm(agents, default_active_agent="Charlie").compile(checkpointer=InMemorySaver())
+
+
+def run_turn(app, request: str, traced: bool) -> None:
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    if not traced:
+        for _ in stream_swarm_turn(app, [HumanMessage(content=request)], config, active_agent="Charlie"):
+            pass
+        return
+    tracer = tracing.start_turn_trace(thread_id=config["configurable"]["thread_id"])
+    try:
+        for _ in stream_swarm_turn(app, [HumanMessage(content=request)], tracing.traced_config(config, tracer),
+                                   active_agent="Charlie"):
+            pass
+    finally:
+        tracing.finish_turn_trace(tracer)
+
+
+def time_turns(app, mode: str) -> float:
+    tracing.TRACING_ENABLED = mode == "enabled"
+    requests = list(REQUESTS) * (TURNS // len(REQUESTS))
+    durations = []
+    for request in requests:
+        started = time.perf_counter()
+        run_turn(app, request, traced=mode != "none")
+        durations.append(time.perf_counter() - started)
+    return statistics.mean(durations)
+
+
+def check_exports(jsonl_path: str, otlp_path: str) -> None:
+    with open(jsonl_path, encoding="utf-8") as f:
+        turns = [json.loads(line) for line in f]
+    assert len(turns) == TRACED_TURNS
+
+    def walk(span):
+        yield span
+        for child in span.get("children", []):
+            yield from walk(child)
+
+    spans = [span for turn in turns for span in walk(turn)]
+    kinds = {kind: [span for span in spans if span["kind"] == kind] for kind in
+             ("turn", "invoke", "agent", "step", "llm", "tool", "handoff")}
+    assert all(kinds.values()), {kind: len(found) for kind, found in kinds.items()}
+    assert all(span["attributes"]["input_tokens"] for span in kinds["llm"] if span["attributes"]["output_tokens"])
+    assert {span["attributes"]["to"] for span in kinds["handoff"]} == {"Alpha", "Bravo"}
+    assert {span["agent"] for span in kinds["tool"]} == {"Alpha", "Bravo", "Charlie"}
+    assert not [span for span in spans if "error" in span]
+    print(f"JSONL: {len(turns)} turns, {len(spans)} spans "
+          f"({', '.join(f'{len(found)} {kind}' for kind, found in kinds.items())})")
+
+    with open(otlp_path, encoding="utf-8") as f:
+        requests = [json.loads(line) for line in f]
+    otlp_spans = [span for request in requests for span in request["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+    span_ids = {span["spanId"] for span in otlp_spans}
+    assert all(span["parentSpanId"] in span_ids for span in otlp_spans if span["parentSpanId"])
+    assert len(otlp_spans) == len(spans)
+    print(f"OTLP:  {len(requests)} export requests, {len(otlp_spans)} spans, every parent found")
+
+
+def main():
+    global TOOL_DELAY
+    app = build_app(ScriptedChatModel(calls=[], responder=respond, call_latency=0.0, token_latency=0.0))
+
+    print(f"per-turn overhead, median of {ROUNDS} rounds of {TURNS} turns per mode (no model or tool latency)\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        tracing.trace_exporter = tracing.TraceExporter(os.path.join(tmp, "overhead.jsonl"), "jsonl")
+        time_turns(app, "none")  # warm up
+        rounds = {"none": [], "disabled": [], "enabled": []}
+        for _ in range(ROUNDS):
+            for mode, means in rounds.items():
+                means.append(time_turns(app, mode))
+        results = {mode: statistics.median(means) for mode, means in rounds.items()}
+        for mode, mean in results.items():
+            print(f"{mode:>9}: {mean * 1000:6.2f}ms/turn ({(mean - results['none']) * 1000:+.2f}ms)")
+        tracing.TRACING_ENABLED = False
+        config = {"configurable": {"thread_id": "t"}}
+
+        def disabled_turn():
+            tracer = tracing.start_turn_trace(thread_id="t")
+            tracing.traced_config(config, tracer)
+            tracing.annotate_turn(tracer, answered_by="Charlie")
+            tracing.finish_turn_trace(tracer)
+
+        disabled_cost = timeit.timeit(disabled_turn, number=100_000) / 100_000
+        print(f"tracing calls with TRACING_ENABLED off: {disabled_cost * 1e9:.0f}ns/turn (timeit)")
+
+        # Realistic latency, exported in both formats
+        TOOL_DELAY = 0.02
+        app = build_app(ScriptedChatModel(calls=[], responder=respond, call_latency=0.05))
+        tracing.trace_stats = tracing.TraceStats()
+        tracing.TRACING_ENABLED = True
+        paths = {}
+        for export_format in ("jsonl", "otlp"):
+            paths[export_format] = os.path.join(tmp, f"traces.{export_format}")
+            tracing.trace_exporter = tracing.TraceExporter(paths[export_format], export_format)
+            random.seed(0)
+            for request in (list(REQUESTS) * TRACED_TURNS)[:TRACED_TURNS]:
+                run_turn(app, request, traced=True)
+        print()
+        check_exports(paths["jsonl"], paths["otlp"])
+
+    print(f"\n{'agent':>8} {'kind':>8} {'name':>20} | {'count':>5} {'p50':>7} {'p95':>7} | tokens in/out")
+    for spot in tracing.trace_stats.hot_spots(limit=10):
+        tokens = f"{spot['input_tokens']}/{spot['output_tokens']}" if spot["kind"] == "llm" else ""
+        print(f"{spot['agent']:>8} {spot['kind']:>8} {spot['name'][:20]:>20} | {spot['count']:>5} "
+              f"{spot['p50_ms']:>5.0f}ms {spot['p95_ms']:>5.0f}ms | {tokens}")
+
+
+if __name__ == "__main__":
+    main()
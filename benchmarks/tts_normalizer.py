@@ -0,0 +1,96 @@
+"""
+Benchmark: cost of preparing assistant replies for speech.
+
+legacy     the three re.sub passes speak() used to run on every call (no markdown/number handling)
+normalize  normalize_for_speech on a cold cache: one precompiled pass that also strips markdown
+           and emojis and spells out numbers and dates
+memoized   normalize_for_speech again on the same messages, as when the 🔈 button is pressed twice
+
+The corpus mirrors the replies the agents produce (emails, reminders, weather, search, images).
+
+Run from the project root:
+    python -m benchmarks.tts_normalizer
+"""
+import re
+import time
+
+from app.utils.voice.text_normalizer import normalize_for_speech
+
+ROUNDS = 200
+
+CORPUS = [
+    """Here are your latest unread emails 📧:
+
+1. **From:** John Smith <john.smith@example.com>
+   **Subject:** Quarterly report
+   **Date:** 2025-06-03 09:15
+   **Snippet:** Please find attached the Q2 report, revenue is up 12% to $1,250,000.00.
+   **ID:** 197a3f5c2d8e4b10
+
+2. **From:** GitHub <noreply@github.com>
+   **Subject:** [repo] Pull request #482 merged
+   **Date:** 2025-06-02 18:40
+   **Snippet:** Merged 3 commits into main. View it on https://github.com/org/repo/pull/482
+   **ID:** 197a2b9e11f04c77""",
+    """⏰ Your reminders for tomorrow:
+- 09:00 Stand-up meeting
+- 13:30 Lunch with Sarah at the café
+- 19:00 Gym 💪
+Let me know if you want me to add anything else!""",
+    """The weather in Lahore today is **sunny** ☀️ with a temperature of 38°C (feels like 41°C).
+Humidity is at 24% and the wind is blowing at 12 km/h from the north-west.""",
+    """### Redmi Note 14 review
+The Redmi Note 14 is a solid mid-range phone:
+* **Display:** 6.67" AMOLED, 120Hz
+* **Battery:** 5,500 mAh with 45W charging
+* **Price:** around $199
+You can read more at [GSMArena](https://www.gsmarena.com/xiaomi_redmi_note_14-13485.php) or www.mi.com/global.""",
+    """Here is your image of a cat 🐱:
+![Generated Image](https://image.pollinations.ai/prompt/a%20cat?width=1024&height=1024&seed=40&model=flux)""",
+    """I've sent the email to alex@example.com with the subject "Meeting on the 21st" ✅.
+The message ID is 18f3c2a9b7d6e5f4 in case you need it.""",
+    """Sure! Here's a quick Python example:
+```python
+for i in range(10):
+    print(i ** 2)
+```
+This prints the squares of the numbers 0 through 9.""",
+    "Hello! 👋 I'm your assistant. How can I help you today?",
+]
+
+
+def legacy_sanitize(text: str) -> str:
+    """The sanitizing speak() did before (patterns compiled from the cache on every call)."""
+    safe_text = re.sub(r"[^\x20-\x7E]+", " ", text).strip()
+    safe_text_without_numbers = re.sub(r"\b\d{6,}\b", "", safe_text)
+    url_pattern = r"(?:https?://|www\.)\S+|(?:\S+\.[a-z]{2,})/\S*"
+    return re.sub(url_pattern, "", safe_text_without_numbers)
+
+
+def run(fn) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for message in CORPUS:
+            fn(message)
+    return (time.perf_counter() - started) / (ROUNDS * len(CORPUS))
+
+
+def cold_normalize(text: str) -> str:
+    normalize_for_speech.cache_clear()
+    return normalize_for_speech(text)
+
+
+def main():
+    results = {
+        "legacy": run(legacy_sanitize),
+        "normalize": run(cold_normalize),
+        "memoized": run(normalize_for_speech),
+    }
+    print(f"{len(CORPUS)} replies, {sum(map(len, CORPUS))} characters, {ROUNDS} rounds")
+    for name, seconds in results.items():
+        print(f"{name:>9}: {seconds * 1e6:8.1f} µs per message")
+    print("\nSample:", normalize_for_speech(CORPUS[2]))
+
+
+if __name__ == "__main__":
+    main()
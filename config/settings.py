@@ -13,17 +13,67 @@ active_model = 'meta-llama/llama-4-scout-17b-16e-instruct'
 ## model temperature
 temperature = 0.3
 
-## max context to send
+## per-agent (or per-task) model overrides, e.g. route cheap work to a smaller, faster model:
+## {"Bravo": {"model": "llama-3.1-8b-instant"}, "summarizer": {"model": "llama-3.1-8b-instant", "temperature": 0}}
+AGENT_LLM_OVERRIDES = {}
+
+## max chat history sent to seed a thread that has no checkpointed state
 MAX_PREVIOUS_MESSAGES_FOR_CONTEXT = 20
 
+## model context budget (older messages are summarized once the thread exceeds it)
+MAX_CONTEXT_TOKENS = 6000
+CONTEXT_SUMMARIZATION = True
+CONTEXT_SUMMARY_MAX_TOKENS = 300
+
+## langgraph checkpointer ('sqlite' persists across restarts, 'memory' does not)
+CHECKPOINTER_BACKEND = "sqlite"
+CHECKPOINT_DB_PATH = "app/history/checkpoints.db"
+CHECKPOINT_RETENTION_DEPTH = 10  # checkpoints kept per thread
+CHECKPOINT_MAX_THREADS = 200  # least recently used threads beyond this are evicted
+
+## user profiles (one JSON file per user ID; the user ID comes from the ?user= query parameter)
+USER_PROFILES_DIR = "app/history/profiles"
+DEFAULT_USER_ID = "default"
+PROFILE_WRITE_DELAY_SECONDS = 2  # updates within this window are written to disk together
+
+## keyword intent router: starts a turn at the agent a message is clearly meant for, saving a handoff
+ROUTER_ENABLED = True
+ROUTER_MIN_SCORE = 2  # summed weights of the matching keyword patterns
+ROUTER_MIN_CONFIDENCE = 0.75  # best agent's share of all agents' scores
+
+## fast path: simple single-tool requests ("weather in lahore", "my reminders for 2025-06-02", "any unread
+## emails?") are answered by calling the tool directly with a templated answer, without any model call
+FAST_PATH_ENABLED = True
+FAST_PATH_INTENTS = ["weather", "reminders", "emails"]  # checked in this order
+FAST_PATH_MAX_EMAILS = 10
+
+## tool calls of one model message run concurrently, up to this many at a time
+TOOL_CONCURRENCY = 8
+
+## saved chats shown per sidebar page
+SESSIONS_PAGE_SIZE = 20
+
+## chat view: messages rendered per "load earlier" page, parsed messages kept, activity log entries shown
+CHAT_PAGE_SIZE = 30
+CHAT_RENDER_CACHE_SIZE = 500
+ACTIVITY_LOG_PAGE_SIZE = 20
+
 ## groq api setup
 groq_api_key = os.getenv("GROQ_API_KEY")
 
 ## tavily api setup
 tavily_api_key = os.getenv("TAVILY_API_KEY")
+SEARCH_CACHE_SIZE = 500  # queries kept
+SEARCH_CACHE_TTL_SECONDS = 3600
+SEARCH_CACHE_PATH = "app/history/search_cache.json"  # set to None to keep the cache in memory only
+SEARCH_CACHE_WRITE_DELAY_SECONDS = 2  # searches within this window are written to disk together
 
 ## weather api setup
 weather_api_key = os.getenv("OPEN_WEATHER_KEY")
+WEATHER_TIMEOUT_SECONDS = 10
+WEATHER_CACHE_SIZE = 256  # cities kept
+WEATHER_CACHE_TTL_SECONDS = 600  # fresh for 10 minutes
+WEATHER_CACHE_STALE_SECONDS = 1800  # then served stale for up to 30 more minutes while refreshing
 
 ## google scopes
 GOOGLE_SCOPES = [
@@ -34,6 +84,59 @@ GOOGLE_SCOPES = [
     'https://www.googleapis.com/auth/gmail.compose'
 ]
 
+## image generation (pollinations)
+IMAGE_API_URL = "https://pollinations.ai/p/"
+IMAGE_WIDTH = 1024
+IMAGE_HEIGHT = 1024
+IMAGE_SEED = 40
+IMAGE_MODEL = "flux"
+IMAGE_TIMEOUT_SECONDS = 120
+IMAGE_CACHE_DIR = "app/history/image_cache"  # set to None to only validate images without keeping them
+IMAGE_JOB_CONCURRENCY = 2  # images generated at the same time in the background
+IMAGE_JOB_TIMEOUT_SECONDS = 180  # from submission until the job is reported as timed out
+IMAGE_JOB_POLL_SECONDS = 2  # how often the chat checks a pending image
+
+## google api clients
+GOOGLE_HTTP_TIMEOUT_SECONDS = 30
+GOOGLE_SERVICE_POOL_SIZE = 8  # idle clients kept per API, shared by the tool threads
+CREDENTIAL_REFRESH_MARGIN_SECONDS = 300  # refresh the token this long before it expires
+
+## gmail mailbox cache (local copy kept up to date through history().list)
+MAILBOX_CACHE_PATH = "app/history/mailbox.db"
+MAILBOX_SYNC_INTERVAL_SECONDS = 10  # repeated listings within this window don't even ask Gmail for changes
+
+## email bodies sent to the model (quoted replies and signatures are stripped, HTML converted to text)
+EMAIL_BODY_MAX_TOKENS = 300  # per email in a listing; the rest is available through read_email_tool
+EMAIL_FULL_BODY_MAX_TOKENS = 4000  # cap for read_email_tool
+EMAIL_CHARS_PER_TOKEN = 4  # same estimate as langchain's count_tokens_approximately
+
+## google calendar reminders
+REMINDERS_CACHE_SIZE = 64  # cached events().list pages
+REMINDERS_CACHE_TTL_SECONDS = 60  # short, since events can also change outside the app
+REMINDERS_PAGE_SIZE = 100  # events per page of a range query
+REMINDERS_MAX_RANGE_DAYS = 31
+
+## gmail batching (Gmail allows up to 100 calls per batch, 50 is the recommended maximum)
+GMAIL_BATCH_SIZE = 50
+
+## text to speech (groq)
+TTS_MODEL = "playai-tts"
+TTS_VOICE = "Angelo-PlayAI"
+TTS_CACHE_SIZE = 256  # synthesized chunks kept in memory, least recently used are evicted first
+TTS_CACHE_TTL_SECONDS = 24 * 3600
+TTS_FIRST_CHUNK_CHARS = 120  # kept short so playback starts quickly
+TTS_CHUNK_CHARS = 400
+TTS_SYNTH_CONCURRENCY = 2  # chunks synthesized ahead of the one playing
+TTS_CHUNK_POLL_SECONDS = 0.5  # how often the speech player hands newly synthesized chunks to the browser
+TTS_NORMALIZER_CACHE_SIZE = 512  # messages whose speech text is memoized
+
+## per-turn tracing of agents, LLM calls (with token counts), tools and handoffs, exported to a local file
+## (when off, no callback is attached to the turn at all)
+TRACING_ENABLED = False
+TRACE_EXPORT_PATH = "app/history/traces.jsonl"
+TRACE_EXPORT_FORMAT = "jsonl"  # 'jsonl' (one span tree per turn) or 'otlp' (OpenTelemetry OTLP/JSON, one turn per line)
+TRACE_HOT_SPOTS = 5  # slowest spans by p95 shown in the sidebar
+
 ## assets
 project_root = os.getcwd()
 meta_image = os.path.join(project_root, "assets", "images", "meta.png")
@@ -1,26 +1,32 @@
 import os
+import time
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage, AIMessage
 import uuid
 from streamlit.components.v1 import html
-from app.agents.general_chat_agent import Charlie
-from app.agents.mail_agent import Alpha
-from app.agents.reminder_agent import Bravo
-from app.utils.agent_config import create_and_compile_swarm
-from app.utils.llm import get_llm
-from app.history.chat_history import save_chat_session, load_chat_session, get_saved_sessions, delete_chat_session, \
-    ensure_chat_history_dir_exists
+from app.agents.registry import agent_registry
+from app.utils.agent_config import BackgroundSwarm
+from app.utils.cache import get_all_cache_stats
+from app.tools.general_chat.web_search import get_search_stats
+from app.tools.general_chat.image_tool import get_image_stats
+from app.utils.context import build_invoke_messages
+from app.utils.streaming import stream_swarm_turn, time_to_first_token_stats, turn_latency_stats
+from app.utils.router import route_intent, router_stats
+from app.utils.fast_path import try_fast_path, fast_path_stats
+from app.utils.tracing import start_turn_trace, traced_config, annotate_turn, finish_turn_trace, trace_stats
+from app.history.chat_history import save_chat_session, ensure_chat_history_dir_exists
+from app.ui.chat_view import chat_history_view, activity_log_view
+from app.ui.sessions import saved_sessions_view
 from app.utils.voice.stt import stt_data
-from app.utils.voice.tts import speak, generate_and_play_groq_audio
-from config.settings import agent_image, user_image, active_model, MAX_PREVIOUS_MESSAGES_FOR_CONTEXT
+from app.utils.voice.tts import speak, speech_player, time_to_first_audio_stats
+from config.settings import agent_image, user_image, active_model, groq_api_key, DEFAULT_USER_ID, TOOL_CONCURRENCY, \
+    TRACING_ENABLED, TRACE_EXPORT_PATH
 
 # Load environment variables
 load_dotenv()
 
-os.environ["LANGSMITH_TRACING"] = os.getenv("LANGSMITH_TRACING")
-os.environ["LANGSMITH_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
-os.environ["LANGSMITH_PROJECT"] = os.getenv("LANGSMITH_PROJECT")
+# LangSmith stays optional: it reads LANGSMITH_TRACING/LANGSMITH_API_KEY/LANGSMITH_PROJECT from the
+# environment (or .env) when they are set. Built-in tracing is TRACING_ENABLED in config/settings.py.
 
 # Ensure the chat history directory exists on startup
 ensure_chat_history_dir_exists()
@@ -36,31 +42,37 @@ if "thread_id" not in st.session_state:
     st.session_state["thread_id"] = st.session_state["current_session_id"]
 if "voice_mode" not in st.session_state:
     st.session_state.voice_mode = False
+if "sessions_page" not in st.session_state:
+    st.session_state["sessions_page"] = 0
+if "user_id" not in st.session_state:
+    # Each user of a shared deployment gets their own profile, e.g. http://host/?user=alice
+    st.session_state["user_id"] = st.query_params.get("user", DEFAULT_USER_ID)
 
 st.set_page_config(page_title="Automation Assistant", layout="wide")
 
 
-# --- Initialize LLM and Agents (cached for performance) ---
+# --- Initialize the swarm (cached for performance) ---
 @st.cache_resource
 def initialize_all_components():
-    """Initializes LLM, agents, and the swarm workflow."""
-    llm = get_llm()
-    if not llm:
+    """
+    Sets up the swarm workflow, which is compiled in the background once the first page is out
+    (swarm.start() at the end of the script). The agents (their LLM clients, tools and graphs)
+    are built right after it, or on their first activation if a message comes first.
+    """
+    if not groq_api_key:
+        print("Error initializing LLM. Make sure API key is set: GROQ_API_KEY is missing.")
         return None, None, None  # Ensure consistent return structure
 
-    agents_list = [Alpha, Bravo, Charlie]  # Pass all agents to the list
-
-    # The default active agent name. Ensure it matches one of your agent's .name attribute.
-    # Assuming 'Alpha' is the name property of the Alpha agent instance
-    app, checkpointer = create_and_compile_swarm(agents_list, default_active_agent_name="Charlie")
-    return agents_list, app, checkpointer
+    # The default active agent name. Ensure it matches one of the agent names in the registry.
+    swarm = BackgroundSwarm(agent_registry, default_active_agent_name="Charlie")
+    return agent_registry, swarm, swarm.checkpointer
 
 
 # Get initialized components
-agents_list, app, checkpointer = initialize_all_components()
+agents, swarm, checkpointer = initialize_all_components()
 
 # Only proceed if all components were successfully initialized
-if agents_list and app and checkpointer:
+if agents and swarm and checkpointer:
     # --- Streamlit UI ---
     col1, col2 = st.columns([1, 5])
     with col1:
@@ -69,6 +81,8 @@ if agents_list and app and checkpointer:
         st.title("Multi Agent Assistant")
 
     st.header("Type below to get Started")
+    # Fixed spot for the speech player, filled at the end of the run once speak() requests are known
+    speech_slot = st.container()
 
     TOKEN_FILENAME = "token.json"
 
@@ -111,97 +125,70 @@ if agents_list and app and checkpointer:
     # --- Sidebar for Chat History Management ---
     st.sidebar.header("Chat Sessions")
 
-    # Button to start a new chat
-    if st.sidebar.button("➕ Start New Chat", key="new_chat_button",use_container_width=True):
-        # Save current session before starting a new one, if it has content
-        if st.session_state["chat_history"]:
-            save_chat_session(
-                st.session_state["chat_history"],
-                st.session_state["active_agent_log"],
-                st.session_state["current_session_id"]
-            )
-        st.session_state["chat_history"] = []
-        st.session_state["active_agent_log"] = []
-        st.session_state["current_session_id"] = str(uuid.uuid4())  # New session ID
-        st.session_state["thread_id"] = st.session_state["current_session_id"]  # New LangGraph thread ID
-        st.rerun()  # Rerun to clear chat and load new session
-
-    saved_sessions = get_saved_sessions()
-
-    if saved_sessions:
-        st.sidebar.subheader("Saved Chats")
-        # Iterate with an index to ensure unique keys for buttons
-        for i, (file_path, display_name, session_id) in enumerate(saved_sessions):
-            col1, col2 = st.sidebar.columns([1, 0.2])
-
-            # Load Session Button: Added __{i} to the key
-            if col1.button(display_name, key=f"load_{session_id}__{i}",use_container_width=True):
-                # Save current session if it has content before loading new one
-                if st.session_state["chat_history"] and st.session_state["current_session_id"] != session_id:
-                    save_chat_session(
-                        st.session_state["chat_history"],
-                        st.session_state["active_agent_log"],
-                        st.session_state["current_session_id"]
-                    )
-
-                loaded_data = load_chat_session(file_path)
-                st.session_state["chat_history"] = loaded_data["chat_history"]
-                st.session_state["active_agent_log"] = loaded_data["agent_log"]
-                st.session_state["current_session_id"] = loaded_data["id"]  # Set current session ID
-                st.session_state["thread_id"] = loaded_data["id"]  # Set LangGraph thread ID
-                st.rerun()  # Rerun to display loaded chat
-
-            # Delete Session Button: Added __{i} to the key
-            if col2.button("🗑️", key=f"delete_{session_id}__{i}"):
-                st.session_state["confirm_delete"] = file_path  # Store path for confirmation
-                st.session_state["confirm_delete_id"] = session_id  # Store ID for confirmation message
-                st.rerun()  # Rerun to show confirmation prompt
-
-    # Confirmation for deletion
-    if "confirm_delete" in st.session_state and st.session_state["confirm_delete"]:
-        file_to_delete = st.session_state["confirm_delete"]
-        session_id_to_delete = st.session_state["confirm_delete_id"]
-        st.sidebar.warning(f"Are you sure you want to delete chat session {session_id_to_delete[:8]}...?")
-        col_confirm_yes, col_confirm_no = st.sidebar.columns(2)
-
-        # Ensure confirmation buttons also have unique keys
-        if col_confirm_yes.button("Yes, Delete", key=f"confirm_yes_{session_id_to_delete}"):
-            delete_chat_session(file_to_delete)
-            st.sidebar.success("Session deleted!")
-            # If current session was deleted, start a new one
-            if st.session_state["current_session_id"] == session_id_to_delete:
-                st.session_state["chat_history"] = []
-                st.session_state["active_agent_log"] = []
-                st.session_state["current_session_id"] = str(uuid.uuid4())
-                st.session_state["thread_id"] = st.session_state["current_session_id"]
-            del st.session_state["confirm_delete"]
-            del st.session_state["confirm_delete_id"]
-            st.rerun()
-        if col_confirm_no.button("No, Cancel", key=f"confirm_no_{session_id_to_delete}"):
-            del st.session_state["confirm_delete"]
-            del st.session_state["confirm_delete_id"]
-            st.rerun()
+    with st.sidebar:
+        saved_sessions_view(checkpointer)
 
     st.sidebar.header("Agent Activity Log")
-    for log in st.session_state["active_agent_log"]:
-        st.sidebar.info(log)
-
-    for i, message in enumerate(st.session_state["chat_history"]):
-        if message["role"] == "user":
-            with st.chat_message("user", avatar=user_image):
-                st.markdown(message["content"])
+    with st.sidebar:
+        activity_log_view()
+
+    with st.sidebar.expander("🧠 Agent memory"):
+        memory_metrics = checkpointer.get_metrics()
+        st.caption(f"{memory_metrics['backend']} · {memory_metrics['threads']} threads · "
+                   f"{memory_metrics['checkpoints']} checkpoints · {memory_metrics['bytes'] / 1024:.0f} KB · "
+                   f"{memory_metrics['evicted_threads']} evicted")
+
+    with st.sidebar.expander("⏱️ Response times"):
+        first_token_metrics, turn_metrics = time_to_first_token_stats.snapshot(), turn_latency_stats.snapshot()
+        st.caption(f"Time to first token: p50 {first_token_metrics['p50_ms'] / 1000:.1f}s · "
+                   f"p95 {first_token_metrics['p95_ms'] / 1000:.1f}s ({first_token_metrics['count']} turns)")
+        st.caption(f"Full turn: p50 {turn_metrics['p50_ms'] / 1000:.1f}s · p95 {turn_metrics['p95_ms'] / 1000:.1f}s")
+        search_stats = get_search_stats()
+        st.caption(f"Web search: p50 {search_stats['latency']['p50_ms']:.0f}ms · "
+                   f"p95 {search_stats['latency']['p95_ms']:.0f}ms "
+                   f"(Tavily p50 {search_stats['upstream_latency']['p50_ms']:.0f}ms)")
+        image_stats = get_image_stats()
+        st.caption(f"Image generation: p50 {image_stats['latency']['p50_ms'] / 1000:.1f}s · "
+                   f"{image_stats['bytes_downloaded'] / 1024:.0f} KB downloaded for {image_stats['requests']} "
+                   f"images, {image_stats['cache_hits']} served from cache · "
+                   f"jobs {', '.join(f'{status}: {n}' for status, n in image_stats['jobs'].items() if n) or 'none'}")
+        first_audio_metrics = time_to_first_audio_stats.snapshot()
+        if first_audio_metrics["count"]:
+            st.caption(f"Time to first audio (Groq TTS): p50 {first_audio_metrics['p50_ms'] / 1000:.1f}s · "
+                       f"p95 {first_audio_metrics['p95_ms'] / 1000:.1f}s")
+        routing = router_stats.snapshot()
+        st.caption(f"Intent router: {routing['route_rate']:.0%} of turns routed directly "
+                   f"({', '.join(f'{agent}: {n}' for agent, n in routing['routed'].items())}), "
+                   f"{routing['fallbacks']} left to the agents")
+        agent_builds = agents.stats()
+        st.caption("Agents built on first use: " + ", ".join(
+            [f"{name} in {seconds:.1f}s" for name, seconds in agent_builds["built"].items()] +
+            [f"{name} pending" for name in agent_builds["pending"]]))
+        fast_path_metrics = fast_path_stats.snapshot()
+        st.caption(f"Fast path: {sum(fast_path_metrics['hits'].values())} answered without the agents "
+                   f"(hit rate {fast_path_metrics['hit_rate']:.0%}, p50 {fast_path_metrics['latency']['p50_ms']:.0f}ms) · "
+                   f"~{fast_path_metrics['saved_ms'] / 1000:.0f}s saved")
+        st.caption("Search latency histogram: " + " · ".join(
+            f"{bucket}: {count}" for bucket, count in search_stats['latency_histogram'].items() if count))
+
+    with st.sidebar.expander("🔎 Traces"):
+        if TRACING_ENABLED:
+            st.caption(f"Slowest spans by p95, every turn is exported to `{TRACE_EXPORT_PATH}`")
+            for spot in trace_stats.hot_spots():
+                tokens = f" · {spot['input_tokens']} in / {spot['output_tokens']} out tokens" if spot["kind"] == "llm" else ""
+                st.caption(f"**{spot['agent']}** {spot['kind']} `{spot['name']}`: p50 {spot['p50_ms']:.0f}ms · "
+                           f"p95 {spot['p95_ms']:.0f}ms ({spot['count']}){tokens}")
         else:
-            with st.chat_message("assistant", avatar=agent_image):
-                col1, col2 = st.columns([10, 1])  # 10:1 ratio for message and button
-                with col1:
-                    st.markdown(message["content"])
-                    # if st.button("🔈", key=f"speak_{i}", help="Speak this message"):
-                    #     speak(message["content"])
-                        # generate_and_play_groq_audio(text=message["content"])
-                with col2:
-                    if st.button("🔈", key=f"speak_{i}", help="Speak this message"):
-                        speak(message["content"])
-                        # generate_and_play_groq_audio(text=message["content"])
+            st.caption("Tracing is off (TRACING_ENABLED in config/settings.py).")
+
+    with st.sidebar.expander("📦 Caches"):
+        for cache_stats in get_all_cache_stats():
+            st.caption(f"**{cache_stats['name']}**: {cache_stats['hits'] + cache_stats['stale_hits']} hits "
+                       f"({cache_stats['stale_hits']} stale), {cache_stats['misses']} misses, "
+                       f"{cache_stats['coalesced']} coalesced · hit rate {cache_stats['hit_rate']:.0%}")
+
+    # Only the latest messages are rendered; the pane reruns on its own when loading earlier ones
+    chat_history_view()
 
     ## rendering STT
     html(stt_data)
@@ -215,67 +202,121 @@ if agents_list and app and checkpointer:
         with st.chat_message("user", avatar=user_image):
             st.markdown(prompt)
 
-        # 2. Prepare messages for LangGraph invocation with limit
-        langgraph_messages_for_invoke = []
-        messages_to_send = st.session_state["chat_history"][-MAX_PREVIOUS_MESSAGES_FOR_CONTEXT:]
-
-        for msg in messages_to_send:
-            if msg["role"] == "user":
-                langgraph_messages_for_invoke.append(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                langgraph_messages_for_invoke.append(AIMessage(content=msg["content"]))
+        # 2. Send only the new message; the checkpointer already holds this thread's history
+        app = swarm.app()  # usually compiled long before the first message
+        langgraph_messages_for_invoke = build_invoke_messages(
+            app, st.session_state["thread_id"], st.session_state["chat_history"])
 
-        # 3. Process the message through the LangGraph app
+        # 3. Stream the message through the LangGraph app, rendering tokens as they arrive
+        # (traced as one span tree when TRACING_ENABLED is on)
+        tracer = start_turn_trace(thread_id=st.session_state["thread_id"], user_id=st.session_state["user_id"])
+        turn_error = None
         try:
-            # with st.spinner(f"{active_model} is working on it"):
-            with st.spinner(f"Thinking 🤔..."):
-
-                response = app.invoke(
-                    {"messages": langgraph_messages_for_invoke},
-                    config={"configurable": {"thread_id": st.session_state["thread_id"]}},
+            config = traced_config({"configurable": {"thread_id": st.session_state["thread_id"],
+                                                     "user_id": st.session_state["user_id"]},
+                                    "max_concurrency": TOOL_CONCURRENCY}, tracer)
+            turn_stats = {}
+            tools_used = []
+            previous_reply = next((m["content"] for m in reversed(st.session_state["chat_history"][:-1])
+                                   if m["role"] == "assistant"), "")
+
+            # Simple single-tool requests are answered by the tool directly, without any model call
+            fast_path_started = time.perf_counter()
+            fast_path = try_fast_path(app, config, langgraph_messages_for_invoke, prompt, previous_reply)
+            if fast_path:
+                tools_used.append(f"fast path → {fast_path[0]}")
+                annotate_turn(tracer, fast_path=fast_path[0])
+                turn_stats = {"total": time.perf_counter() - fast_path_started}
+            else:
+                # Clear requests start at the right agent instead of going through Charlie first
+                routed_agent = route_intent(prompt, previous_reply)
+                if routed_agent:
+                    st.session_state["active_agent_log"].append(f"**Router:** sent to {routed_agent}")
+                    annotate_turn(tracer, routed_to=routed_agent)
+
+                with st.chat_message("assistant", avatar=agent_image):
+                    status_placeholder = st.empty()
+                    reply_placeholder = st.empty()
+                    status_placeholder.caption("Thinking 🤔...")
+                    streaming_agent, reply_text = None, ""
+
+                    for event, value in stream_swarm_turn(app, langgraph_messages_for_invoke, config,
+                                                          active_agent=routed_agent):
+                        if event == "agent":
+                            streaming_agent = value
+                            status_placeholder.caption(f"🤖 {value} is working on it...")
+                        elif event == "tool":
+                            tools_used.append(f"{streaming_agent} → {value}")
+                            status_placeholder.caption(f"🛠️ {streaming_agent} is using `{value}`...")
+                        elif event == "tool_result":
+                            status_placeholder.caption(f"🤖 {streaming_agent} is working on it...")
+                        elif event == "message_start":
+                            reply_text = ""  # previous text was an intermediate step, not the answer
+                        elif event == "token":
+                            reply_text += value
+                            reply_placeholder.markdown(reply_text + "▌")
+                        elif event == "done":
+                            turn_stats = value
+                    status_placeholder.empty()
+
+            response = app.get_state(config).values
+
+            if response and response.get("messages"):
+                ai_message_obj = response["messages"][-1]
+
+                # 4. Convert AI response back to Streamlit's chat history format
+                st.session_state["chat_history"].append(
+                    {"role": "assistant", "content": ai_message_obj.content, "avatar": agent_image})
+
+                ## TTS
+                if st.session_state.voice_mode:
+                    speak(ai_message_obj.content)
+
+
+                # Infer and log the active agent
+                active_agent_name = "Unknown Agent"
+                if hasattr(ai_message_obj, 'name') and ai_message_obj.name:
+                    active_agent_name = ai_message_obj.name
+                elif response.get("intermediate_steps"):
+                    last_step = response["intermediate_steps"][-1]
+                    if hasattr(last_step, 'action') and hasattr(last_step.action, 'tool'):
+                        active_agent_name = f"Tool: {last_step.action.tool}"
+                    elif hasattr(last_step, 'agent'):
+                        active_agent_name = last_step.agent
+
+                annotate_turn(tracer, answered_by=active_agent_name)
+                for tool_used in tools_used:
+                    st.session_state["active_agent_log"].append(f"**Tool:** {tool_used}")
+                first_token = turn_stats.get("time_to_first_token")
+                timing = f"first token {first_token:.1f}s, " if first_token is not None else ""
+                st.session_state["active_agent_log"].append(
+                    f"**{active_agent_name}:** Responded ({timing}total {turn_stats.get('total', 0):.1f}s)")
+
+                # Automatically save the current session after every interaction
+                save_chat_session(
+                    st.session_state["chat_history"],
+                    st.session_state["active_agent_log"],
+                    st.session_state["current_session_id"]
                 )
 
-                if response and response.get("messages"):
-                    ai_message_obj = response["messages"][-1]
-
-                    # 4. Convert AI response back to Streamlit's chat history format
-                    st.session_state["chat_history"].append(
-                        {"role": "assistant", "content": ai_message_obj.content, "avatar": agent_image})
+                st.rerun()
 
-                    ## TTS
-                    if st.session_state.voice_mode:
-                        speak(ai_message_obj.content)
-
-
-                    # Infer and log the active agent
-                    active_agent_name = "Unknown Agent"
-                    if hasattr(ai_message_obj, 'name') and ai_message_obj.name:
-                        active_agent_name = ai_message_obj.name
-                    elif response.get("intermediate_steps"):
-                        last_step = response["intermediate_steps"][-1]
-                        if hasattr(last_step, 'action') and hasattr(last_step.action, 'tool'):
-                            active_agent_name = f"Tool: {last_step.action.tool}"
-                        elif hasattr(last_step, 'agent'):
-                            active_agent_name = last_step.agent
-
-                    st.session_state["active_agent_log"].append(f"**{active_agent_name}:** Responded")
-
-                    # Automatically save the current session after every interaction
-                    save_chat_session(
-                        st.session_state["chat_history"],
-                        st.session_state["active_agent_log"],
-                        st.session_state["current_session_id"]
-                    )
-
-                    st.rerun()
-
-                else:
-                    st.session_state["active_agent_log"].append("**Error:** No response received from agents.")
-                    st.error("No response received from the agents.")
+            else:
+                st.session_state["active_agent_log"].append("**Error:** No response received from agents.")
+                st.error("No response received from the agents.")
 
         except Exception as e:
+            turn_error = e
             st.session_state["active_agent_log"].append(f"**Error during invocation:** {e}")
             st.error(f"An error occurred: {e}")
+        finally:
+            finish_turn_trace(tracer, turn_error)
+
+    with speech_slot:
+        speech_player()
+
+    # The page is out; compile the swarm and build the agents now instead of on the first message
+    swarm.start()
 
 else:
     st.error("Application components are not fully initialized. Please check initial load messages.")